@@ -1,14 +1,11 @@
 import streamlit as st
 import pandas as pd
 
-from modules.polygon_client import PolygonClient
-from modules.data_loader import load_csv
-from modules.api_client import MarketAPI
 from modules.liquidity_metrics import bid_ask_spread, amihud_illiquidity, order_book_imbalance
-from modules.visualizer import plot_volume, plot_spread, depth_heatmap
-from modules.report_generator import generate_report
 from modules.teaching_mode import explain
 
+# Clients, charts (plotly) and the PDF report (fpdf) are imported on first use
+
 
 # -----------------------------------
 # Page Config
@@ -47,9 +44,20 @@ COMPANIES = {
 
 
 # -----------------------------------
-# Polygon Client
+# Clients (built once per server process)
 # -----------------------------------
-client = PolygonClient(POLYGON_API_KEY)
+@st.cache_resource
+def get_polygon_client():
+    from modules.polygon_client import PolygonClient
+    from modules.snapshot_cache import get_cache
+    return PolygonClient(POLYGON_API_KEY, cache=get_cache())
+
+
+@st.cache_resource
+def get_market_api():
+    from modules.api_client import MarketAPI
+    from modules.snapshot_cache import get_cache
+    return MarketAPI("https://api.binance.com", cache=get_cache())
 
 
 # -----------------------------------
@@ -65,7 +73,7 @@ st.sidebar.write(f"Symbol: **{selected_symbol}**")
 # Fetch Selected Company
 # -----------------------------------
 if st.sidebar.button("Fetch Selected Company Data"):
-    row = client.fetch_snapshot(selected_symbol)
+    row = get_polygon_client().fetch_snapshot(selected_symbol)
     if row:
         st.subheader(f"📡 Polygon Real-Time Data — {selected_company}")
         st.dataframe(pd.DataFrame([row]))
@@ -77,7 +85,7 @@ if st.sidebar.button("Fetch Selected Company Data"):
 # Fetch All Companies
 # -----------------------------------
 if st.sidebar.button("Fetch All Companies"):
-    result = client.fetch_multiple(COMPANIES)
+    result = get_polygon_client().fetch_multiple(COMPANIES)
     success = result["success"]
     failed = result["failed"]
 
@@ -124,6 +132,7 @@ metrics = {}
 if source == "Upload CSV":
     file = st.sidebar.file_uploader("Upload CSV", type=["csv"])
     if file:
+        from modules.data_loader import load_csv
         df = load_csv(file)
 
 
@@ -131,9 +140,8 @@ if source == "Upload CSV":
 # Binance API
 # -----------------------------------
 elif source == "Binance API":
-    api = MarketAPI("https://api.binance.com")
     symbol = st.sidebar.text_input("Symbol", "BTCUSDT")
-    bids, asks = api.get_orderbook(symbol)
+    bids, asks = get_market_api().get_orderbook(symbol)
 
 
 # -----------------------------------
@@ -178,10 +186,12 @@ elif source == "Binance API" and bids is not None and asks is not None:
 # -----------------------------------
 st.subheader("📊 Visualizations")
 if source == "Upload CSV" and df is not None:
+    from modules.visualizer import plot_spread, plot_volume
     st.plotly_chart(plot_volume(df), use_container_width=True)
     st.plotly_chart(plot_spread(df), use_container_width=True)
 
 elif source == "Binance API" and bids is not None and asks is not None:
+    from modules.visualizer import depth_heatmap
     st.plotly_chart(depth_heatmap(bids, asks), use_container_width=True)
 
 
@@ -198,6 +208,7 @@ elif source == "Binance API" and bids is not None and asks is not None:
 # -----------------------------------
 if st.button("Generate PDF Report"):
     if metrics:
+        from modules.report_generator import generate_report
         filename = generate_report(metrics)
         st.success("Report generated!")
         with open(filename, "rb") as f:
@@ -0,0 +1,241 @@
+# benchmarks/run.py
+
+"""
+Run the benchmark suite and compare against earlier commits.
+
+    python -m benchmarks.run                              # default scale
+    python -m benchmarks.run --rows 10k,1M,100M --only metrics,loader
+    python -m benchmarks.run --levels 50,5000 --only depth,clients
+    python -m benchmarks.run --compare HEAD~1 --fail-on-regression 0.15
+
+Per benchmark and size it reports p50 / p99 latency, throughput (items/s
+at p50) and peak traced memory, and saves everything to
+benchmarks/results/<commit>.json. --compare prints the p50 ratio against
+another results file (by commit, path, or the latest other file).
+"""
+
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.suite import BENCHMARKS
+
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+DEFAULT_SIZES = {
+    "rows": [10_000, 100_000, 1_000_000],
+    "levels": [50, 500, 5_000],
+    "symbols": [32],
+}
+
+_SUFFIXES = {"k": 1_000, "m": 1_000_000, "g": 1_000_000_000}
+
+
+def parse_sizes(text: str) -> List[int]:
+    """'10k,1M,100M' -> [10000, 1000000, 100000000]."""
+    sizes = []
+    for part in text.split(","):
+        part = part.strip().lower().replace("_", "")
+        if not part:
+            continue
+        scale = _SUFFIXES.get(part[-1], 1)
+        sizes.append(int(float(part[:-1] if scale > 1 else part) * scale))
+    return sizes
+
+
+# -----------------------------
+# Measurement
+# -----------------------------
+def measure(op, items: int, repeat: int = 5, warmup: int = 1, min_time: float = 0.0) -> Dict:
+    """
+    Time ``op`` ``repeat`` times (more if the total is under ``min_time``)
+    after ``warmup`` untimed calls, then one traced call for peak memory.
+    """
+    for _ in range(warmup):
+        op()
+
+    times = []
+    started = time.perf_counter()
+    while len(times) < repeat or (time.perf_counter() - started) < min_time:
+        gc.collect()
+        t0 = time.perf_counter()
+        op()
+        times.append(time.perf_counter() - t0)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        op()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    times = np.asarray(times)
+    p50 = float(np.percentile(times, 50))
+    return {
+        "items": items,
+        "runs": int(times.size),
+        "p50_ms": p50 * 1e3,
+        "p99_ms": float(np.percentile(times, 99)) * 1e3,
+        "mean_ms": float(times.mean()) * 1e3,
+        "throughput_per_s": items / p50 if p50 > 0 else None,
+        "peak_mb": peak / 2**20,
+    }
+
+
+def run_suite(sizes: Dict[str, List[int]], only: Optional[List[str]] = None, repeat: int = 5, min_time: float = 0.0, log=print) -> List[Dict]:
+    results = []
+    for name, benchmark in BENCHMARKS.items():
+        if only and not any(name == o or name.startswith(o.rstrip(".") + ".") for o in only):
+            continue
+        for size in sizes.get(benchmark.kind, []):
+            try:
+                op, items = benchmark.factory(size)
+                stats = measure(op, items, repeat=repeat, min_time=min_time)
+                error = None
+            except Exception as exc:
+                stats, error = {}, f"{type(exc).__name__}: {exc}"
+
+            row = {"name": name, "group": benchmark.group, "kind": benchmark.kind, "size": size, **stats, "error": error}
+            results.append(row)
+            if error:
+                log(f"{name:<36} {size:>12,}  ERROR {error}")
+            else:
+                log(
+                    f"{name:<36} {size:>12,}  p50 {row['p50_ms']:>10.2f} ms  p99 {row['p99_ms']:>10.2f} ms"
+                    f"  {row['throughput_per_s']:>14,.0f}/s  peak {row['peak_mb']:>8.1f} MB"
+                )
+    return results
+
+
+# -----------------------------
+# Results storage / comparison
+# -----------------------------
+def _git(*args) -> Optional[str]:
+    try:
+        out = subprocess.run(["git", *args], capture_output=True, text=True, check=True,
+                             cwd=Path(__file__).resolve().parent)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def current_commit() -> Dict:
+    sha = _git("rev-parse", "--short=12", "HEAD") or "unknown"
+    dirty = bool(_git("status", "--porcelain", "--untracked-files=no"))
+    return {"commit": sha, "dirty": dirty}
+
+
+def save_results(results: List[Dict], sizes: Dict[str, List[int]]) -> Path:
+    info = current_commit()
+    payload = {
+        **info,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sizes": sizes,
+        "results": results,
+    }
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = RESULTS_DIR / f"{info['commit']}{'-dirty' if info['dirty'] else ''}.json"
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return path
+
+
+def find_results(ref: Optional[str], exclude: Path) -> Optional[Path]:
+    """Results file for a path, a commit-ish, or the newest other file."""
+    if ref:
+        if Path(ref).is_file():
+            return Path(ref)
+        sha = _git("rev-parse", "--short=12", ref) or ref
+        matches = sorted(RESULTS_DIR.glob(f"{sha}*.json"))
+        return matches[0] if matches else None
+
+    others = [p for p in RESULTS_DIR.glob("*.json") if p.resolve() != exclude.resolve()]
+    return max(others, key=lambda p: p.stat().st_mtime) if others else None
+
+
+def compare(current: List[Dict], baseline_path: Path, threshold: float = 0.10, log=print) -> int:
+    """Print p50 ratios vs a baseline; returns the number of regressions."""
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    before = {(r["name"], r["size"]): r for r in baseline["results"] if not r.get("error")}
+
+    log(f"\nCompared with {baseline['commit']}{' (dirty)' if baseline.get('dirty') else ''}  [{baseline_path.name}]")
+    regressions = 0
+    for row in current:
+        old = before.get((row["name"], row["size"]))
+        if old is None or row.get("error"):
+            continue
+        ratio = row["p50_ms"] / old["p50_ms"] if old["p50_ms"] else float("nan")
+        mem = row["peak_mb"] - old["peak_mb"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        log(f"{row['name']:<36} {row['size']:>12,}  p50 x{ratio:>6.2f}  peak {mem:>+8.1f} MB{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", help="Tick counts, e.g. 10k,1M,100M.")
+    parser.add_argument("--levels", help="Order-book levels per side, e.g. 50,500,5000.")
+    parser.add_argument("--symbols", help="Universe sizes for client pipelines, e.g. 32,256.")
+    parser.add_argument("--only", help="Comma-separated groups or benchmark names (metrics, loader, clients.polygon_fetch_batch, ...).")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark (default 5).")
+    parser.add_argument("--min-time", type=float, default=0.0, help="Keep repeating until this many seconds have elapsed.")
+    parser.add_argument("--compare", nargs="?", const="", default=None, help="Baseline commit or results file (default: latest other run).")
+    parser.add_argument("--threshold", type=float, default=0.10, help="p50 slowdown counted as a regression (default 0.10).")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 if any benchmark regressed.")
+    parser.add_argument("--no-save", action="store_true", help="Do not write a results file.")
+    parser.add_argument("--list", action="store_true", help="List benchmarks and exit.")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, benchmark in BENCHMARKS.items():
+            print(f"{name:<36} scales with {benchmark.kind}")
+        return 0
+
+    sizes = {
+        "rows": parse_sizes(args.rows) if args.rows else DEFAULT_SIZES["rows"],
+        "levels": parse_sizes(args.levels) if args.levels else DEFAULT_SIZES["levels"],
+        "symbols": parse_sizes(args.symbols) if args.symbols else DEFAULT_SIZES["symbols"],
+    }
+    only = [o.strip() for o in args.only.split(",")] if args.only else None
+
+    results = run_suite(sizes, only=only, repeat=args.repeat, min_time=args.min_time)
+
+    saved = Path("/dev/null")
+    if not args.no_save:
+        saved = save_results(results, sizes)
+        print(f"\nSaved {saved.relative_to(RESULTS_DIR.parent.parent)}")
+
+    if args.compare is not None:
+        baseline = find_results(args.compare or None, exclude=saved)
+        if baseline is None:
+            print("No baseline results to compare with.", file=sys.stderr)
+            return 1
+        regressions = compare(results, baseline, threshold=args.threshold)
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
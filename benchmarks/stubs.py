@@ -0,0 +1,135 @@
+# benchmarks/stubs.py
+
+"""
+Offline transports that replay recorded Polygon and Binance responses.
+
+They implement the HttpTransport.get() signature, so a client built with
+``transport=StubTransport(...)`` runs its full pipeline (planner, parsing,
+merging, batching) without touching the network:
+
+    client = PolygonClient("bench", transport=polygon_stub())
+    client.fetch_multiple(universe)
+"""
+
+import copy
+import json
+import re
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from benchmarks.synthetic import depth_payload
+
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+class StubResponse:
+    """The subset of requests.Response the clients use."""
+
+    def __init__(self, status_code: int, body, headers=None):
+        self.status_code = status_code
+        self._body = body
+        self.headers = headers or {"Content-Type": "application/json"}
+
+    @property
+    def text(self) -> str:
+        return self._body if isinstance(self._body, str) else json.dumps(self._body)
+
+    @property
+    def content(self) -> bytes:
+        return self.text.encode("utf-8")
+
+    def json(self):
+        if isinstance(self._body, str):
+            return json.loads(self._body)
+        # Callers may mutate what they get back, like a fresh decode
+        return copy.deepcopy(self._body)
+
+    def close(self):
+        pass
+
+
+class StubTransport:
+    """
+    Routes GETs by URL path regex to handlers returning (status, body).
+
+    ``latency`` (seconds) is slept per request to model network time;
+    the default 0 measures pure client-side overhead.
+    """
+
+    def __init__(self, routes, latency: float = 0.0):
+        self.routes = [(re.compile(pattern), handler) for pattern, handler in routes]
+        self.latency = latency
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None, priority=None, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        parts = urlsplit(url)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        for pattern, handler in self.routes:
+            match = pattern.search(path)
+            if match:
+                status, body = handler(match, params or {})
+                return StubResponse(status, body)
+        return StubResponse(404, {"status": "NOT_FOUND", "message": f"No stub for {path}"})
+
+    def close(self):
+        pass
+
+
+def _fixture(name: str) -> dict:
+    with open(FIXTURES / name, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def polygon_stub(partial_every: int = 4, latency: float = 0.0) -> StubTransport:
+    """
+    Polygon responses from the recorded fixtures, retargeted per ticker.
+
+    Every ``partial_every``-th ticker's v3 snapshot lacks the quote, so the
+    fallback planner also exercises last_quote (0 disables this).
+    """
+    snapshot = _fixture("polygon_snapshot_v3.json")
+    aggs = _fixture("polygon_aggs_prev.json")
+    quote = _fixture("polygon_last_quote.json")
+    trade = _fixture("polygon_last_trade.json")
+    partial = {}
+
+    def is_partial(symbol):
+        if symbol not in partial:
+            partial[symbol] = bool(partial_every) and len(partial) % partial_every == partial_every - 1
+        return partial[symbol]
+
+    def snapshot_handler(match, params):
+        body = copy.deepcopy(snapshot)
+        body["results"]["ticker"] = match.group(1)
+        if is_partial(match.group(1)):
+            body["results"].pop("lastQuote")
+        return 200, body
+
+    def simple(body):
+        return lambda match, params: (200, body)
+
+    return StubTransport([
+        (r"^/v3/snapshot\?ticker=([^&]+)", snapshot_handler),
+        (r"^/v2/aggs/ticker/([^/]+)/prev", simple(aggs)),
+        (r"^/v2/last/quote/([^/?]+)", simple(quote)),
+        (r"^/v2/last/trade/([^/?]+)", simple(trade)),
+    ], latency=latency)
+
+
+def binance_stub(levels: int = 50, latency: float = 0.0) -> StubTransport:
+    """/api/v3/depth with a synthetic book of up to ``levels`` per side."""
+    payloads = {}
+
+    def depth_handler(match, params):
+        limit = min(int(params.get("limit", 100)), levels)
+        if limit not in payloads:
+            payloads[limit] = depth_payload(limit)
+        return 200, payloads[limit]
+
+    return StubTransport([(r"^/api/v3/depth", depth_handler)], latency=latency)
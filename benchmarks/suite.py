@@ -0,0 +1,244 @@
+# benchmarks/suite.py
+
+"""
+Benchmark registry.
+
+Each benchmark is a factory ``(size) -> (op, items)``: setup runs once
+outside the timed region, ``op`` is the zero-argument call that gets
+timed, and ``items`` (rows, levels or symbols processed per call) turns
+latency into throughput. ``kind`` says which size axis it scales with.
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+from benchmarks.stubs import binance_stub, polygon_stub
+from benchmarks.synthetic import make_diffs, make_orderbook, make_ticks, write_ticks_csv
+
+
+class Benchmark:
+    __slots__ = ("name", "group", "kind", "factory")
+
+    def __init__(self, name: str, group: str, kind: str, factory: Callable[[int], Tuple[Callable, int]]):
+        self.name = name
+        self.group = group
+        self.kind = kind
+        self.factory = factory
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def bench(name: str, kind: str = "rows"):
+    """Register a benchmark factory under ``group.name``."""
+    def register(factory):
+        BENCHMARKS[name] = Benchmark(name, name.split(".", 1)[0], kind, factory)
+        return factory
+    return register
+
+
+# -----------------------------
+# liquidity_metrics
+# -----------------------------
+@bench("metrics.bid_ask_spread")
+def _spread(n):
+    from modules.liquidity_metrics import bid_ask_spread
+    df = make_ticks(n)
+    return lambda: bid_ask_spread(df), n
+
+
+@bench("metrics.amihud_illiquidity")
+def _amihud(n):
+    from modules.liquidity_metrics import amihud_illiquidity
+    df = make_ticks(n)
+    return lambda: amihud_illiquidity(df), n
+
+
+@bench("metrics.kyles_lambda")
+def _kyle(n):
+    from modules.liquidity_metrics import kyles_lambda
+    df = make_ticks(n)
+    data = {"returns": df["close"].pct_change().fillna(0).to_numpy(), "signed_volume": df["signed_volume"].to_numpy()}
+    return lambda: kyles_lambda(data), n
+
+
+@bench("metrics.order_book_imbalance", kind="levels")
+def _imbalance(levels):
+    from modules.liquidity_metrics import order_book_imbalance
+    bids, asks = make_orderbook(levels)
+    return lambda: order_book_imbalance(bids, asks), levels
+
+
+@bench("metrics.online_liquidity")
+def _online(n):
+    from modules.liquidity_metrics import OnlineLiquidityMetrics
+    df = make_ticks(n)
+    return lambda: OnlineLiquidityMetrics().update(df).value(), n
+
+
+@bench("metrics.rolling_liquidity")
+def _rolling(n):
+    from modules.rolling_metrics import rolling_liquidity
+    df = make_ticks(n)
+    return lambda: rolling_liquidity(df, window=100), n
+
+
+@bench("metrics.bucketed_liquidity")
+def _bucketed(n):
+    from modules.rolling_metrics import bucketed_liquidity
+    df = make_ticks(n)
+    return lambda: bucketed_liquidity(df, freq="1m"), n
+
+
+@bench("metrics.panel_metrics")
+def _panel(n):
+    from modules.panel_metrics import panel_metrics
+    df = make_ticks(n, n_symbols=32)
+    return lambda: panel_metrics(df), n
+
+
+# -----------------------------
+# data_loader
+# -----------------------------
+@bench("loader.load_csv")
+def _load_csv(n):
+    from modules.data_loader import load_csv
+    path = write_ticks_csv(n)
+    return lambda: load_csv(path), n
+
+
+@bench("loader.stream_csv_metrics")
+def _stream_csv(n):
+    from modules.data_loader import stream_csv_metrics
+    path = write_ticks_csv(n)
+    return lambda: stream_csv_metrics(path), n
+
+
+# -----------------------------
+# visualizer
+# -----------------------------
+@bench("visualizer.plot_spread")
+def _plot_spread(n):
+    from modules.visualizer import plot_spread
+    df = make_ticks(n)
+    return lambda: plot_spread(df), n
+
+
+@bench("visualizer.plot_volume")
+def _plot_volume(n):
+    from modules.visualizer import plot_volume
+    df = make_ticks(n)
+    return lambda: plot_volume(df), n
+
+
+@bench("visualizer.depth_heatmap", kind="levels")
+def _depth_heatmap(levels):
+    from modules.visualizer import depth_heatmap
+    bids, asks = make_orderbook(levels)
+    return lambda: depth_heatmap(bids, asks), levels
+
+
+# -----------------------------
+# Order books
+# -----------------------------
+@bench("depth.market_impact", kind="levels")
+def _market_impact(levels):
+    from modules.depth_analytics import market_impact
+    bids, asks = make_orderbook(levels)
+    notionals = np.geomspace(1e2, 1e6, 100)
+    return lambda: market_impact(bids, asks, notionals), levels
+
+
+@bench("depth.order_book_replay", kind="levels")
+def _book_replay(levels):
+    from benchmarks.synthetic import depth_payload
+    from modules.order_book import OrderBook
+
+    snapshot = depth_payload(levels)
+    diffs = make_diffs(1_000, levels)
+
+    def op():
+        book = OrderBook("BENCH")
+        book.load_snapshot(snapshot)
+        book.replay(diffs)
+        return book.imbalance()
+
+    return op, len(diffs)
+
+
+# -----------------------------
+# Client pipelines (recorded-response stubs, no network)
+# -----------------------------
+def _universe(n):
+    return {f"Company {i}": f"SYM{i:03d}" for i in range(n)}
+
+
+@bench("clients.polygon_fetch_multiple", kind="symbols")
+def _polygon_multiple(n):
+    from modules.polygon_client import PolygonClient
+    client = PolygonClient("bench", transport=polygon_stub())
+    universe = _universe(n)
+    return lambda: client.fetch_multiple(universe), n
+
+
+@bench("clients.polygon_fetch_batch", kind="symbols")
+def _polygon_batch(n):
+    from modules.polygon_client import PolygonClient
+    client = PolygonClient("bench", transport=polygon_stub())
+    universe = _universe(n)
+    return lambda: client.fetch_batch(universe), n
+
+
+@bench("clients.binance_get_orderbook", kind="levels")
+def _binance_orderbook(levels):
+    from modules.api_client import MarketAPI
+    api = MarketAPI("https://api.binance.com", transport=binance_stub(levels))
+    return lambda: api.get_orderbook("BTCUSDT", limit=levels), levels
+
+
+@bench("clients.forex_fetch_batch", kind="symbols")
+def _forex_batch(n):
+    from modules.forex_client import ForexClient
+    client = ForexClient(transport=binance_stub(50))
+    universe = _universe(n)
+    return lambda: client.fetch_batch(universe), n
+
+
+# -----------------------------
+# Cassette replay (small recording driving a large universe)
+# -----------------------------
+def _cassette(record, name):
+    import tempfile
+    from modules.replay_transport import RecordingTransport
+
+    path = Path(tempfile.gettempdir()) / f"liquidity_bench_{name}.jsonl.gz"
+    if not path.exists():
+        with RecordingTransport(str(path), inner=record[0]) as recorder:
+            record[1](recorder)
+    return str(path)
+
+
+@bench("clients.polygon_replay_faults", kind="symbols")
+def _polygon_replay(n):
+    from modules.polygon_client import PolygonClient
+    from modules.replay_transport import ReplayTransport, uniform
+
+    path = _cassette((polygon_stub(), lambda t: PolygonClient("bench", transport=t).fetch_multiple(_universe(8))), "polygon")
+    replay = ReplayTransport(path, latency=uniform(0.0, 0.002), errors={429: 0.01, 500: 0.01, "timeout": 0.005}, seed=7)
+    client = PolygonClient("bench", transport=replay)
+    universe = _universe(n * 100)
+    return lambda: client.fetch_batch(universe), n * 100
+
+
+@bench("clients.forex_replay_faults", kind="symbols")
+def _forex_replay(n):
+    from modules.forex_client import ForexClient
+    from modules.replay_transport import ReplayTransport, uniform
+
+    path = _cassette((binance_stub(50), lambda t: ForexClient(transport=t).fetch_batch(_universe(8))), "forex")
+    replay = ReplayTransport(path, latency=uniform(0.0, 0.002), errors={429: 0.01, "connection": 0.005}, seed=7)
+    client = ForexClient(transport=replay)
+    universe = _universe(n * 100)
+    return lambda: client.fetch_batch(universe), n * 100
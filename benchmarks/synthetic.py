@@ -0,0 +1,114 @@
+# benchmarks/synthetic.py
+
+"""
+Synthetic market data at configurable scale.
+
+- make_ticks: tick frame shaped like the dashboard CSVs (10k .. 100M rows)
+- write_ticks_csv: same data streamed to disk in chunks (never all in RAM)
+- make_orderbook / depth_payload: books of 50 .. 5000 levels per side
+- make_diffs: Binance-style depth diff events for OrderBook replay
+
+Every generator is seeded, so runs on different commits see identical data.
+"""
+
+import os
+import tempfile
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "liquidity_bench")
+
+
+def _tick_columns(n: int, rng: np.random.Generator, start_row: int = 0, start_price: float = 100.0):
+    close = start_price + np.cumsum(rng.standard_normal(n)) * 0.01
+    half_spread = 0.005 + rng.random(n) * 0.02
+    depth1 = rng.integers(100, 1000, n).astype(np.float64)
+    depth2 = rng.integers(100, 1000, n).astype(np.float64)
+    times = pd.Timestamp("2024-01-01 09:15") + pd.to_timedelta(start_row + np.arange(n), unit="s")
+
+    return {
+        "timestamp": times,
+        "bid": close - half_spread,
+        "ask": close + half_spread,
+        "volume": rng.integers(1, 5000, n).astype(np.float64),
+        "expected_price": close,
+        "execution_price": close + half_spread / 2,
+        "execution_time_ms": rng.integers(5, 40, n).astype(np.float64),
+        "depth1": depth1,
+        "depth2": depth2,
+        "depth3": depth1 + depth2,
+        "close": close,
+        "signed_volume": rng.standard_normal(n) * 1000,
+    }
+
+
+@lru_cache(maxsize=8)
+def make_ticks(n: int, n_symbols: int = 1, seed: int = 7) -> pd.DataFrame:
+    """
+    ``n`` ticks, round-robin over ``n_symbols`` symbols when > 1.
+
+    Cached per (n, n_symbols, seed); callers must not mutate the result.
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(_tick_columns(n, rng))
+    if n_symbols > 1:
+        names = np.array([f"SYM{i:03d}" for i in range(n_symbols)], dtype=object)
+        df["symbol"] = names[np.arange(n) % n_symbols]
+    return df
+
+
+def write_ticks_csv(n: int, chunk_rows: int = 1_000_000, seed: int = 7) -> str:
+    """Path of a CSV with ``n`` ticks, generated once and reused."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, f"ticks_{n}_{seed}.csv")
+    if os.path.exists(path):
+        return path
+
+    rng = np.random.default_rng(seed)
+    tmp = path + ".tmp"
+    price = 100.0
+    with open(tmp, "w", newline="") as fh:
+        for offset in range(0, n, chunk_rows):
+            rows = min(chunk_rows, n - offset)
+            chunk = pd.DataFrame(_tick_columns(rows, rng, start_row=offset, start_price=price))
+            price = float(chunk["close"].iloc[-1])
+            chunk.to_csv(fh, index=False, header=offset == 0, float_format="%.6f")
+    os.replace(tmp, path)
+    return path
+
+
+def make_orderbook(levels: int, mid: float = 100.0, tick: float = 0.01, seed: int = 7):
+    """(bids_df, asks_df) with ``levels`` price levels per side, best first."""
+    rng = np.random.default_rng(seed)
+    steps = np.arange(levels)
+    bids = pd.DataFrame({"price": mid - tick / 2 - steps * tick, "qty": rng.random(levels) * 10 + 0.01})
+    asks = pd.DataFrame({"price": mid + tick / 2 + steps * tick, "qty": rng.random(levels) * 10 + 0.01})
+    return bids, asks
+
+
+def depth_payload(levels: int, mid: float = 100.0, last_update_id: int = 1_000, seed: int = 7) -> dict:
+    """/api/v3/depth JSON body (prices and quantities as strings, like Binance)."""
+    bids, asks = make_orderbook(levels, mid=mid, seed=seed)
+
+    def side(frame):
+        return [[f"{p:.8f}", f"{q:.8f}"] for p, q in zip(frame["price"], frame["qty"])]
+
+    return {"lastUpdateId": last_update_id, "bids": side(bids), "asks": side(asks)}
+
+
+def make_diffs(count: int, levels: int, first_id: int = 1_001, mid: float = 100.0, per_event: int = 10, seed: int = 7):
+    """Contiguous diff events touching ``per_event`` random levels each."""
+    rng = np.random.default_rng(seed)
+    events = []
+    update_id = first_id
+    for _ in range(count):
+        offsets = rng.integers(0, levels, per_event)
+        qtys = np.where(rng.random(per_event) < 0.1, 0.0, rng.random(per_event) * 10)
+        side = [[f"{mid - 0.005 - o * 0.01:.8f}", f"{q:.8f}"] for o, q in zip(offsets[: per_event // 2], qtys)]
+        other = [[f"{mid + 0.005 + o * 0.01:.8f}", f"{q:.8f}"] for o, q in zip(offsets[per_event // 2:], qtys[per_event // 2:])]
+        events.append({"U": update_id, "u": update_id, "b": side, "a": other})
+        update_id += 1
+    return events
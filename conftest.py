@@ -0,0 +1,4 @@
+# conftest.py
+#
+# Kept at the repository root so pytest puts it on sys.path and the tests
+# can import the flat ``modules`` package without an install step.
@@ -5,20 +5,14 @@ from __future__ import annotations
 import streamlit as st
 import pandas as pd
 
-from modules.polygon_client import PolygonClient
-from modules.india_client import IndiaClient
-from modules.forex_client import ForexClient
-from modules.data_loader import load_csv
-from modules.api_client import MarketAPI
-from modules.liquidity_metrics import (
-    bid_ask_spread,
-    amihud_illiquidity,
-    order_book_imbalance,
-)
-from modules.visualizer import plot_volume, plot_spread, depth_heatmap
-from modules.report_generator import generate_report
+from modules import instrumentation
 from modules.teaching_mode import explain
 
+# Clients (requests), the tick store (pyarrow), charts (plotly) and the PDF
+# report (fpdf) are imported where they are first used, so a rerun only
+# pays for what that interaction needs. Clients and the store are built
+# once per server process with st.cache_resource.
+
 
 # -----------------------------------
 # Page config
@@ -149,6 +143,64 @@ FOREX_PAIRS = {
     "CHF/JPY (CHFJPY)": "CHFJPY",
 }
 
+BINANCE_SYMBOLS = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "EURUSDT", "GBPUSDT", "AUDUSDT"]
+
+
+# -----------------------------------
+# Shared resources (one per server process)
+# -----------------------------------
+@st.cache_resource
+def get_client(provider: str):
+    """Interactive client for a provider, shared by every session."""
+    from modules.snapshot_cache import get_cache
+
+    if provider == "polygon":
+        from modules.polygon_client import PolygonClient
+        return PolygonClient(POLYGON_API_KEY, cache=get_cache())
+    if provider == "india":
+        from modules.india_client import IndiaClient
+        return IndiaClient(DHAN_CLIENT_ID or "KYC_PENDING", DHAN_ACCESS_TOKEN or "KYC_PENDING", cache=get_cache())
+    if provider == "binance":
+        from modules.forex_client import ForexClient
+        return ForexClient(cache=get_cache())
+    if provider == "binance_books":
+        from modules.api_client import MarketAPI
+        return MarketAPI("https://api.binance.com", cache=get_cache())
+    raise ValueError(f"Unknown provider: {provider}")
+
+
+def get_store():
+    """Process-wide tick store; pyarrow loads on the first save or read."""
+    from modules.tick_store import get_store as tick_store
+    return tick_store()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def fx_snapshot(symbol: str):
+    """(row, error) for the Global Snapshot; errors are cached too, so a blocked region is not retried on every rerun."""
+    try:
+        return get_client("binance").fetch_snapshot(symbol), None
+    except Exception as exc:
+        return None, str(exc)
+
+
+@st.cache_resource
+def get_collector():
+    """Polls every universe on budgeted schedules; sessions only read from it."""
+    from modules.api_client import MarketAPI
+    from modules.collector import Collector, orderbook_job, snapshot_job
+    from modules.forex_client import ForexClient
+    from modules.polygon_client import PolygonClient
+    from modules.rate_limiter import BULK
+    from modules.snapshot_cache import get_cache
+
+    collector = Collector(store=get_store())
+    if POLYGON_API_KEY:
+        collector.add_job(snapshot_job("polygon", PolygonClient(POLYGON_API_KEY, cache=get_cache(), priority=BULK), US_COMPANIES, provider="polygon", interval=60))
+    collector.add_job(snapshot_job("binance", ForexClient(cache=get_cache(), priority=BULK), FOREX_PAIRS, provider="binance", interval=5))
+    collector.add_job(orderbook_job("binance_books", MarketAPI("https://api.binance.com", cache=get_cache(), priority=BULK), BINANCE_SYMBOLS, interval=5))
+    return collector.start()
+
 
 # -----------------------------------
 # Market mode selector
@@ -159,6 +211,43 @@ mode = st.sidebar.radio(
 )
 
 
+# Stage timings are process-wide; once enabled they keep recording until
+# "Stop recording", which also clears this checkbox
+st.session_state.setdefault("diagnostics", instrumentation.is_enabled())
+diagnostics = st.sidebar.checkbox(
+    "Diagnostics (stage timings)",
+    key="diagnostics",
+    help="Times HTTP calls, JSON parsing, DataFrame building, metrics and charts.",
+)
+if diagnostics:
+    instrumentation.enable()
+
+
+def stop_recording():
+    """Button callback: runs before the rerun, so the checkbox can be cleared."""
+    instrumentation.disable()
+    instrumentation.reset()
+    st.session_state["diagnostics"] = False
+
+
+def show_chart(fig):
+    """st.plotly_chart with the Plotly serialization/render time recorded."""
+    with instrumentation.timer("app.plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def persist(method: str, *args):
+    """
+    Append fetched data to the local tick store on the script thread (the
+    store buffers it into batched Parquet writes); a failed write is
+    reported, not raised.
+    """
+    try:
+        getattr(get_store(), method)(*args)
+    except Exception as exc:
+        st.caption(f"Could not save to local history: {exc}")
+
+
 # -----------------------------------
 # Client selection by mode
 # -----------------------------------
@@ -166,17 +255,17 @@ if mode == "US Market (Polygon)":
     if not POLYGON_API_KEY:
         st.error("Polygon API key missing. Add it to secrets.toml or Streamlit Cloud settings.")
         st.stop()
-    client = PolygonClient(POLYGON_API_KEY)
+    provider = "polygon"
     universe = US_COMPANIES
     st.sidebar.markdown("**Mode:** US (Polygon)")
 
 elif mode == "India Market (DhanHQ)":
-    client = IndiaClient(DHAN_CLIENT_ID or "KYC_PENDING", DHAN_ACCESS_TOKEN or "KYC_PENDING")
+    provider = "india"
     universe = INDIA_COMPANIES
     st.sidebar.markdown("**Mode:** India (DhanHQ – KYC Pending Placeholder)")
 
 else:  # Forex Market (FX)
-    client = ForexClient()
+    provider = "binance"
     universe = FOREX_PAIRS
     st.sidebar.markdown("**Mode:** Forex (Binance FX)")
 
@@ -194,12 +283,13 @@ st.sidebar.write(f"Identifier: **{selected_symbol}**")
 # -----------------------------------
 if st.sidebar.button("Fetch Selected Instrument Data"):
     try:
-        row = client.fetch_snapshot(selected_symbol)
+        row = get_client(provider).fetch_snapshot(selected_symbol)
 
         if row:
             st.subheader(f"📡 Real-Time Data — {selected_name}")
             df_single = pd.DataFrame([row])
             st.dataframe(df_single)
+            persist("append_snapshots", provider, df_single)
         else:
             st.warning(f"No data returned for {selected_symbol} in {mode}.")
 
@@ -238,13 +328,14 @@ if st.sidebar.button("Fetch Selected Instrument Data"):
 # -----------------------------------
 if st.sidebar.button("Fetch All Instruments"):
     try:
-        result = client.fetch_multiple(universe)
-        success = result.get("success", [])
-        failed = result.get("failed", [])
+        batch = get_client(provider).fetch_batch(universe)
+        failed = batch.failed
 
-        if success:
+        if len(batch):
             st.subheader(f"📡 Real-Time Data — Successful ({mode})")
-            st.dataframe(pd.DataFrame(success))
+            frame = batch.to_frame()
+            st.dataframe(frame)
+            persist("append_snapshots", batch.provider, frame)
 
         if failed:
             st.subheader("⚠️ Failed Instruments")
@@ -254,6 +345,52 @@ if st.sidebar.button("Fetch All Instruments"):
         st.error(f"Error fetching multiple instruments in {mode}: {exc}")
 
 
+# -----------------------------------
+# Live updates from the background collector
+# -----------------------------------
+live = st.sidebar.checkbox(
+    "Live updates (background collector)",
+    help="Universes are polled in the background on rate-limited schedules; this view refreshes without calling upstream.",
+)
+
+
+@st.fragment(run_every=5)
+def live_panel(job: str):
+    collector = get_collector()
+    result = collector.latest(job)
+    if result is None or result.value is None:
+        st.info("Waiting for the first background fetch…")
+    else:
+        st.subheader(f"📡 Live — {mode} (as of {result.fetched_at:%H:%M:%S} UTC)")
+        st.dataframe(result.value.to_frame())
+    if result is not None and result.error:
+        st.caption(f"Last refresh failed: {result.error}")
+    with st.expander("Collector status"):
+        st.dataframe(collector.status())
+
+
+if live:
+    if provider in get_collector().jobs:
+        live_panel(provider)
+    else:
+        st.sidebar.caption(f"No background schedule for {mode}.")
+
+
+# -----------------------------------
+# Stored history (local tick store)
+# -----------------------------------
+if st.sidebar.button("Show Stored History"):
+    try:
+        history = get_store().read_snapshots(provider, [selected_symbol])
+        if history.empty:
+            st.info(f"No stored snapshots for {selected_symbol} yet.")
+        else:
+            st.subheader(f"🗄️ Stored Snapshots — {selected_name} ({len(history)} rows)")
+            st.dataframe(history)
+    except Exception as exc:
+        st.error(f"Error reading stored history for {selected_symbol}: {exc}")
+
+
 # -----------------------------------
 # Teaching overlay
 # -----------------------------------
@@ -281,30 +418,41 @@ df = None
 bids = None
 asks = None
 metrics: dict = {}
+streamed_metrics = None
 
 
 # CSV upload
 if source == "Upload CSV":
     file = st.sidebar.file_uploader("Upload CSV", type=["csv"])
+    stream_mode = st.sidebar.checkbox(
+        "Stream large file (metrics only)",
+        help="Reads the CSV in chunks with constant memory. Charts are skipped.",
+    )
     if file:
-        df = load_csv(file)
+        from modules.data_loader import load_csv, stream_csv_metrics
+
+        if stream_mode:
+            try:
+                streamed_metrics = stream_csv_metrics(file)
+            except Exception as exc:
+                st.error(f"Error streaming CSV: {exc}")
+        else:
+            df = load_csv(file)
 
 # Binance API (generic orderbook)
 elif source == "Binance API":
-    api = MarketAPI("https://api.binance.com")
-
-    default_symbols = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "EURUSDT", "GBPUSDT", "AUDUSDT"]
-    selected_default = st.sidebar.selectbox("Choose a default symbol", default_symbols)
+    selected_default = st.sidebar.selectbox("Choose a default symbol", BINANCE_SYMBOLS)
 
     symbol_input = st.sidebar.text_input("Or enter custom symbol", value=selected_default)
 
     if st.sidebar.button("Fetch Binance Orderbook"):
         try:
-            bids, asks = api.get_orderbook(symbol_input)
+            bids, asks = get_client("binance_books").get_orderbook(symbol_input)
             if bids is None or bids.empty or asks is None or asks.empty:
                 st.warning(f"Orderbook for {symbol_input} returned empty data.")
             else:
                 st.success(f"Fetched Binance orderbook for {symbol_input}")
+                persist("append_book", "binance", symbol_input, bids, asks)
         except Exception as exc:
             bids, asks = None, None
             message = str(exc)
@@ -323,6 +471,9 @@ elif source == "Binance API":
 st.subheader("📘 Liquidity Metrics")
 
 if source == "Upload CSV" and df is not None:
+    from modules.liquidity_metrics import amihud_illiquidity, bid_ask_spread
+    from modules.panel_metrics import panel_metrics
+
     try:
         metrics = {
             "Bid-Ask Spread": bid_ask_spread(df),
@@ -334,15 +485,42 @@ if source == "Upload CSV" and df is not None:
     except Exception as exc:
         st.error(f"Error computing metrics from CSV: {exc}")
 
+    if "symbol" in df.columns and df["symbol"].nunique() > 1:
+        st.markdown("**Per-symbol metrics**")
+        try:
+            st.dataframe(panel_metrics(df))
+        except Exception as exc:
+            st.error(f"Error computing per-symbol metrics: {exc}")
+
+elif source == "Upload CSV" and streamed_metrics is not None:
+    rows = streamed_metrics.pop("Rows")
+    metrics = streamed_metrics
+    for name, value in metrics.items():
+        st.metric(name, f"{value:.6f}")
+        st.caption(explain(name))
+    st.caption(f"Streamed {rows:,} rows.")
+
 elif source == "Binance API" and bids is not None and asks is not None:
     try:
         if bids.empty or asks.empty:
             st.warning("Orderbook is empty or unavailable due to regional restrictions.")
             st.caption("Binance may block access from this region.")
         else:
+            from modules.depth_analytics import depth_within_bps, market_impact
+            from modules.liquidity_metrics import order_book_imbalance
+
             imbalance = order_book_imbalance(bids, asks)
             st.metric("Order Book Imbalance", f"{imbalance:.4f}")
             st.caption(explain("order book imbalance"))
+
+            notional = st.number_input("Order size for impact estimate (quote currency)", value=10_000.0, min_value=0.0)
+            impact = market_impact(bids, asks, notional)
+            c1, c2, c3 = st.columns(3)
+            c1.metric("Buy Slippage (bps)", f"{impact['buy_slippage_bps'][0]:.2f}")
+            c2.metric("Sell Slippage (bps)", f"{impact['sell_slippage_bps'][0]:.2f}")
+            c3.metric("Depth ±10 bps", f"{depth_within_bps(bids, impact['mid'], 10)[0] + depth_within_bps(asks, impact['mid'], 10)[0]:,.4f}")
+            if min(impact["buy_filled"][0], impact["sell_filled"][0]) < 1:
+                st.caption("Order size exceeds the fetched depth; slippage is for the fillable part only.")
     except Exception as exc:
         st.error(f"Error computing order book imbalance: {exc}")
 
@@ -356,24 +534,59 @@ else:
 st.subheader("📊 Visualizations")
 
 if source == "Upload CSV" and df is not None:
+    from modules.rolling_metrics import rolling_liquidity
+    from modules.visualizer import plot_rolling_metrics, plot_spread, plot_volume
+
+    # Charts are decimated to ~2000 points; zooming re-decimates the slice
+    x_range = None
     try:
-        st.plotly_chart(plot_volume(df), use_container_width=True)
-        st.plotly_chart(plot_spread(df), use_container_width=True)
+        times = pd.to_datetime(df['timestamp'], errors="coerce").dropna()
+        if len(times) > 2000 and times.min() < times.max():
+            start, end = st.slider(
+                "Zoom time range",
+                min_value=times.min().to_pydatetime(),
+                max_value=times.max().to_pydatetime(),
+                value=(times.min().to_pydatetime(), times.max().to_pydatetime()),
+            )
+            x_range = (pd.Timestamp(start), pd.Timestamp(end))
+        show_chart(plot_volume(df, x_range=x_range))
+        show_chart(plot_spread(df, x_range=x_range))
     except Exception as exc:
         st.error(f"Error generating CSV-based plots: {exc}")
 
+    window = st.text_input("Rolling window (rows, or time like 1m / 5m / 1h)", value="50")
+    try:
+        rolling_window = int(window) if window.strip().isdigit() else window
+        rolled = rolling_liquidity(df, window=rolling_window)
+        show_chart(plot_rolling_metrics(rolled.dropna(axis=1, how="all"), x_range=x_range))
+    except Exception as exc:
+        st.error(f"Error computing rolling metrics: {exc}")
+
 elif source == "Binance API" and bids is not None and asks is not None:
     try:
         if bids.empty or asks.empty:
             st.warning("Cannot plot depth heatmap: orderbook is empty.")
         else:
-            st.plotly_chart(depth_heatmap(bids, asks), use_container_width=True)
+            from modules.visualizer import depth_heatmap
+            show_chart(depth_heatmap(bids, asks))
     except Exception as exc:
         st.error(f"Error generating depth heatmap: {exc}")
 
 else:
     st.caption("Provide data above to see visualizations.")
 
+if source == "Binance API" and st.checkbox("Show stored depth history (last 24h)", key="depth_history"):
+    try:
+        from modules.visualizer import depth_history_heatmap
+        since = pd.Timestamp.now(tz="UTC") - pd.Timedelta(hours=24)
+        books = list(get_store().iter_books("binance", symbol_input, start=since))
+        if books:
+            show_chart(depth_history_heatmap(books))
+        else:
+            st.info(f"No stored order books for {symbol_input} yet. Fetched books are saved automatically.")
+    except Exception as exc:
+        st.error(f"Error reading stored depth history for {symbol_input}: {exc}")
+
 
 # -----------------------------------
 # PDF report
@@ -381,6 +594,7 @@ else:
 if st.button("Generate PDF Report"):
     if metrics:
         try:
+            from modules.report_generator import generate_report
             filename = generate_report(metrics)
             st.success("Report generated!")
             with open(filename, "rb") as f:
@@ -408,25 +622,53 @@ with col2:
 
 with col3:
     st.markdown("**Forex Example (EUR/USD)**")
-    fx_client = ForexClient()
-    try:
-        fx_row = fx_client.fetch_snapshot("EURUSDT")
-        spread = fx_row.get("spread")
+    # Fetched only once enabled (Forex mode or the button); after that every
+    # rerun reads the 30 s fx_snapshot cache, so the value stays fresh
+    if mode == "Forex Market (FX)" or (not st.session_state.get("fx_panel") and st.button("Load EUR/USD spread")):
+        st.session_state["fx_panel"] = True
 
-        if spread is not None:
-            st.metric("EUR/USD Spread", f"{spread:.5f}")
-            st.caption("Live FX spread via Binance orderbook.")
-        else:
+    if not st.session_state.get("fx_panel"):
+        st.caption("Live FX spread via Binance orderbook, loaded on request.")
+    else:
+        fx_row, fx_error = fx_snapshot("EURUSDT")
+
+        if fx_error is not None:
+            if "451" in fx_error or "restricted location" in fx_error:
+                st.metric("EUR/USD Spread", "Unavailable")
+                st.caption(
+                    "FX data cannot be fetched from Binance in this region. "
+                    "This is a location restriction, not an app error."
+                )
+            else:
+                st.metric("EUR/USD Spread", "Error")
+                st.caption(f"Error fetching FX snapshot: {fx_error}")
+        elif fx_row is None or fx_row.get("spread") is None:
             st.metric("EUR/USD Spread", "N/A")
             st.caption("Spread unavailable from Binance.")
-    except Exception as exc:
-        message = str(exc)
-        if "451" in message or "restricted location" in message:
-            st.metric("EUR/USD Spread", "Unavailable")
-            st.caption(
-                "FX data cannot be fetched from Binance in this region. "
-                "This is a location restriction, not an app error."
-            )
         else:
-            st.metric("EUR/USD Spread", "Error")
-            st.caption(f"Error fetching FX snapshot: {exc}")
+            st.metric("EUR/USD Spread", f"{fx_row['spread']:.5f}")
+            st.caption("Live FX spread via Binance orderbook.")
+
+
+# -----------------------------------
+# Diagnostics panel
+# -----------------------------------
+if diagnostics:
+    st.subheader("🩺 Diagnostics")
+    report = instrumentation.snapshot()
+
+    if report["timers"]:
+        st.markdown("**Stage timings** (slowest total first)")
+        st.dataframe(pd.DataFrame(report["timers"]).round(3))
+    else:
+        st.caption("No timings recorded yet. Fetch data or upload a CSV.")
+    if report["counters"]:
+        st.markdown("**Counters**")
+        st.dataframe(pd.DataFrame(report["counters"]))
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.download_button("Prometheus text", instrumentation.to_prometheus(), file_name="liquidity_metrics.prom")
+    c2.download_button("JSON", instrumentation.to_json(), file_name="liquidity_metrics.json")
+    if c3.button("Reset timings"):
+        instrumentation.reset()
+    c4.button("Stop recording", on_click=stop_recording)
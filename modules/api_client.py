@@ -1,9 +1,13 @@
 # modules/api_client.py
 
-import requests
 import pandas as pd
 from typing import Tuple
 
+from modules.depth_parser import DepthBook, loads, parse_depth
+from modules.http_transport import get_transport
+from modules.instrumentation import timed, timer
+from modules.rate_limiter import INTERACTIVE
+
 class MarketAPI:
     """
     Generic market API client for Binance orderbook.
@@ -11,11 +15,20 @@ class MarketAPI:
     - Validates HTTP status codes
     - Validates response structure
     - Raises clear errors instead of cryptic KeyError
+    - Reuses pooled keep-alive connections from the shared HttpTransport
+    - Parses depth levels straight into float64 arrays (get_depth);
+      DataFrames are only built for get_orderbook callers
     """
 
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, transport=None, cache=None, priority: str = INTERACTIVE):
         self.base_url = base_url.rstrip("/")
+        self.transport = transport or get_transport()
+        self.priority = priority
+
+        # Optional SnapshotCache shared across sessions
+        self.cache = cache
 
+    @timed("binance.get_orderbook")
     def get_orderbook(
         self,
         symbol: str = "BTCUSDT",
@@ -31,11 +44,55 @@ class MarketAPI:
             RuntimeError: on HTTP or API-level errors
             KeyError: if expected keys are missing from a seemingly valid response
         """
+        if self.cache is None:
+            return self._fetch_orderbook(symbol, limit)
+        return self.cache.get_or_fetch(
+            "binance", "depth", symbol,
+            lambda: self._fetch_orderbook(symbol, limit),
+            params={"limit": limit},
+            client=self.base_url,
+        )
+
+    def _fetch_orderbook(self, symbol: str, limit: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        return self.get_depth(symbol, limit).frames()
+
+    def get_depth(self, symbol: str = "BTCUSDT", limit: int = 50) -> DepthBook:
+        """
+        Fetch /api/v3/depth as a DepthBook of (n, 2) float64 arrays.
+
+        The body is decoded and converted without building DataFrames;
+        use this when polling large books and working on the arrays.
+        """
+        response = self._get_depth_response(symbol, limit)
+        with timer("binance.parse_orderbook"):
+            try:
+                return parse_depth(symbol, response.content)
+            except ValueError as exc:
+                # Undecodable body or malformed levels
+                raise RuntimeError(f"Invalid orderbook response for {symbol}: {exc}") from exc
+
+    def get_depth_snapshot(self, symbol: str = "BTCUSDT", limit: int = 1000) -> dict:
+        """
+        Fetch the raw /api/v3/depth payload (lastUpdateId, bids, asks).
+
+        Used to seed an OrderBook before applying incremental diffs.
+        Never cached: the update id must match the diff stream.
+        """
+        response = self._get_depth_response(symbol, limit)
+        try:
+            with timer("json.decode", provider="binance"):
+                data = loads(response.content)
+        except Exception as exc:
+            raise RuntimeError(f"Invalid JSON response for {symbol} orderbook: {exc}") from exc
+
+        return data
+
+    def _get_depth_response(self, symbol: str, limit: int):
         url = f"{self.base_url}/api/v3/depth"
         params = {"symbol": symbol, "limit": limit}
 
         try:
-            response = requests.get(url, params=params, timeout=10)
+            response = self.transport.get(url, params=params, timeout=10, priority=self.priority)
         except Exception as exc:
             raise RuntimeError(f"Network error while fetching orderbook for {symbol}: {exc}") from exc
 
@@ -47,31 +104,14 @@ class MarketAPI:
                 err = response.text
             raise RuntimeError(f"HTTP {response.status_code} fetching {symbol} orderbook: {err}")
 
-        try:
-            data = response.json()
-        except Exception as exc:
-            raise RuntimeError(f"Invalid JSON response for {symbol} orderbook: {exc}") from exc
-
-        # Binance error payload pattern: {"code": ..., "msg": "..."}
-        if isinstance(data, dict) and "code" in data and "msg" in data and "bids" not in data:
-            raise RuntimeError(f"API error for {symbol}: code={data.get('code')} msg={data.get('msg')}")
-
-        if "bids" not in data or "asks" not in data:
-            raise KeyError(f"Orderbook keys missing for {symbol}. Response keys: {list(data.keys())}")
-
-        # Construct DataFrames and ensure numeric types
-        bids_raw = data.get("bids", [])
-        asks_raw = data.get("asks", [])
+        return response
 
-        bids = pd.DataFrame(bids_raw, columns=["price", "qty"])
-        asks = pd.DataFrame(asks_raw, columns=["price", "qty"])
 
-        # Convert to float, row-wise if necessary to avoid silent failures
-        for df in (bids, asks):
-            for col in ["price", "qty"]:
-                df[col] = pd.to_numeric(df[col], errors="coerce")
-
-            # Drop rows that failed conversion entirely
-            df.dropna(subset=["price", "qty"], inplace=True)
+@timed("binance.parse_orderbook")
+def parse_orderbook(symbol: str, data) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Validate a decoded /api/v3/depth payload and build (bids_df, asks_df).
 
-        return bids, asks
+    Shared by the sync and async clients.
+    """
+    return parse_depth(symbol, data).frames()
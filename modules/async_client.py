@@ -0,0 +1,250 @@
+# modules/async_client.py
+
+"""
+Asyncio counterparts of MarketAPI, PolygonClient and ForexClient.
+
+Same contracts as the sync clients, exposed as coroutines:
+
+    async with AsyncPolygonClient(api_key) as client:
+        result = await client.fetch_multiple(US_COMPANIES)
+
+One aiohttp session (keep-alive connection pool) and one semaphore bound
+the number of in-flight requests, so a single event loop can drive
+hundreds of symbols without a thread per request.
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+import pandas as pd
+
+from modules.api_client import parse_orderbook
+from modules.forex_client import DEFAULT_IMPACT_NOTIONAL, snapshot_from_orderbook
+from modules.polygon_client import (
+    ENDPOINT_PARSERS,
+    ENDPOINT_PATHS,
+    RETRY_PASSES,
+    EndpointMerge,
+    FallbackPlanner,
+    quality_tag,
+)
+from modules.rate_limiter import INTERACTIVE, get_rate_limiter
+
+
+class AsyncHttp:
+    """
+    Shared aiohttp session with a bounded number of in-flight requests.
+
+    The session and semaphore are created lazily inside the running loop.
+    Requests draw from the same provider rate limiter as the sync transport
+    (``rate_limiter=False`` disables it).
+    """
+
+    def __init__(self, max_in_flight: int = 64, timeout: float = 10, rate_limiter=None, priority: str = INTERACTIVE):
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.limiter = get_rate_limiter() if rate_limiter is None else (rate_limiter or None)
+        self.priority = priority
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _ensure(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_in_flight, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+    async def get_json(self, url: str, params: Optional[dict] = None, timeout: Optional[float] = None):
+        """
+        GET and decode JSON.
+
+        Returns:
+            (status_code, data) where data is the decoded JSON, or the raw
+            text if the body is not valid JSON.
+        """
+        self._ensure()
+        kwargs = {"params": params}
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+
+        # Wait for tokens before taking an in-flight slot
+        if self.limiter is not None:
+            await self.limiter.acquire_async(url, params, self.priority)
+
+        async with self._semaphore:
+            async with self._session.get(url, **kwargs) as response:
+                if self.limiter is not None:
+                    self.limiter.observe(url, response.status, response.headers)
+                text = await response.text()
+                try:
+                    return response.status, await response.json(content_type=None)
+                except ValueError:
+                    return response.status, text
+
+    async def aclose(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+class _AsyncClientBase:
+    def __init__(self, http: Optional[AsyncHttp], max_in_flight: int):
+        self._owns_http = http is None
+        self.http = http or AsyncHttp(max_in_flight=max_in_flight)
+
+    async def aclose(self):
+        if self._owns_http:
+            await self.http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+# -----------------------------
+# Binance orderbook
+# -----------------------------
+class AsyncMarketAPI(_AsyncClientBase):
+    """Async MarketAPI: same validation and errors as the sync client."""
+
+    def __init__(self, base_url: str, http: Optional[AsyncHttp] = None, max_in_flight: int = 64):
+        super().__init__(http, max_in_flight)
+        self.base_url = base_url.rstrip("/")
+
+    async def get_orderbook(
+        self,
+        symbol: str = "BTCUSDT",
+        limit: int = 50,
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        url = f"{self.base_url}/api/v3/depth"
+        params = {"symbol": symbol, "limit": limit}
+
+        try:
+            status, data = await self.http.get_json(url, params=params, timeout=10)
+        except Exception as exc:
+            raise RuntimeError(f"Network error while fetching orderbook for {symbol}: {exc}") from exc
+
+        if status != 200:
+            raise RuntimeError(f"HTTP {status} fetching {symbol} orderbook: {data}")
+
+        if isinstance(data, str):
+            raise RuntimeError(f"Invalid JSON response for {symbol} orderbook: {data[:200]}")
+
+        return parse_orderbook(symbol, data)
+
+
+class AsyncForexClient(_AsyncClientBase):
+    """Async ForexClient over AsyncMarketAPI."""
+
+    def __init__(
+        self,
+        http: Optional[AsyncHttp] = None,
+        max_in_flight: int = 64,
+        impact_notional: float = DEFAULT_IMPACT_NOTIONAL,
+    ):
+        super().__init__(http, max_in_flight)
+        self.api = AsyncMarketAPI("https://api.binance.com", http=self.http)
+        self.impact_notional = impact_notional
+
+    async def fetch_snapshot(self, symbol: str) -> Dict:
+        bids, asks = await self.api.get_orderbook(symbol)
+        return snapshot_from_orderbook(symbol, bids, asks, self.impact_notional)
+
+    async def fetch_multiple(self, pairs: Dict[str, str]) -> Dict[str, List]:
+        items = list(pairs.items())
+        results = await asyncio.gather(
+            *(self.fetch_snapshot(symbol) for _, symbol in items),
+            return_exceptions=True,
+        )
+
+        success: List[Dict] = []
+        failed: List = []
+        for (name, symbol), row in zip(items, results):
+            if isinstance(row, BaseException):
+                failed.append((name, symbol))
+            else:
+                row["pair"] = name
+                success.append(row)
+
+        return {"success": success, "failed": failed}
+
+
+# -----------------------------
+# Polygon
+# -----------------------------
+class AsyncPolygonClient(_AsyncClientBase):
+    """Async PolygonClient with the same fallback planner and row shape."""
+
+    def __init__(
+        self,
+        api_key,
+        http: Optional[AsyncHttp] = None,
+        max_in_flight: int = 64,
+    ):
+        super().__init__(http, max_in_flight)
+        self.api_key = api_key
+        self.base = "https://api.polygon.io"
+        self.planner = FallbackPlanner()
+
+    async def _call_endpoint(self, name, symbol):
+        url = self.base + ENDPOINT_PATHS[name].format(symbol=symbol)
+        try:
+            _, data = await self.http.get_json(url, params={"apiKey": self.api_key}, timeout=5)
+        except Exception:
+            data = None
+        if not isinstance(data, dict):
+            data = None
+        return ENDPOINT_PARSERS[name](data)
+
+    async def fetch_snapshot(self, symbol):
+        merge = EndpointMerge(self.planner)
+        for name in merge:
+            merge.absorb(name, await self._call_endpoint(name, symbol))
+        return merge.row(symbol)
+
+    async def _fetch_row(self, name, symbol):
+        try:
+            row = await self.fetch_snapshot(symbol)
+        except Exception:
+            row = None
+        if row:
+            row["company"] = name
+            row["symbol"] = symbol
+            row["quality"] = quality_tag(row)
+        return row
+
+    async def fetch_multiple(self, companies: dict):
+        success = []
+        failed = []
+
+        items = list(companies.items())
+        rows = await asyncio.gather(*(self._fetch_row(n, s) for n, s in items))
+        for (name, symbol), row in zip(items, rows):
+            if row:
+                success.append(row)
+            else:
+                failed.append((name, symbol))
+
+        # Retry failed symbols; pacing comes from the shared rate limiter
+        for _ in range(RETRY_PASSES):
+            if not failed:
+                break
+            rows = await asyncio.gather(*(self._fetch_row(n, s) for n, s in failed))
+            still_failed = []
+            for (name, symbol), row in zip(failed, rows):
+                if row:
+                    success.append(row)
+                else:
+                    still_failed.append((name, symbol))
+            failed = still_failed
+
+        return {"success": success, "failed": failed}
+
+    def endpoint_stats(self):
+        return self.planner.stats()
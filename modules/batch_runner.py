@@ -0,0 +1,182 @@
+# modules/batch_runner.py
+
+"""
+Headless batch runner: liquidity metrics over many tick files in parallel.
+
+Each input file (CSV, or a tick archive directory written by
+tick_archive.write_archive) is processed in its own worker process with
+load_csv / TickArchive plus the liquidity_metrics functions, one output
+row per (file, symbol):
+
+    python -m modules.batch_runner "data/2025-*/*.csv" -o metrics.csv
+    python -m modules.batch_runner "archives/*.archive" --workers 8 -o metrics.parquet
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from modules.data_loader import compute_group_returns, load_csv
+from modules.liquidity_metrics import (
+    amihud_illiquidity,
+    bid_ask_spread,
+    kyles_lambda,
+    order_book_imbalance,
+)
+from modules.tick_archive import TickArchive
+
+
+RESULT_COLUMNS = [
+    "file", "symbol", "rows", "start", "end",
+    "bid_ask_spread", "amihud_illiquidity", "kyles_lambda", "order_book_imbalance",
+    "error",
+]
+
+
+# -----------------------------
+# Input discovery
+# -----------------------------
+def _is_archive(path: Path) -> bool:
+    return path.is_dir() and (path / "meta.json").is_file()
+
+
+def expand_inputs(patterns: Iterable[str]) -> List[str]:
+    """CSV files and archive directories matching any glob (recursive ``**`` allowed)."""
+    found = set()
+    for pattern in patterns:
+        for match in glob.glob(pattern, recursive=True):
+            path = Path(match)
+            if _is_archive(path) or (path.is_file() and path.name.lower().endswith((".csv", ".csv.gz"))):
+                found.add(str(path))
+    return sorted(found)
+
+
+# -----------------------------
+# Per-file work (runs in worker processes)
+# -----------------------------
+def _metric_row(data, symbol: str) -> Dict:
+    """All liquidity_metrics for one symbol's rows (DataFrame or archive view)."""
+    row = {"symbol": symbol, "rows": len(data)}
+
+    if "timestamp" in data:
+        times = pd.to_datetime(pd.Series(data["timestamp"]), errors="coerce").dropna()
+        if len(times):
+            row["start"], row["end"] = times.min(), times.max()
+
+    if "bid" in data and "ask" in data:
+        row["bid_ask_spread"] = bid_ask_spread(data)
+    if "volume" in data and ("returns" in data or "close" in data):
+        row["amihud_illiquidity"] = amihud_illiquidity(data)
+    if "returns" in data and "signed_volume" in data:
+        returns = np.asarray(data["returns"], dtype=np.float64)
+        signed = np.asarray(data["signed_volume"], dtype=np.float64)
+        valid = ~np.isnan(returns) & ~np.isnan(signed)
+        if valid.sum() >= 2:
+            row["kyles_lambda"] = kyles_lambda({"returns": returns[valid], "signed_volume": signed[valid]})
+    if "depth1" in data and "depth2" in data:
+        # Top-of-book sizes: depth1 = bid side, depth2 = ask side
+        bids = {"qty": np.nan_to_num(np.asarray(data["depth1"], dtype=np.float64))}
+        asks = {"qty": np.nan_to_num(np.asarray(data["depth2"], dtype=np.float64))}
+        if bids["qty"].sum() + asks["qty"].sum() > 0:
+            row["order_book_imbalance"] = order_book_imbalance(bids, asks)
+
+    return row
+
+
+def _csv_rows(path: str) -> List[Dict]:
+    df = load_csv(path)
+
+    # load_csv derives returns over the whole file in file order; redo them
+    # per symbol and in timestamp order
+    header = [c.lower().strip() for c in pd.read_csv(path, nrows=0).columns]
+    if "returns" not in header and "close" in df.columns:
+        keyed = df if "symbol" in df.columns else df.assign(symbol="")
+        df["returns"] = compute_group_returns(keyed)
+
+    if "symbol" not in df.columns or df["symbol"].nunique(dropna=True) <= 1:
+        symbol = str(df["symbol"].dropna().iloc[0]) if "symbol" in df.columns and df["symbol"].notna().any() else ""
+        return [_metric_row(df, symbol)]
+
+    return [_metric_row(group, str(symbol)) for symbol, group in df.groupby("symbol", sort=True)]
+
+
+def _archive_rows(path: str) -> List[Dict]:
+    archive = TickArchive(path)
+    return [_metric_row(archive.for_symbol(symbol), symbol) for symbol in archive.symbols]
+
+
+def process_file(path: str) -> List[Dict]:
+    """Metric rows for one input; failures come back as a row with ``error`` set."""
+    try:
+        rows = _archive_rows(path) if _is_archive(Path(path)) else _csv_rows(path)
+    except Exception as exc:
+        rows = [{"symbol": None, "rows": 0, "error": f"{type(exc).__name__}: {exc}"}]
+    return [{"file": path, **row} for row in rows]
+
+
+# -----------------------------
+# Driver
+# -----------------------------
+def run_batch(paths: List[str], workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Process ``paths`` across a pool of ``workers`` processes (default: all
+    cores) and merge the per-file rows into one table.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) <= 1:
+        results = [process_file(p) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+            results = list(pool.map(process_file, paths))
+
+    rows = [row for file_rows in results for row in file_rows]
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+
+def _write(table: pd.DataFrame, output: Optional[str]):
+    if output is None:
+        table.to_csv(sys.stdout, index=False)
+    elif output.endswith(".parquet"):
+        table.to_parquet(output, index=False)
+    else:
+        table.to_csv(output, index=False)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m modules.batch_runner",
+        description="Compute liquidity metrics for many CSV files / tick archives in parallel.",
+    )
+    parser.add_argument("patterns", nargs="+", help="Glob(s) of CSV files or archive directories (quote them).")
+    parser.add_argument("-o", "--output", help="Output .csv or .parquet (default: CSV on stdout).")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: all cores).")
+    args = parser.parse_args(argv)
+
+    paths = expand_inputs(args.patterns)
+    if not paths:
+        print("No input files matched.", file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+    table = run_batch(paths, workers=args.workers)
+    _write(table, args.output)
+
+    failed = int(table["error"].notna().sum())
+    print(
+        f"Processed {len(paths)} file(s), {len(table)} row(s) in {time.perf_counter() - started:.1f}s"
+        + (f"; {failed} failed" if failed else ""),
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
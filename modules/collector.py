@@ -0,0 +1,271 @@
+# modules/collector.py
+
+"""
+Background collector: polls each configured universe on its own schedule.
+
+One daemon thread per job fetches on a fixed interval derived from the
+provider's request budget, keeps the latest result in memory for the UI,
+and appends it to the local TickStore. Dashboards read collector.latest()
+instead of calling upstream, so upstream load is set by the schedule and
+not by how many sessions are open:
+
+    collector = Collector(store=get_store())
+    collector.add_job(snapshot_job("forex", ForexClient(), FOREX_PAIRS, provider="binance"))
+    collector.add_job(orderbook_job("binance_books", MarketAPI(BINANCE_URL), ["BTCUSDT"]))
+    collector.start()
+    result = collector.latest("forex")      # never blocks on the network
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from modules.polygon_client import ENDPOINT_PATHS, RETRY_PASSES
+from modules.rate_limiter import DEFAULT_LIMITS
+from modules.snapshot_batch import SnapshotBatch
+
+
+# Upstream requests per minute the schedules of one provider may spend.
+REQUEST_BUDGETS = {
+    # Same plan limit the rate limiter enforces (POLYGON_REQUESTS_PER_MINUTE)
+    "polygon": DEFAULT_LIMITS["polygon"]["rate"] * 60,
+    "binance": 600.0,
+    "india": 60.0,
+}
+
+# Worst-case upstream calls for one symbol per run, so budgets hold even
+# when every Polygon symbol walks the whole fallback chain and is retried.
+CALLS_PER_SYMBOL = {
+    "polygon": len(ENDPOINT_PATHS) * (1 + RETRY_PASSES),
+    "binance": 1,
+    "india": 1,
+}
+
+DEFAULT_INTERVAL = 10.0
+
+
+class CollectorJob:
+    """
+    - name: key for latest() / status()
+    - provider: budget the job draws from
+    - fetch: callable returning the value to publish
+    - calls: upstream requests one run costs
+    - persist: optional callable(store, value) run after each success
+    """
+
+    def __init__(
+        self,
+        name: str,
+        provider: str,
+        fetch: Callable[[], object],
+        calls: int = 1,
+        interval: float = DEFAULT_INTERVAL,
+        persist: Optional[Callable] = None,
+    ):
+        self.name = name
+        self.provider = provider
+        self.fetch = fetch
+        self.calls = max(1, int(calls))
+        self.interval = float(interval)
+        self.persist = persist
+
+
+class CollectorResult:
+    __slots__ = ("value", "fetched_at", "duration_ms", "error")
+
+    def __init__(self, value, fetched_at, duration_ms, error=None):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.duration_ms = duration_ms
+        self.error = error
+
+
+def snapshot_job(name: str, client, universe: Dict[str, str], provider: str, interval: float = DEFAULT_INTERVAL) -> CollectorJob:
+    """Poll ``client.fetch_batch(universe)``; publishes a SnapshotBatch."""
+    def persist(store, batch: SnapshotBatch):
+        if len(batch):
+            store.append_snapshots(batch.provider, batch.to_frame())
+
+    return CollectorJob(
+        name, provider, lambda: client.fetch_batch(universe),
+        calls=len(universe) * CALLS_PER_SYMBOL.get(provider, 1),
+        interval=interval, persist=persist,
+    )
+
+
+def orderbook_job(name: str, api, symbols: Sequence[str], limit: int = 50, interval: float = DEFAULT_INTERVAL) -> CollectorJob:
+    """Poll ``api.get_orderbook`` per symbol; publishes {symbol: (bids, asks)}."""
+    symbols = list(symbols)
+
+    def fetch():
+        books, errors = {}, []
+        for symbol in symbols:
+            try:
+                books[symbol] = api.get_orderbook(symbol, limit=limit)
+            except Exception as exc:
+                errors.append(f"{symbol}: {exc}")
+        if not books and errors:
+            raise RuntimeError("; ".join(errors))
+        return books
+
+    def persist(store, books):
+        for symbol, (bids, asks) in books.items():
+            store.append_book("binance", symbol, bids, asks)
+
+    return CollectorJob(name, "binance", fetch, calls=len(symbols), interval=interval, persist=persist)
+
+
+class Collector:
+    """
+    Budgeted background polling with an in-memory "latest" view.
+
+    - Jobs of one provider share its REQUEST_BUDGETS entry: intervals are
+      stretched at start() until their combined call rate fits
+    - Each job runs on its own daemon thread; a slow provider never
+      delays another
+    - Failures keep the previous value and are reported in status()
+    - Once per UTC day the store's finished days are compacted, and
+      stop() flushes its buffered appends
+    """
+
+    def __init__(self, store=None, budgets: Optional[Dict[str, float]] = None):
+        self.store = store
+        self.budgets = {**REQUEST_BUDGETS, **(budgets or {})}
+        self.jobs: Dict[str, CollectorJob] = {}
+
+        self._latest: Dict[str, CollectorResult] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._compacted_day = None
+        self.last_compaction: Optional[Dict] = None
+
+    def add_job(self, job: CollectorJob) -> "Collector":
+        if self._threads:
+            raise RuntimeError("Jobs must be added before the collector starts.")
+        self.jobs[job.name] = job
+        self._counts[job.name] = {"runs": 0, "errors": 0}
+        return self
+
+    # -----------------------------
+    # Scheduling
+    # -----------------------------
+    def _fit_budgets(self):
+        """Stretch intervals so each provider's jobs stay within budget."""
+        for provider in {job.provider for job in self.jobs.values()}:
+            jobs = [job for job in self.jobs.values() if job.provider == provider]
+            budget = self.budgets.get(provider)
+            if not budget:
+                continue
+            per_minute = sum(job.calls * 60.0 / job.interval for job in jobs)
+            if per_minute > budget:
+                scale = per_minute / budget
+                for job in jobs:
+                    job.interval *= scale
+
+    def start(self) -> "Collector":
+        if self._threads:
+            return self
+        self._fit_budgets()
+        self._stop.clear()
+        for job in self.jobs.values():
+            thread = threading.Thread(target=self._loop, args=(job,), name=f"collector-{job.name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        if self.store is not None:
+            self.store.flush()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._threads) and not self._stop.is_set()
+
+    def _loop(self, job: CollectorJob):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.run_once(job.name)
+            # Fixed-rate schedule: the fetch time counts toward the interval
+            self._stop.wait(max(0.0, job.interval - (time.monotonic() - started)))
+
+    def run_once(self, name: str) -> CollectorResult:
+        """Fetch one job now (also used by the polling threads)."""
+        job = self.jobs[name]
+        started = time.perf_counter()
+        try:
+            value = job.fetch()
+            error = None
+        except Exception as exc:
+            value, error = None, str(exc)
+        duration_ms = (time.perf_counter() - started) * 1000
+        fetched_at = pd.Timestamp.now(tz="UTC")
+
+        if error is None and self.store is not None and job.persist is not None:
+            try:
+                job.persist(self.store, value)
+            except Exception as exc:
+                error = f"persist failed: {exc}"
+            self._maybe_compact()
+
+        with self._lock:
+            counts = self._counts[name]
+            counts["runs"] += 1
+            if value is None:
+                counts["errors"] += 1
+                previous = self._latest.get(name)
+                # Keep serving the last good value, flagged with the error
+                result = CollectorResult(
+                    previous.value if previous else None,
+                    previous.fetched_at if previous else None,
+                    duration_ms, error,
+                )
+            else:
+                result = CollectorResult(value, fetched_at, duration_ms, error)
+            self._latest[name] = result
+        return result
+
+    def _maybe_compact(self):
+        """Merge the store's per-flush parts of finished days, once per UTC day."""
+        day = pd.Timestamp.now(tz="UTC").date()
+        with self._lock:
+            if self._compacted_day == day:
+                return
+            self._compacted_day = day
+
+        try:
+            result = {kind: self.store.compact(kind) for kind in ("snapshots", "books")}
+        except Exception as exc:
+            result = {"error": str(exc)}
+        self.last_compaction = {"day": day, **result}
+
+    # -----------------------------
+    # Reads (never block on upstream)
+    # -----------------------------
+    def latest(self, name: str) -> Optional[CollectorResult]:
+        with self._lock:
+            return self._latest.get(name)
+
+    def status(self) -> pd.DataFrame:
+        with self._lock:
+            rows = []
+            for name, job in self.jobs.items():
+                result = self._latest.get(name)
+                rows.append({
+                    "job": name,
+                    "provider": job.provider,
+                    "interval_s": round(job.interval, 1),
+                    "runs": self._counts[name]["runs"],
+                    "errors": self._counts[name]["errors"],
+                    "last_fetch": result.fetched_at if result else None,
+                    "last_duration_ms": round(result.duration_ms, 1) if result else None,
+                    "last_error": result.error if result else None,
+                })
+        return pd.DataFrame(rows)
@@ -1,5 +1,27 @@
+import numpy as np
 import pandas as pd
 
+from modules.instrumentation import timed
+from modules.liquidity_metrics import OnlineLiquidityMetrics
+
+# Explicit dtypes for the numeric tick columns (lowercase names)
+NUMERIC_DTYPES = {
+    'bid': 'float64',
+    'ask': 'float64',
+    'close': 'float64',
+    'volume': 'float64',
+    'returns': 'float64',
+    'signed_volume': 'float64',
+    'expected_price': 'float64',
+    'execution_price': 'float64',
+    'execution_time_ms': 'float64',
+    'depth1': 'float64',
+    'depth2': 'float64',
+    'depth3': 'float64',
+}
+
+
+@timed("data_loader.load_csv")
 def load_csv(file):
     df = pd.read_csv(file)
 
@@ -16,3 +38,76 @@ def compute_returns(df):
     if 'returns' not in df.columns and 'close' in df.columns:
         df['returns'] = df['close'].pct_change()
     return df
+
+
+def compute_group_returns(df, by='symbol', time_col='timestamp'):
+    """
+    'close' returns per ``by`` group, in time order, aligned to ``df``'s rows.
+
+    The first row of every group is NaN, so no return spans two symbols
+    (unlike the whole-file pct_change done by load_csv).
+    """
+    frame = pd.DataFrame({by: df[by].to_numpy(), 'close': df['close'].to_numpy(dtype=float)})
+    if time_col in df.columns:
+        times = pd.to_datetime(df[time_col], errors='coerce').to_numpy()
+        frame = frame.iloc[np.argsort(times, kind='stable')]
+    returns = frame.groupby(by, sort=False)['close'].pct_change(fill_method=None).sort_index()
+    return pd.Series(returns.to_numpy(), index=df.index, name='returns')
+
+
+# -----------------------------
+# Streaming ingestion
+# -----------------------------
+def _header_dtypes(file, dtypes):
+    """Map the file's raw header names to dtypes keyed by lowercase name."""
+    header = pd.read_csv(file, nrows=0).columns
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    return {c: dtypes[c.lower().strip()] for c in header if c.lower().strip() in dtypes}
+
+
+def iter_csv_chunks(file, chunksize=500_000, dtypes=None):
+    """
+    Yield standardized chunks of a CSV without loading the whole file.
+
+    - Numeric columns are parsed with explicit dtypes
+    - Column names are lowercased like load_csv
+    - 'returns' is computed per chunk with the previous chunk's last
+      'close' carried over, so values match a single pct_change(); with a
+      'symbol' column the carry and the returns are per symbol, matching
+      compute_group_returns() on a file in time order
+    """
+    dtype = _header_dtypes(file, dtypes or NUMERIC_DTYPES)
+    prev_close = {}   # symbol (None without a symbol column) -> last close
+
+    for chunk in pd.read_csv(file, chunksize=chunksize, dtype=dtype):
+        chunk.columns = [c.lower().strip() for c in chunk.columns]
+
+        if 'returns' not in chunk.columns and 'close' in chunk.columns:
+            close = chunk['close']
+            keys = chunk['symbol'] if 'symbol' in chunk.columns else pd.Series(None, index=chunk.index, dtype=object)
+            previous = close.groupby(keys, sort=False, dropna=False).shift(1)
+
+            first = ~keys.duplicated(keep='first')
+            previous[first] = keys[first].map(lambda k: prev_close.get(k, np.nan)).astype(float)
+            chunk['returns'] = close / previous - 1
+
+            last = ~keys.duplicated(keep='last')
+            prev_close.update(zip(keys[last], close[last]))
+
+        yield chunk
+
+
+@timed("data_loader.stream_csv_metrics")
+def stream_csv_metrics(file, chunksize=500_000):
+    """
+    Compute liquidity metrics over a CSV of any size in constant memory.
+
+    Returns a dict of metric name → value plus the number of rows read.
+    """
+    online = OnlineLiquidityMetrics()
+
+    for chunk in iter_csv_chunks(file, chunksize=chunksize):
+        online.update(chunk)
+
+    return {**online.value(), "Rows": online.rows}
@@ -0,0 +1,123 @@
+# modules/decimation.py
+
+"""
+Point-count reduction for long time-series charts.
+
+- minmax_indices: keep the min and max of each bucket (fully vectorized,
+  preserves every spike)
+- lttb_indices: Largest-Triangle-Three-Buckets (visually faithful shape)
+- decimate_frame: pick rows of a DataFrame for plotting, optionally inside
+  an x range so a zoomed view is re-decimated at full resolution
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _as_float(x) -> np.ndarray:
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def minmax_indices(y, n_buckets: int) -> np.ndarray:
+    """
+    Indices of the min and max y in each of ``n_buckets`` equal-size
+    buckets (plus first and last point), in ascending order: at most
+    ``2 * n_buckets + 2`` of them.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = y.size
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+
+    size = int(np.ceil(n / n_buckets))
+    n_buckets = int(np.ceil(n / size))
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    grid = padded.reshape(n_buckets, size)
+
+    # All-NaN buckets fall back to their first row
+    filled = np.where(np.isnan(grid), np.inf, grid)
+    lo = np.argmin(filled, axis=1)
+    filled = np.where(np.isnan(grid), -np.inf, grid)
+    hi = np.argmax(filled, axis=1)
+
+    offsets = np.arange(n_buckets) * size
+    idx = np.concatenate(([0, n - 1], offsets + lo, offsets + hi))
+    return np.unique(idx[idx < n])
+
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling to ``n_out`` points.
+
+    Per-bucket triangle areas are vectorized; only the bucket walk (which
+    depends on the previously chosen point) is a Python loop of n_out steps.
+    """
+    x = _as_float(x)
+    y = np.asarray(y, dtype=np.float64)
+    n = y.size
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Bucket boundaries for the n - 2 interior points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        if next_end <= next_start:
+            next_end = min(next_start + 1, n)
+
+        # Average of the next bucket is the third triangle vertex
+        avg_x = np.nanmean(x[next_start:next_end])
+        avg_y = np.nanmean(y[next_start:next_end])
+
+        bx = x[start:end]
+        by = y[start:end]
+        area = np.abs((x[a] - avg_x) * (by - y[a]) - (x[a] - bx) * (avg_y - y[a]))
+        area = np.where(np.isnan(area), -1.0, area)
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+def decimate_frame(df, x, y, max_points=2000, method="minmax", x_range=None):
+    """
+    Rows of ``df`` to plot for column ``y`` against ``x``.
+
+    Args:
+        max_points: cap on returned rows (roughly the chart's pixel width).
+        method: "minmax" (keeps spikes) or "lttb" (keeps shape).
+        x_range: optional (start, end); rows outside are dropped first,
+            so zooming in re-decimates the visible slice at full detail.
+    """
+    xs = df[x]
+    if x_range is not None:
+        parsed = pd.to_datetime(xs, errors="coerce") if not pd.api.types.is_numeric_dtype(xs) else xs
+        start, end = x_range
+        df = df[(parsed >= start) & (parsed <= end)]
+
+    if len(df) <= max_points:
+        return df
+
+    if max_points < 4:
+        # Too few points for buckets: evenly spaced rows
+        idx = np.unique(np.linspace(0, len(df) - 1, max_points).round().astype(np.int64))
+    elif method == "lttb":
+        x_values = df[x]
+        if not pd.api.types.is_numeric_dtype(x_values):
+            x_values = pd.to_datetime(x_values, errors="coerce")
+        idx = lttb_indices(x_values.to_numpy(), df[y].to_numpy(dtype=float), max_points)
+    else:
+        # Two points per bucket, with the first and last row reserved
+        idx = minmax_indices(df[y].to_numpy(dtype=float), (max_points - 2) // 2)
+
+    return df.iloc[idx]
@@ -0,0 +1,133 @@
+# modules/depth_analytics.py
+
+"""
+Vectorized execution-cost analytics over full order-book depth.
+
+All functions take price/qty arrays ordered from the best level outward
+(bids descending, asks ascending, as returned by MarketAPI.get_orderbook)
+and run in one pass with cumsum + searchsorted. Notional and bps
+arguments may be scalars or arrays.
+"""
+
+from typing import Dict, Sequence, Tuple, Union
+
+import numpy as np
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+
+def _arrays(side) -> Tuple[np.ndarray, np.ndarray]:
+    """Accept a (prices, qtys) pair or a DataFrame with price/qty columns."""
+    if hasattr(side, "columns"):
+        return side["price"].to_numpy(dtype=np.float64), side["qty"].to_numpy(dtype=np.float64)
+    prices, qtys = side
+    return np.asarray(prices, dtype=np.float64), np.asarray(qtys, dtype=np.float64)
+
+
+def mid_price(bids, asks) -> float:
+    bid_p, _ = _arrays(bids)
+    ask_p, _ = _arrays(asks)
+    if bid_p.size == 0 or ask_p.size == 0:
+        return np.nan
+    return (bid_p[0] + ask_p[0]) / 2
+
+
+# -----------------------------
+# Depth curves
+# -----------------------------
+def cumulative_depth(side) -> Dict[str, np.ndarray]:
+    """Cumulative quantity and notional from the best level outward."""
+    prices, qtys = _arrays(side)
+    return {
+        "price": prices,
+        "cum_qty": np.cumsum(qtys),
+        "cum_notional": np.cumsum(prices * qtys),
+    }
+
+
+def depth_within_bps(side, mid: float, bps: ArrayLike) -> np.ndarray:
+    """
+    Quantity resting within ``bps`` basis points of ``mid`` on one side.
+
+    Works for either side: distance is measured as |price - mid|.
+    """
+    prices, qtys = _arrays(side)
+    cum_qty = np.concatenate(([0.0], np.cumsum(qtys)))
+    distance = np.abs(prices - mid) / mid * 1e4
+
+    # Distance grows monotonically from the best level outward
+    idx = np.searchsorted(distance, np.atleast_1d(np.asarray(bps, dtype=np.float64)), side="right")
+    return cum_qty[idx]
+
+
+# -----------------------------
+# Sweeps
+# -----------------------------
+def vwap_to_fill(side, notional: ArrayLike) -> Dict[str, np.ndarray]:
+    """
+    Sweep one side of the book for a quote-currency ``notional``.
+
+    Returns arrays (one entry per notional):
+        vwap        average fill price
+        qty         base quantity filled
+        worst_price last level touched
+        filled      fraction of the notional the book could absorb (<= 1)
+    """
+    prices, qtys = _arrays(side)
+    target = np.atleast_1d(np.asarray(notional, dtype=np.float64))
+
+    if prices.size == 0:
+        nan = np.full(target.shape, np.nan)
+        return {"vwap": nan, "qty": nan, "worst_price": nan, "filled": np.zeros(target.shape)}
+
+    level_notional = prices * qtys
+    cum_notional = np.concatenate(([0.0], np.cumsum(level_notional)))
+    cum_qty = np.concatenate(([0.0], np.cumsum(qtys)))
+    book_notional = cum_notional[-1]
+
+    # k = first level whose cumulative notional reaches the target
+    capped = np.minimum(target, book_notional)
+    k = np.clip(np.searchsorted(cum_notional[1:], capped, side="left"), 0, prices.size - 1)
+
+    remaining = capped - cum_notional[k]
+    qty = cum_qty[k] + remaining / prices[k]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vwap = np.where(qty > 0, capped / qty, prices[0])
+        filled = np.where(target > 0, capped / target, 1.0)
+
+    return {"vwap": vwap, "qty": qty, "worst_price": prices[k], "filled": filled}
+
+
+def market_impact(bids, asks, notional: ArrayLike) -> Dict[str, np.ndarray]:
+    """
+    Slippage and market impact of buy (sweeps asks) and sell (sweeps bids)
+    orders of ``notional``, in basis points relative to mid.
+
+    - slippage: VWAP vs mid
+    - impact:   worst level touched vs mid
+    """
+    mid = mid_price(bids, asks)
+    buy = vwap_to_fill(asks, notional)
+    sell = vwap_to_fill(bids, notional)
+
+    return {
+        "mid": mid,
+        "buy_vwap": buy["vwap"],
+        "sell_vwap": sell["vwap"],
+        "buy_slippage_bps": (buy["vwap"] - mid) / mid * 1e4,
+        "sell_slippage_bps": (mid - sell["vwap"]) / mid * 1e4,
+        "buy_impact_bps": (buy["worst_price"] - mid) / mid * 1e4,
+        "sell_impact_bps": (mid - sell["worst_price"]) / mid * 1e4,
+        "buy_filled": buy["filled"],
+        "sell_filled": sell["filled"],
+    }
+
+
+def depth_imbalance_within_bps(bids, asks, bps: ArrayLike) -> np.ndarray:
+    """order_book_imbalance restricted to levels within ``bps`` of mid."""
+    mid = mid_price(bids, asks)
+    bid_qty = depth_within_bps(bids, mid, bps)
+    ask_qty = depth_within_bps(asks, mid, bps)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (bid_qty - ask_qty) / (bid_qty + ask_qty)
@@ -0,0 +1,156 @@
+# modules/depth_parser.py
+
+"""
+Direct-to-array parsing of /api/v3/depth payloads.
+
+    book = parse_depth("BTCUSDT", response.content)
+    book.bids            # (n, 2) float64 [price, qty], contiguous
+    book.best_bid()      # no DataFrame built
+    bids_df, asks_df = book.frames()   # built once, on demand
+
+The ``[["price", "qty"], ...]`` string pairs are converted in one pass
+into a preallocated float64 buffer. Bodies are decoded with orjson when
+it is installed and the standard json module otherwise.
+"""
+
+import json
+from itertools import chain
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from modules.instrumentation import timer
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+COLUMNS = ["price", "qty"]
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+
+def loads(body: Union[bytes, str]):
+    """Decode a JSON body with the fastest available backend."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def levels_to_array(levels) -> np.ndarray:
+    """
+    ``[[price, qty], ...]`` (strings or numbers) -> (n, 2) float64.
+
+    Short rows and unparseable values are dropped, matching the previous
+    ``pd.to_numeric(errors="coerce")`` + ``dropna`` behaviour; rows with
+    more than two fields raise ValueError, as building the old
+    ``DataFrame(columns=["price", "qty"])`` did.
+    """
+    n = len(levels)
+    if n == 0:
+        return np.empty((0, 2), dtype=np.float64)
+    try:
+        regular = all(len(row) == 2 for row in levels)
+    except TypeError:
+        regular = False
+
+    if regular:
+        try:
+            out = np.fromiter(map(float, chain.from_iterable(levels)), dtype=np.float64, count=2 * n).reshape(n, 2)
+            if np.isnan(out).any():
+                out = out[~np.isnan(out).any(axis=1)]
+            return out
+        except (TypeError, ValueError):
+            pass
+
+    # Slow path: short or non-sequence rows and non-numeric strings
+    out = np.full((n, 2), np.nan)
+    for i, row in enumerate(levels):
+        if isinstance(row, (list, tuple)) and len(row) > 2:
+            raise ValueError(f"Depth level has {len(row)} fields, expected [price, qty]: {row!r}")
+        try:
+            out[i, 0] = float(row[0])
+            out[i, 1] = float(row[1])
+        except (TypeError, ValueError, IndexError):
+            pass
+    return out[~np.isnan(out).any(axis=1)]
+
+
+class DepthBook:
+    """
+    One depth snapshot held as NumPy arrays.
+
+    - bids / asks: (n, 2) float64 [price, qty] in exchange order
+      (bids descending, asks ascending)
+    - DataFrames are built only when frames() / bids_df / asks_df is used,
+      then cached; they wrap the arrays without copying
+    - Unpacks like the old return value: ``bids_df, asks_df = book``
+    """
+
+    __slots__ = ("symbol", "last_update_id", "bids", "asks", "_frames")
+
+    def __init__(self, symbol: str, bids: np.ndarray, asks: np.ndarray, last_update_id: Optional[int] = None):
+        self.symbol = symbol
+        self.bids = bids
+        self.asks = asks
+        self.last_update_id = last_update_id
+        self._frames = None
+
+    def frames(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        if self._frames is None:
+            self._frames = (
+                pd.DataFrame(self.bids, columns=COLUMNS, copy=False),
+                pd.DataFrame(self.asks, columns=COLUMNS, copy=False),
+            )
+        return self._frames
+
+    @property
+    def bids_df(self) -> pd.DataFrame:
+        return self.frames()[0]
+
+    @property
+    def asks_df(self) -> pd.DataFrame:
+        return self.frames()[1]
+
+    def __iter__(self):
+        return iter(self.frames())
+
+    def best_bid(self) -> Optional[float]:
+        return float(self.bids[0, 0]) if len(self.bids) else None
+
+    def best_ask(self) -> Optional[float]:
+        return float(self.asks[0, 0]) if len(self.asks) else None
+
+    def __repr__(self):
+        return f"DepthBook({self.symbol!r}, bids={len(self.bids)}, asks={len(self.asks)})"
+
+
+def parse_depth(symbol: str, payload) -> DepthBook:
+    """
+    Validate a depth payload (raw bytes / str or already decoded dict)
+    and convert both sides to float64 arrays.
+
+    Raises:
+        RuntimeError: Binance error payload ({"code": ..., "msg": ...})
+        KeyError: bids / asks missing
+    """
+    if isinstance(payload, (bytes, bytearray, memoryview, str)):
+        with timer("json.decode", provider="binance"):
+            payload = loads(payload)
+
+    # Binance error payload pattern: {"code": ..., "msg": "..."}
+    if isinstance(payload, dict) and "code" in payload and "msg" in payload and "bids" not in payload:
+        raise RuntimeError(f"API error for {symbol}: code={payload.get('code')} msg={payload.get('msg')}")
+
+    if "bids" not in payload or "asks" not in payload:
+        raise KeyError(f"Orderbook keys missing for {symbol}. Response keys: {list(payload.keys())}")
+
+    return DepthBook(
+        symbol,
+        levels_to_array(payload["bids"]),
+        levels_to_array(payload["asks"]),
+        payload.get("lastUpdateId"),
+    )
@@ -4,6 +4,67 @@ from typing import Dict, List
 import pandas as pd  # noqa
 
 from modules.api_client import MarketAPI
+from modules.depth_analytics import depth_within_bps, market_impact
+from modules.rate_limiter import INTERACTIVE
+from modules.snapshot_batch import SnapshotBatch
+
+# Order size (quote currency) used for the slippage estimate in each snapshot
+DEFAULT_IMPACT_NOTIONAL = 10_000.0
+
+
+def _safe_float(value):
+    """Convert numpy/pandas scalar → Python float safely."""
+    try:
+        if hasattr(value, "item"):
+            return float(value.item())
+        return float(value)
+    except Exception:
+        return None
+
+
+def snapshot_from_orderbook(symbol: str, bids, asks, notional: float = DEFAULT_IMPACT_NOTIONAL) -> Dict:
+    """
+    Build the FX snapshot row from the full book (shared by sync/async clients).
+
+    Besides top-of-book, the row carries execution-cost estimates from a
+    sweep of ``notional`` (quote currency) through the downloaded levels:
+    expected_price is the mid, execution_price the buy VWAP.
+    """
+    has_bids = bids is not None and not bids.empty
+    has_asks = asks is not None and not asks.empty
+
+    top_bid = _safe_float(bids.iloc[0, 0]) if has_bids else None
+    top_ask = _safe_float(asks.iloc[0, 0]) if has_asks else None
+
+    spread = (top_ask - top_bid) if (top_bid is not None and top_ask is not None) else None
+
+    row = {
+        "symbol": symbol,
+        "bid": top_bid,
+        "ask": top_ask,
+        "spread": spread,
+        "depth1": _safe_float(bids.iloc[0, 1]) if has_bids else 0,
+        "depth2": _safe_float(asks.iloc[0, 1]) if has_asks else 0,
+        "expected_price": None,
+        "execution_price": None,
+        "buy_slippage_bps": None,
+        "sell_slippage_bps": None,
+        "depth_10bps": None,
+        "timestamp": "Live FX (Binance)",
+    }
+
+    if has_bids and has_asks:
+        impact = market_impact(bids, asks, notional)
+        mid = impact["mid"]
+        row["expected_price"] = _safe_float(mid)
+        row["execution_price"] = _safe_float(impact["buy_vwap"][0])
+        row["buy_slippage_bps"] = _safe_float(impact["buy_slippage_bps"][0])
+        row["sell_slippage_bps"] = _safe_float(impact["sell_slippage_bps"][0])
+        row["depth_10bps"] = _safe_float(
+            depth_within_bps(bids, mid, 10)[0] + depth_within_bps(asks, mid, 10)[0]
+        )
+
+    return row
 
 
 class ForexClient:
@@ -15,45 +76,24 @@ class ForexClient:
     - Never silently swallows structure errors
     """
 
-    def __init__(self):
-        self.api = MarketAPI("https://api.binance.com")
-
-    def _safe_float(self, value):
-        """Convert numpy/pandas scalar → Python float safely."""
-        try:
-            if hasattr(value, "item"):
-                return float(value.item())
-            return float(value)
-        except Exception:
-            return None
+    def __init__(self, transport=None, cache=None, impact_notional=DEFAULT_IMPACT_NOTIONAL, priority=INTERACTIVE):
+        # Caching happens at the orderbook level inside MarketAPI
+        self.api = MarketAPI("https://api.binance.com", transport=transport, cache=cache, priority=priority)
+        self.impact_notional = impact_notional
 
     def fetch_snapshot(self, symbol: str) -> Dict:
         """
         Fetch a single FX snapshot from Binance orderbook.
 
         Returns a dict with:
-            symbol, bid, ask, spread, timestamp
+            symbol, bid, ask, spread, depth1, depth2, expected_price,
+            execution_price, buy/sell_slippage_bps, depth_10bps, timestamp
 
         Raises:
             Any exception propagated from MarketAPI if orderbook is invalid.
         """
         bids, asks = self.api.get_orderbook(symbol)
-
-        has_bids = bids is not None and not bids.empty
-        has_asks = asks is not None and not asks.empty
-
-        top_bid = self._safe_float(bids.iloc[0, 0]) if has_bids else None
-        top_ask = self._safe_float(asks.iloc[0, 0]) if has_asks else None
-
-        spread = (top_ask - top_bid) if (top_bid is not None and top_ask is not None) else None
-
-        return {
-            "symbol": symbol,
-            "bid": top_bid,
-            "ask": top_ask,
-            "spread": spread,
-            "timestamp": "Live FX (Binance)",
-        }
+        return snapshot_from_orderbook(symbol, bids, asks, self.impact_notional)
 
     def fetch_multiple(self, pairs: Dict[str, str]) -> Dict[str, List]:
         """
@@ -77,3 +117,13 @@ class ForexClient:
                 failed.append((name, symbol))
 
         return {"success": success, "failed": failed}
+
+    def fetch_batch(self, pairs: Dict[str, str]) -> SnapshotBatch:
+        """
+        Like fetch_multiple, but returns a columnar SnapshotBatch.
+
+        Still one order-book request per pair, fetched in turn; only the
+        derived fields and quality tags are computed as whole columns.
+        """
+        result = self.fetch_multiple(pairs)
+        return SnapshotBatch.from_rows(result["success"], provider="binance", failed=result["failed"])
@@ -0,0 +1,198 @@
+# modules/http_transport.py
+
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from modules import instrumentation
+from modules.rate_limiter import INTERACTIVE, get_rate_limiter
+from modules.singleflight import SingleFlight
+
+
+def _flight_key(url: str, params: Optional[dict], kwargs: dict):
+    """
+    SingleFlight key for a GET, or None if its response must not be shared.
+
+    Headers (and any other request options) are part of the key, so calls
+    made with different credentials never share a response. ``auth``
+    objects cannot be compared by value and opt out of coalescing.
+    """
+    if kwargs.get("stream") or kwargs.get("auth") is not None:
+        return None
+    headers = tuple(sorted((str(k).lower(), str(v)) for k, v in (kwargs.get("headers") or {}).items()))
+    options = tuple(sorted((k, repr(v)) for k, v in kwargs.items() if k != "headers"))
+    return (url, tuple(sorted((params or {}).items())), headers, options)
+
+
+class HttpTransport:
+    """
+    Shared HTTP transport for the market clients.
+
+    - One requests.Session per host, so TCP/TLS connections are kept alive
+      and reused across calls instead of re-handshaking every request
+    - Tunable connection-pool size per host
+    - Default timeout applied to every request
+    - Retries on connection errors and 5xx responses with jittered
+      exponential backoff
+    - Identical concurrent GETs (same URL, params and headers) are
+      coalesced into one upstream request whose response is shared by
+      all callers
+    - Every upstream request first takes tokens from the provider's rate
+      limiter; 429 responses are retried after the limiter's backoff
+      (pass ``rate_limiter=False`` to disable throttling)
+    """
+
+    def __init__(
+        self,
+        pool_maxsize: int = 32,
+        timeout: float = 10,
+        retries: int = 3,
+        backoff_factor: float = 0.3,
+        backoff_jitter: float = 0.2,
+        status_forcelist=(500, 502, 503, 504),
+        coalesce: bool = True,
+        rate_limiter=None,
+    ):
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.backoff_jitter = backoff_jitter
+        self.status_forcelist = tuple(status_forcelist)
+        self.coalesce = coalesce
+        self.limiter = get_rate_limiter() if rate_limiter is None else (rate_limiter or None)
+
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    def _retry(self) -> Retry:
+        kwargs = dict(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=self.status_forcelist,
+            allowed_methods=frozenset(["GET"]),
+            # Hand the final response back so callers can inspect the status
+            raise_on_status=False,
+            # 429 Retry-After is handled by the rate limiter, not by sleeping here
+            respect_retry_after_header=self.limiter is None,
+        )
+        try:
+            return Retry(backoff_jitter=self.backoff_jitter, **kwargs)
+        except TypeError:
+            # urllib3 < 2 has no jitter support
+            return Retry(**kwargs)
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=self._retry(),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def session_for(self, url: str) -> requests.Session:
+        """Return the keep-alive session for the URL's host, creating it once."""
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    session = self._new_session()
+                    self._sessions[host] = session
+        return session
+
+    def _send(self, session: requests.Session, url: str, **kwargs):
+        """One upstream GET; with instrumentation on, also records latency,
+        time to headers and new connections (each one a DNS + TCP + TLS setup)."""
+        if not instrumentation.is_enabled():
+            return session.get(url, **kwargs)
+
+        host = urlsplit(url).netloc
+        pool = session.get_adapter(url).poolmanager.connection_from_url(url)
+        opened = pool.num_connections
+
+        with instrumentation.timer("http.get", host=host):
+            response = session.get(url, **kwargs)
+
+        if pool.num_connections > opened:
+            instrumentation.count("http.new_connections", pool.num_connections - opened, host=host)
+        instrumentation.observe("http.time_to_headers", response.elapsed.total_seconds(), host=host)
+        instrumentation.count("http.responses", host=host, status=response.status_code)
+        return response
+
+    def get(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        timeout: Optional[float] = None,
+        priority: str = INTERACTIVE,
+        **kwargs,
+    ):
+        """
+        GET through the pooled session for the URL's host.
+
+        ``priority`` is INTERACTIVE (user-facing) or BULK (background
+        refreshes); bulk requests yield to interactive ones under load.
+        """
+        session = self.session_for(url)
+
+        def send():
+            if self.limiter is None:
+                return self._send(session, url, params=params, timeout=timeout or self.timeout, **kwargs)
+
+            for attempt in range(self.retries + 1):
+                waited = self.limiter.acquire(url, params, priority)
+                if waited:
+                    instrumentation.observe("rate_limiter.wait", waited, host=urlsplit(url).netloc)
+                response = self._send(session, url, params=params, timeout=timeout or self.timeout, **kwargs)
+                self.limiter.observe(url, response.status_code, response.headers)
+                # 418 means banned until Retry-After: never hammer it
+                if response.status_code != 429 or attempt == self.retries:
+                    return response
+                response.close()
+            return response
+
+        # Streamed bodies can only be read once, so they are never shared
+        key = _flight_key(url, params, kwargs) if self.coalesce else None
+        if key is None:
+            return send()
+        return self._flight.do(key, send)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+# -----------------------------
+# Process-wide default transport
+# -----------------------------
+_default_transport: Optional[HttpTransport] = None
+_default_lock = threading.Lock()
+
+
+def get_transport() -> HttpTransport:
+    """
+    Return the transport shared by every client that was not given one.
+
+    LIQUIDITY_RECORD / LIQUIDITY_REPLAY swap in a cassette transport.
+    """
+    global _default_transport
+    if _default_transport is None:
+        with _default_lock:
+            if _default_transport is None:
+                from modules.replay_transport import transport_from_env
+                _default_transport = transport_from_env() or HttpTransport()
+    return _default_transport
@@ -11,11 +11,15 @@ This removes all Pylance errors and keeps the app stable.
 
 from typing import Dict, List
 
+from modules.snapshot_batch import SnapshotBatch
+from modules.snapshot_cache import client_key
+
 
 class IndiaClient:
-    def __init__(self, client_id: str, access_token: str):
+    def __init__(self, client_id: str, access_token: str, cache=None):
         self.client_id = client_id
         self.access_token = access_token
+        self.cache = cache
 
     def _placeholder_row(self, security_id: str) -> Dict:
         return {
@@ -41,7 +45,12 @@ class IndiaClient:
         Always return a placeholder row.
         Never return None.
         """
-        return self._placeholder_row(security_id)
+        if self.cache is None:
+            return self._placeholder_row(security_id)
+        return self.cache.get_or_fetch(
+            "india", "snapshot", security_id, lambda: self._placeholder_row(security_id),
+            client=client_key(self.client_id, self.access_token),
+        )
 
     def fetch_multiple(self, companies: Dict[str, str]) -> Dict[str, List]:
         """
@@ -56,6 +65,21 @@ class IndiaClient:
 
         return {"success": success, "failed": []}
 
+    def fetch_batch(self, companies: Dict[str, str]) -> SnapshotBatch:
+        """
+        Placeholder SnapshotBatch for all companies (every field NaN).
+        """
+        n = len(companies)
+        return SnapshotBatch(
+            provider="india",
+            symbols=list(companies.values()),
+            names=list(companies.keys()),
+            fields={},
+            timestamps=["KYC Pending"] * n,
+            execution_time_ms=0,
+            status=["KYC Pending"] * n,
+        )
+
 
 
 
@@ -0,0 +1,262 @@
+# modules/instrumentation.py
+
+"""
+Lightweight stage timers and counters for the hot paths.
+
+    @timed("data_loader.load_csv")
+    def load_csv(file): ...
+
+    with timer("polygon.endpoint", endpoint=name):
+        ...
+
+    count("http.new_connections", host="api.polygon.io")
+
+Disabled by default (set LIQUIDITY_INSTRUMENTATION=1 or call enable()).
+When disabled a timed call costs one attribute check and timer() returns
+a shared no-op context, so the decorators can stay on production paths.
+
+Exports: to_prometheus() (text exposition format) and to_json().
+"""
+
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+# Histogram bucket upper bounds in seconds (Prometheus "le" labels).
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Recent samples kept per timer for p50 / p99 in snapshot().
+SAMPLE_SIZE = 1024
+
+
+class _State:
+    enabled = os.environ.get("LIQUIDITY_INSTRUMENTATION", "").lower() in ("1", "true", "yes", "on")
+
+
+_state = _State()
+
+
+def enable():
+    _state.enabled = True
+
+
+def disable():
+    _state.enabled = False
+
+
+def is_enabled() -> bool:
+    return _state.enabled
+
+
+def _key(stage: str, labels: Dict[str, object]) -> Tuple:
+    return (stage, tuple(sorted((k, str(v)) for k, v in labels.items())))
+
+
+class _TimerStats:
+    __slots__ = ("count", "errors", "total", "max", "buckets", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+
+
+class Registry:
+    """Thread-safe store of timer and counter series keyed by (name, labels)."""
+
+    def __init__(self):
+        self._timers: Dict[Tuple, _TimerStats] = {}
+        self._counters: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key: Tuple, seconds: float, error: bool = False):
+        with self._lock:
+            stats = self._timers.get(key)
+            if stats is None:
+                stats = self._timers[key] = _TimerStats()
+            stats.count += 1
+            stats.errors += error
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+            stats.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+            stats.samples.append(seconds)
+
+    def inc(self, key: Tuple, value: float = 1.0):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+    # -----------------------------
+    # Export
+    # -----------------------------
+    def snapshot(self) -> Dict[str, List[Dict]]:
+        """Plain-dict view: per-stage count / mean / p50 / p99 / max, and counters."""
+        with self._lock:
+            timers = []
+            for (stage, labels), stats in self._timers.items():
+                samples = np.fromiter(stats.samples, dtype=np.float64)
+                timers.append({
+                    "stage": stage,
+                    **dict(labels),
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "total_ms": stats.total * 1e3,
+                    "mean_ms": stats.total / stats.count * 1e3,
+                    "p50_ms": float(np.percentile(samples, 50)) * 1e3,
+                    "p99_ms": float(np.percentile(samples, 99)) * 1e3,
+                    "max_ms": stats.max * 1e3,
+                })
+            counters = [
+                {"event": name, **dict(labels), "value": value}
+                for (name, labels), value in self._counters.items()
+            ]
+        timers.sort(key=lambda row: row["total_ms"], reverse=True)
+        return {"timers": timers, "counters": counters}
+
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix: str = "liquidity") -> str:
+        """Prometheus text exposition: one histogram family per stage, plus counters."""
+        def fmt(labels):
+            body = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+            return "{" + body + "}" if body else ""
+
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent per pipeline stage.",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        errors = []
+        with self._lock:
+            for (stage, labels), stats in sorted(self._timers.items()):
+                series = (("stage", stage),) + labels
+                cumulative = 0
+                for bound, n in zip(BUCKETS + (float("inf"),), stats.buckets):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{prefix}_stage_seconds_bucket{fmt(series + (('le', le),))} {cumulative}")
+                lines.append(f"{prefix}_stage_seconds_sum{fmt(series)} {stats.total!r}")
+                lines.append(f"{prefix}_stage_seconds_count{fmt(series)} {stats.count}")
+                errors.append(f"{prefix}_stage_errors_total{fmt(series)} {stats.errors}")
+
+            lines += [f"# HELP {prefix}_stage_errors_total Stage calls that raised.",
+                      f"# TYPE {prefix}_stage_errors_total counter"] + errors
+            lines += [f"# HELP {prefix}_events_total Event counters.",
+                      f"# TYPE {prefix}_events_total counter"]
+            for (name, labels), value in sorted(self._counters.items()):
+                lines.append(f"{prefix}_events_total{fmt((('event', name),) + labels)} {value!r}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_registry = Registry()
+
+
+def get_registry() -> Registry:
+    return _registry
+
+
+# -----------------------------
+# Recording API
+# -----------------------------
+class _Timer:
+    __slots__ = ("key", "start")
+
+    def __init__(self, key):
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _registry.observe(self.key, time.perf_counter() - self.start, error=exc_type is not None)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(stage: str, **labels):
+    """Context manager timing one stage (no-op while disabled)."""
+    if not _state.enabled:
+        return _NULL_TIMER
+    return _Timer(_key(stage, labels))
+
+
+def timed(stage: str, **labels):
+    """Decorator form of timer() with the key built once."""
+    key = _key(stage, labels)
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _state.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                _registry.observe(key, time.perf_counter() - start, error=True)
+                raise
+            _registry.observe(key, time.perf_counter() - start)
+            return result
+        return wrapper
+
+    return decorate
+
+
+def observe(stage: str, seconds: float, **labels):
+    """Record an externally measured duration (e.g. response.elapsed)."""
+    if _state.enabled:
+        _registry.observe(_key(stage, labels), seconds)
+
+
+def count(event: str, value: float = 1.0, **labels):
+    if _state.enabled:
+        _registry.inc(_key(event, labels), value)
+
+
+def snapshot() -> Dict[str, List[Dict]]:
+    return _registry.snapshot()
+
+
+def to_json(indent: int = 2) -> str:
+    return _registry.to_json(indent)
+
+
+def to_prometheus(prefix: str = "liquidity") -> str:
+    return _registry.to_prometheus(prefix)
+
+
+def reset():
+    _registry.reset()
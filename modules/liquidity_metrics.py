@@ -1,35 +1,219 @@
 import numpy as np
-import pandas as pd #noqa
 
+from modules.instrumentation import timed
+
+
+# Metric inputs may be DataFrames or any mapping of column name -> array
+# (e.g. a memory-mapped TickArchive); columns are read without copying.
+def _values(data, name):
+    col = data[name]
+    if hasattr(col, 'to_numpy'):
+        return col.to_numpy(dtype=np.float64)
+    return np.asarray(col, dtype=np.float64)
+
+
+def _returns(data):
+    """'returns' column, or close-to-close returns (not written back)."""
+    if 'returns' in data:
+        return _values(data, 'returns')
+    close = _values(data, 'close')
+    returns = np.empty(close.size)
+    returns[:1] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(close[1:], close[:-1], out=returns[1:])
+    returns[1:] -= 1
+    return returns
+
+
+@timed("metrics.bid_ask_spread")
 def bid_ask_spread(df):
-    return (df['ask'] - df['bid']).mean()
+    spread = _values(df, 'ask') - _values(df, 'bid')
+    valid = ~np.isnan(spread)
+    return spread[valid].mean() if valid.any() else np.nan
 
 # def amihud_illiquidity(df):
 #     return np.mean(np.abs(df['returns']) / df['volume'])
 
+@timed("metrics.amihud_illiquidity")
 def amihud_illiquidity(df):
     # If returns column is missing, compute it from close prices
-    if 'returns' not in df.columns:
-        if 'close' not in df.columns:
-            raise ValueError("To compute Amihud Illiquidity, the dataset must contain either 'returns' or 'close'.")
-        df['returns'] = df['close'].pct_change(fill_method=None)
-        # df['returns'] = df['close'].pct_change()
+    # (without writing it back into the caller's frame)
+    if 'returns' not in df and 'close' not in df:
+        raise ValueError("To compute Amihud Illiquidity, the dataset must contain either 'returns' or 'close'.")
+    returns = _returns(df)
+    # df['returns'] = df['close'].pct_change()
 
     # Avoid division by zero or NaN issues
-    valid = df[['returns', 'volume']].dropna()
-    valid = valid[valid['volume'] > 0]
+    volume = _values(df, 'volume')
+    valid = ~np.isnan(returns) & (volume > 0)
 
-    if valid.empty:
+    if not valid.any():
         return np.nan
 
-    return np.mean(np.abs(valid['returns']) / valid['volume'])
+    return np.mean(np.abs(returns[valid]) / volume[valid])
 
+@timed("metrics.order_book_imbalance")
 def order_book_imbalance(bids, asks):
     bid_vol = bids['qty'].sum()
     ask_vol = asks['qty'].sum()
     return (bid_vol - ask_vol) / (bid_vol + ask_vol)
 
+@timed("metrics.kyles_lambda")
 def kyles_lambda(df):
-    cov = np.cov(df['returns'], df['signed_volume'])[0,1]
-    var = np.var(df['signed_volume'])
+    signed = _values(df, 'signed_volume')
+    cov = np.cov(_values(df, 'returns'), signed)[0,1]
+    var = np.var(signed)
     return cov / var
+
+
+# -----------------------------
+# Online (streaming) estimators
+# -----------------------------
+class OnlineSpread:
+    """Running mean of ask - bid; update() with any batch of rows."""
+
+    def __init__(self):
+        self.n = 0
+        self.total = 0.0
+
+    def update(self, batch):
+        spread = _values(batch, 'ask') - _values(batch, 'bid')
+        spread = spread[~np.isnan(spread)]
+        self.n += spread.size
+        self.total += spread.sum()
+        return self
+
+    def value(self):
+        return float(self.total / self.n) if self.n else np.nan
+
+
+def _batch_returns(batch, prev_close):
+    """
+    Returns for a batch, using the previous batch's last close for row 0.
+
+    Returns (returns_array, new_prev_close).
+    """
+    if 'returns' in batch:
+        return _values(batch, 'returns'), prev_close
+    if 'close' not in batch:
+        raise ValueError("Online estimators need either 'returns' or 'close' in each batch.")
+
+    close = _values(batch, 'close')
+    if close.size == 0:
+        return close, prev_close
+    previous = np.concatenate(([prev_close], close[:-1]))
+    return close / previous - 1, close[-1]
+
+
+class OnlineAmihud:
+    """
+    Running mean of |returns| / volume over rows with volume > 0.
+
+    If batches carry 'close' but no 'returns', returns are computed with
+    the last close of the previous batch carried over.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.total = 0.0
+        self.prev_close = np.nan
+
+    def update(self, batch):
+        returns, self.prev_close = _batch_returns(batch, self.prev_close)
+        volume = _values(batch, 'volume')
+        valid = ~np.isnan(returns) & (volume > 0)
+        self.n += int(valid.sum())
+        self.total += (np.abs(returns[valid]) / volume[valid]).sum()
+        return self
+
+    def value(self):
+        return float(self.total / self.n) if self.n else np.nan
+
+
+class OnlineKylesLambda:
+    """
+    Kyle's lambda from running co-moments of returns and signed volume.
+
+    Batch moments are merged with the parallel Welford update, so each
+    update() costs O(rows in batch) and is numerically stable. value()
+    matches kyles_lambda() on the concatenated rows (ignoring rows where
+    either input is NaN).
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean_r = 0.0
+        self.mean_v = 0.0
+        self.c_rv = 0.0    # sum of (r - mean_r) * (v - mean_v)
+        self.m2_v = 0.0    # sum of (v - mean_v) ** 2
+        self.prev_close = np.nan
+
+    def update(self, batch):
+        returns, self.prev_close = _batch_returns(batch, self.prev_close)
+        signed = _values(batch, 'signed_volume')
+        valid = ~np.isnan(returns) & ~np.isnan(signed)
+        r = returns[valid]
+        v = signed[valid]
+
+        n_b = r.size
+        if n_b == 0:
+            return self
+
+        mean_r_b = r.mean()
+        mean_v_b = v.mean()
+        c_b = ((r - mean_r_b) * (v - mean_v_b)).sum()
+        m2_b = ((v - mean_v_b) ** 2).sum()
+
+        n = self.n + n_b
+        d_r = mean_r_b - self.mean_r
+        d_v = mean_v_b - self.mean_v
+        weight = self.n * n_b / n
+
+        self.mean_r += d_r * n_b / n
+        self.mean_v += d_v * n_b / n
+        self.c_rv += c_b + d_r * d_v * weight
+        self.m2_v += m2_b + d_v * d_v * weight
+        self.n = n
+        return self
+
+    def value(self):
+        if self.n < 2 or self.m2_v == 0:
+            return np.nan
+        # Same normalisation as kyles_lambda: sample cov / population var
+        cov = self.c_rv / (self.n - 1)
+        var = self.m2_v / self.n
+        return float(cov / var)
+
+
+class OnlineLiquidityMetrics:
+    """
+    Bundle of online estimators fed from the same batches.
+
+    Each estimator is only updated when the batch has the columns it needs.
+    """
+
+    def __init__(self):
+        self.spread = OnlineSpread()
+        self.amihud = OnlineAmihud()
+        self.kyle = OnlineKylesLambda()
+        self.rows = 0
+
+    def update(self, batch):
+        has_price = 'returns' in batch or 'close' in batch
+        self.rows += len(batch)
+        if 'bid' in batch and 'ask' in batch:
+            self.spread.update(batch)
+        if has_price and 'volume' in batch:
+            self.amihud.update(batch)
+        if has_price and 'signed_volume' in batch:
+            self.kyle.update(batch)
+        return self
+
+    def value(self):
+        values = {
+            "Bid-Ask Spread": self.spread.value(),
+            "Amihud Illiquidity": self.amihud.value(),
+        }
+        if self.kyle.n:
+            values["Kyle's Lambda"] = self.kyle.value()
+        return values
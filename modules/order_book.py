@@ -0,0 +1,247 @@
+# modules/order_book.py
+
+"""
+In-memory order book maintained from one snapshot plus incremental diffs.
+
+Follows the Binance diff-depth protocol:
+
+    book = OrderBook("BTCUSDT", snapshot_loader=lambda: api.get_depth_snapshot("BTCUSDT"))
+    book.resync()                      # load /api/v3/depth
+    for event in iter_diff_file("btcusdt_diffs.jsonl.gz"):
+        book.apply_diff(event)         # {"U": first_id, "u": last_id, "b": [...], "a": [...]}
+
+Diffs can come from a websocket, a local stub server, or a recorded file.
+"""
+
+import gzip
+import json
+import threading
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class SequenceGapError(RuntimeError):
+    """A diff skipped update ids and no snapshot loader is available to resync."""
+
+
+class _BookSide:
+    """
+    One side of the book as sorted parallel float64 arrays.
+
+    Prices are kept ascending; bids read their best level from the end,
+    asks from the start. A diff changes quantities in place (O(changed
+    levels)); if it removes or adds levels, the side is reallocated once
+    with vectorized merges, which is O(book depth) per diff. The running
+    quantity total is maintained per update so imbalance never needs a
+    full re-sum.
+    """
+
+    def __init__(self, is_bid: bool):
+        self.is_bid = is_bid
+        self.prices = np.empty(0)
+        self.qtys = np.empty(0)
+        self.total = 0.0
+
+    def load(self, levels):
+        arr = np.asarray(levels, dtype=np.float64).reshape(-1, 2)
+        arr = arr[arr[:, 1] > 0]
+        order = np.argsort(arr[:, 0], kind="stable")
+        self.prices = arr[order, 0].copy()
+        self.qtys = arr[order, 1].copy()
+        self.total = float(self.qtys.sum())
+
+    def apply_levels(self, levels):
+        """
+        Set absolute quantities for ``[[price, qty], ...]`` (0 removes the
+        level). A price repeated within one update takes its last quantity.
+        """
+        if not levels:
+            return
+        update = {float(p): float(q) for p, q in levels}
+        keys = sorted(update)
+        size = self.prices.size
+        at = self.prices.searchsorted(keys).tolist()
+
+        # Quantity changes are written in place; removals and new levels
+        # are collected and merged into the arrays once
+        removed, added, added_qtys = [], [], []
+        for price, i in zip(keys, at):
+            qty = update[price]
+            if i < size and self.prices[i] == price:
+                self.total -= self.qtys[i]
+                if qty > 0:
+                    self.qtys[i] = qty
+                    self.total += qty
+                else:
+                    removed.append(i)
+            elif qty > 0:
+                added.append(price)
+                added_qtys.append(qty)
+                self.total += qty
+
+        if removed:
+            keep = np.ones(size, dtype=bool)
+            keep[removed] = False
+            self.prices = self.prices[keep]
+            self.qtys = self.qtys[keep]
+        if added:
+            where = self.prices.searchsorted(added)
+            self.prices = np.insert(self.prices, where, added)
+            self.qtys = np.insert(self.qtys, where, added_qtys)
+
+    def set_level(self, price: float, qty: float):
+        """Set the absolute quantity at a price (0 removes the level)."""
+        self.apply_levels([(price, qty)])
+
+    def best(self) -> Optional[float]:
+        if self.prices.size == 0:
+            return None
+        return float(self.prices[-1] if self.is_bid else self.prices[0])
+
+    def levels(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(prices, qtys) ordered from the best level outward."""
+        if self.is_bid:
+            return self.prices[::-1], self.qtys[::-1]
+        return self.prices, self.qtys
+
+
+class OrderBook:
+    """
+    Live order book with sequence-checked incremental updates.
+
+    - load_snapshot() seeds both sides from a /api/v3/depth payload
+    - apply_diff() applies a depth diff with at most one vectorized,
+      O(book depth) merge per side, drops stale events, and resyncs from ``snapshot_loader`` on a sequence gap
+    - best bid/ask, spread, imbalance and cumulative depth are always current
+    - Thread-safe: a collector can update while the UI reads
+    """
+
+    def __init__(self, symbol: str, snapshot_loader: Optional[Callable[[], dict]] = None):
+        self.symbol = symbol
+        self.snapshot_loader = snapshot_loader
+        self.bids = _BookSide(is_bid=True)
+        self.asks = _BookSide(is_bid=False)
+        self.last_update_id: Optional[int] = None
+        self.resyncs = 0
+        self._lock = threading.RLock()
+
+    # -----------------------------
+    # Updates
+    # -----------------------------
+    def load_snapshot(self, data: dict):
+        with self._lock:
+            self.bids.load(data.get("bids", []))
+            self.asks.load(data.get("asks", []))
+            self.last_update_id = int(data["lastUpdateId"])
+
+    def resync(self):
+        """Reload the full snapshot from ``snapshot_loader``."""
+        if self.snapshot_loader is None:
+            raise SequenceGapError(f"No snapshot loader to resync {self.symbol} order book.")
+        self.load_snapshot(self.snapshot_loader())
+        self.resyncs += 1
+
+    def apply_diff(self, event: dict) -> bool:
+        """
+        Apply one diff event {"U": first_id, "u": last_id, "b": [[p, q]], "a": [[p, q]]}.
+
+        Quantities are absolute; 0 removes the level. Returns False for
+        events that are already covered by the current state.
+
+        Raises:
+            SequenceGapError: if update ids were skipped and there is no
+                snapshot loader to resync from.
+        """
+        first_id = int(event["U"])
+        last_id = int(event["u"])
+
+        with self._lock:
+            if self.last_update_id is None:
+                self.resync()
+
+            if last_id <= self.last_update_id:
+                return False
+
+            if first_id > self.last_update_id + 1:
+                # Missed events: state is unknown until a fresh snapshot
+                self.resync()
+                if last_id <= self.last_update_id:
+                    return False
+                if first_id > self.last_update_id + 1:
+                    raise SequenceGapError(
+                        f"{self.symbol}: diff {first_id}-{last_id} does not follow "
+                        f"snapshot {self.last_update_id}."
+                    )
+
+            self.bids.apply_levels(event.get("b", []))
+            self.asks.apply_levels(event.get("a", []))
+
+            self.last_update_id = last_id
+            return True
+
+    def replay(self, events: Iterable[dict]) -> int:
+        """Apply a sequence of diffs; returns how many were applied."""
+        return sum(1 for event in events if self.apply_diff(event))
+
+    # -----------------------------
+    # Derived state
+    # -----------------------------
+    @property
+    def best_bid(self) -> Optional[float]:
+        with self._lock:
+            return self.bids.best()
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        with self._lock:
+            return self.asks.best()
+
+    @property
+    def spread(self) -> Optional[float]:
+        with self._lock:
+            bid, ask = self.bids.best(), self.asks.best()
+        return None if bid is None or ask is None else ask - bid
+
+    @property
+    def mid(self) -> Optional[float]:
+        with self._lock:
+            bid, ask = self.bids.best(), self.asks.best()
+        return None if bid is None or ask is None else (bid + ask) / 2
+
+    def imbalance(self) -> float:
+        """Same definition as liquidity_metrics.order_book_imbalance."""
+        with self._lock:
+            bid_vol, ask_vol = self.bids.total, self.asks.total
+        total = bid_vol + ask_vol
+        return (bid_vol - ask_vol) / total if total else np.nan
+
+    def cumulative_depth(self, side: str, levels: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(prices, cumulative qty) from the best level outward for 'bid' or 'ask'."""
+        with self._lock:
+            prices, qtys = (self.bids if side == "bid" else self.asks).levels()
+            prices, qtys = prices[:levels].copy(), qtys[:levels]
+            return prices, np.cumsum(qtys)
+
+    def to_frames(self, levels: Optional[int] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """(bids_df, asks_df) in the same shape as MarketAPI.get_orderbook."""
+        with self._lock:
+            frames = []
+            for side in (self.bids, self.asks):
+                prices, qtys = side.levels()
+                frames.append(pd.DataFrame({"price": prices[:levels].copy(), "qty": qtys[:levels].copy()}))
+        return frames[0], frames[1]
+
+
+# -----------------------------
+# Local diff sources
+# -----------------------------
+def iter_diff_file(path: str) -> Iterator[dict]:
+    """Yield diff events from a JSON-lines file (optionally .gz)."""
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
@@ -0,0 +1,69 @@
+# modules/panel_metrics.py
+
+"""
+Multi-symbol ("panel") liquidity metrics.
+
+Takes a long-format frame with one row per tick and a ``symbol`` column
+(like the dashboard's CSV exports) and computes every metric for every
+symbol in one grouped pass:
+
+    table = panel_metrics(df)
+    #   symbol  bid_ask_spread  amihud_illiquidity  kyles_lambda  order_book_imbalance  rows
+"""
+
+import pandas as pd
+
+from modules.data_loader import compute_group_returns
+from modules.instrumentation import timed
+from modules.rolling_metrics import _finish, _kyle_from_sums, _moment_columns, _prepare
+
+
+PANEL_COLUMNS = {
+    "spread": "bid_ask_spread",
+    "amihud": "amihud_illiquidity",
+    "kyles_lambda": "kyles_lambda",
+    "imbalance": "order_book_imbalance",
+}
+
+
+@timed("metrics.panel_metrics")
+def panel_metrics(df, by="symbol", time_col="timestamp"):
+    """
+    Liquidity metrics per symbol, computed with groupby kernels.
+
+    When the frame has 'close', returns are always recomputed per symbol in
+    ``time_col`` order, even if a 'returns' column exists: load_csv derives
+    one over the whole file, which would span symbol boundaries. Metrics
+    whose inputs are missing come back as NaN.
+    """
+    if by not in df.columns:
+        raise ValueError(f"Panel metrics need a '{by}' column.")
+
+    returns = None
+    if 'close' in df.columns:
+        returns = compute_group_returns(df, by=by, time_col=time_col)
+
+    inputs = _prepare(df, time_col=None, returns=returns)
+    inputs.index = df.index
+
+    frame = pd.concat([
+        df[by],
+        inputs[["spread", "amihud"]],
+        _moment_columns(inputs, groups=df[by]),
+        inputs[["bid_qty", "ask_qty"]],
+    ], axis=1)
+
+    grouped = frame.groupby(by, sort=False)
+    means = grouped[["spread", "amihud"]].mean()
+    sums = grouped[["n", "r", "v", "rv", "vv", "bid_qty", "ask_qty"]].sum(min_count=1)
+
+    table = _finish(
+        means["spread"],
+        means["amihud"],
+        _kyle_from_sums(sums["n"], sums["r"], sums["v"], sums["rv"], sums["vv"]),
+        sums["bid_qty"],
+        sums["ask_qty"],
+    ).rename(columns=PANEL_COLUMNS)
+    table["rows"] = grouped.size()
+
+    return table.reset_index()
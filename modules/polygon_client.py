@@ -1,192 +1,415 @@
-import requests
 import datetime
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
+from modules.http_transport import get_transport
+from modules.instrumentation import timed, timer
+from modules.rate_limiter import INTERACTIVE
+from modules.snapshot_batch import SnapshotBatch
+from modules.snapshot_cache import client_key
 
-class PolygonClient:
-    def __init__(self, api_key):
-        self.api_key = api_key
-        self.base = "https://api.polygon.io"
 
-    # -----------------------------
-    # Helper: GET request wrapper
-    # -----------------------------
-    def _get(self, url, params):
-        try:
-            r = requests.get(url, params=params, timeout=5)
-            return r.json()
-        except Exception:
-            return None
+# Fields of the merged snapshot row and which endpoint can supply each.
+SNAPSHOT_FIELDS = ("bid", "ask", "close", "volume", "depth1", "depth2")
 
-    # -----------------------------
-    # Endpoint 1: v3 Snapshot
-    # -----------------------------
-    def _snapshot_v3(self, symbol):
-        url = f"{self.base}/v3/snapshot?ticker={symbol}"
-        params = {"apiKey": self.api_key}
-        data = self._get(url, params)
+ENDPOINT_FIELDS = {
+    "snapshot_v3": ("bid", "ask", "close", "volume", "depth1", "depth2"),
+    "aggs_prev": ("close", "volume"),
+    "last_quote": ("bid", "ask"),
+    "last_trade": ("close",),
+}
 
-        if not data or "results" not in data or not data["results"]:
-            return None
 
-        r = data["results"]
+ENDPOINT_PATHS = {
+    "snapshot_v3": "/v3/snapshot?ticker={symbol}",
+    "aggs_prev": "/v2/aggs/ticker/{symbol}/prev",
+    "last_quote": "/v2/last/quote/{symbol}",
+    "last_trade": "/v2/last/trade/{symbol}",
+}
 
-        return {
-            "bid": r.get("lastQuote", {}).get("bid"),
-            "ask": r.get("lastQuote", {}).get("ask"),
-            "close": r.get("lastTrade", {}).get("price"),
-            "volume": r.get("day", {}).get("volume"),
-            "depth1": r.get("lastQuote", {}).get("bidSize", 0),
-            "depth2": r.get("lastQuote", {}).get("askSize", 0),
-        }
+# Extra passes over symbols that came back empty (see PolygonClient._collect)
+RETRY_PASSES = 1
 
-    # -----------------------------
-    # Endpoint 2: v2 Aggregates (Prev Day)
-    # -----------------------------
-    def _aggs_prev(self, symbol):
-        url = f"{self.base}/v2/aggs/ticker/{symbol}/prev"
-        params = {"apiKey": self.api_key}
-        data = self._get(url, params)
 
-        if not data or "results" not in data or not data["results"]:
-            return None
+# -----------------------------
+# Endpoint 1: v3 Snapshot
+# -----------------------------
+def _parse_snapshot_v3(data):
+    if not data or "results" not in data or not data["results"]:
+        return None
 
-        r = data["results"][0]
+    r = data["results"]
 
-        return {
-            "close": r.get("c"),
-            "volume": r.get("v"),
-        }
+    return {
+        "bid": r.get("lastQuote", {}).get("bid"),
+        "ask": r.get("lastQuote", {}).get("ask"),
+        "close": r.get("lastTrade", {}).get("price"),
+        "volume": r.get("day", {}).get("volume"),
+        "depth1": r.get("lastQuote", {}).get("bidSize", 0),
+        "depth2": r.get("lastQuote", {}).get("askSize", 0),
+    }
 
-    # -----------------------------
-    # Endpoint 3: Last Quote (fills bid/ask)
-    # -----------------------------
-    def _last_quote(self, symbol):
-        url = f"{self.base}/v2/last/quote/{symbol}"
-        params = {"apiKey": self.api_key}
-        data = self._get(url, params)
 
-        if not data or "results" not in data:
-            return None
+# -----------------------------
+# Endpoint 2: v2 Aggregates (Prev Day)
+# -----------------------------
+def _parse_aggs_prev(data):
+    if not data or "results" not in data or not data["results"]:
+        return None
 
-        r = data["results"]
+    r = data["results"][0]
 
-        return {
-            "bid": r.get("bid"),
-            "ask": r.get("ask"),
-        }
+    return {
+        "close": r.get("c"),
+        "volume": r.get("v"),
+    }
 
-    # -----------------------------
-    # Endpoint 4: Last Trade (fills close)
-    # -----------------------------
-    def _last_trade(self, symbol):
-        url = f"{self.base}/v2/last/trade/{symbol}"
-        params = {"apiKey": self.api_key}
-        data = self._get(url, params)
 
-        if not data or "results" not in data:
-            return None
+# -----------------------------
+# Endpoint 3: Last Quote (fills bid/ask)
+# -----------------------------
+def _parse_last_quote(data):
+    if not data or "results" not in data:
+        return None
+
+    r = data["results"]
+
+    return {
+        "bid": r.get("bid"),
+        "ask": r.get("ask"),
+    }
+
+
+# -----------------------------
+# Endpoint 4: Last Trade (fills close)
+# -----------------------------
+def _parse_last_trade(data):
+    if not data or "results" not in data:
+        return None
+
+    r = data["results"]
+
+    return {
+        "close": r.get("price"),
+    }
+
+
+ENDPOINT_PARSERS = {
+    "snapshot_v3": _parse_snapshot_v3,
+    "aggs_prev": _parse_aggs_prev,
+    "last_quote": _parse_last_quote,
+    "last_trade": _parse_last_trade,
+}
+
+
+def _absorb(merged, missing, src):
+    """Copy still-missing fields from an endpoint result; return those filled."""
+    src = src or {}
+    filled = {k for k in missing if src.get(k) is not None}
+    for k in filled:
+        merged[k] = src[k]
+    missing -= filled
+    return filled
+
+
+def _stamp(merged):
+    """Timestamp a merged row, or return None if no endpoint filled anything."""
+    # If everything is missing → fail
+    if all(v is None for v in merged.values()):
+        return None
+
+    merged["timestamp"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return merged
+
+
+def _finalize_row(merged):
+    """Apply defaults and synthetic fields to a stamped row."""
+    # Depth is only known from the v3 snapshot
+    merged["depth1"] = merged["depth1"] or 0
+    merged["depth2"] = merged["depth2"] or 0
+
+    # Compute synthetic fields
+    expected_price = None
+    if merged["bid"] and merged["ask"]:
+        expected_price = (merged["bid"] + merged["ask"]) / 2
+    else:
+        expected_price = merged["close"]
+
+    merged["expected_price"] = expected_price
+    merged["execution_price"] = merged["ask"] or merged["close"]
+    merged["execution_time_ms"] = 20
+    merged["depth3"] = merged["depth1"] + merged["depth2"]
+
+    # Keep timestamp after the synthetic fields (column order of exports)
+    merged["timestamp"] = merged.pop("timestamp")
+
+    return merged
+
+
+def quality_tag(row):
+    """Data quality tag for a finished row: Full / Partial / Missing."""
+    if row["bid"] and row["ask"] and row["volume"]:
+        return "Full"
+    if row["close"] or row["volume"]:
+        return "Partial"
+    return "Missing"
+
+
+class FallbackPlanner:
+    """
+    Decides which Polygon endpoints to call for a symbol.
+
+    - Only endpoints that can supply a still-missing field are called
+    - Candidates are ranked by expected yield: observed hit rate times
+      the number of missing fields they cover
+    - Hit/miss statistics are shared across symbols (thread-safe), so the
+      order adapts to whatever the account's plan actually returns
+    """
+
+    def __init__(self, endpoint_fields=None):
+        self.endpoint_fields = dict(endpoint_fields or ENDPOINT_FIELDS)
+        self._order = list(self.endpoint_fields)
+        self._stats = {name: {"calls": 0, "hits": 0, "misses": 0} for name in self._order}
+        self._lock = threading.Lock()
+
+    def _hit_rate(self, name):
+        st = self._stats[name]
+        # Laplace prior so untried endpoints start at 0.5
+        return (st["hits"] + 1) / (st["calls"] + 2)
+
+    def next_endpoint(self, missing, tried):
+        """Return the best untried endpoint for the missing fields, or None."""
+        best = None
+        best_score = 0.0
+        with self._lock:
+            for name in self._order:
+                if name in tried:
+                    continue
+                covered = len(missing.intersection(self.endpoint_fields[name]))
+                score = self._hit_rate(name) * covered
+                if score > best_score:
+                    best, best_score = name, score
+        return best
+
+    def record(self, name, hit):
+        with self._lock:
+            st = self._stats[name]
+            st["calls"] += 1
+            st["hits" if hit else "misses"] += 1
+
+    def stats(self):
+        """Snapshot of per-endpoint {calls, hits, misses, hit_rate}."""
+        with self._lock:
+            return {
+                name: {**st, "hit_rate": st["hits"] / st["calls"] if st["calls"] else None}
+                for name, st in self._stats.items()
+            }
+
+
+class EndpointMerge:
+    """
+    One symbol's walk down the fallback chain (shared by the sync and
+    async clients).
+
+    - Iterating yields the next endpoint to call, as chosen by the planner,
+      until every field is filled or nothing left can supply the rest
+    - absorb() merges an endpoint's parsed result and records hit/miss
+    - row(symbol) returns the finished snapshot row, or None if no
+      endpoint returned anything
+    """
+
+    def __init__(self, planner):
+        self.planner = planner
+        self.merged = dict.fromkeys(SNAPSHOT_FIELDS)
+        self.missing = set(SNAPSHOT_FIELDS)
+        self.tried = set()
+
+    def __iter__(self):
+        while self.missing:
+            name = self.planner.next_endpoint(self.missing, self.tried)
+            if name is None:
+                return
+            self.tried.add(name)
+            yield name
+
+    def absorb(self, name, result):
+        filled = _absorb(self.merged, self.missing, result)
+        self.planner.record(name, hit=bool(filled))
+        return filled
+
+    def fields(self):
+        """Raw merged fields plus timestamp (None if nothing came back)."""
+        return _stamp(self.merged)
+
+    def row(self, symbol):
+        return finish_row(self.fields(), symbol)
+
+
+def finish_row(fields, symbol):
+    """Snapshot row from merged endpoint fields (None stays None)."""
+    if not fields:
+        return None
+    row = _finalize_row(fields)
+    row["symbol"] = symbol
+    return row
 
-        r = data["results"]
 
-        return {
-            "close": r.get("price"),
-        }
+class PolygonClient:
+    def __init__(self, api_key, max_workers=16, transport=None, cache=None, priority=INTERACTIVE):
+        self.api_key = api_key
+        self.base = "https://api.polygon.io"
+        self.transport = transport or get_transport()
+
+        # Optional SnapshotCache shared across sessions
+        self.cache = cache
+
+        # Upper bound on in-flight HTTP requests across all symbols.
+        self.max_workers = max_workers
+
+        # INTERACTIVE for user clicks, BULK for background refreshes
+        self.priority = priority
+
+        self.planner = FallbackPlanner()
 
     # -----------------------------
-    # Main Snapshot with Fallbacks
+    # Helper: GET request wrapper
     # -----------------------------
-    def fetch_snapshot(self, symbol):
-        # 1) Try v3 snapshot
-        snap = self._snapshot_v3(symbol)
-
-        # 2) Fallback to aggregates
-        aggs = self._aggs_prev(symbol)
-
-        # 3) Fill missing bid/ask
-        quote = self._last_quote(symbol)
-
-        # 4) Fill missing close
-        trade = self._last_trade(symbol)
-
-        # Merge all data
-        merged = {
-            "bid": None,
-            "ask": None,
-            "close": None,
-            "volume": None,
-            "depth1": 0,
-            "depth2": 0,
-        }
-
-        for src in [snap, aggs, quote, trade]:
-            if src:
-                merged.update({k: v for k, v in src.items() if v is not None})
-
-        # If everything is missing → fail
-        if all(v is None for v in merged.values()):
+    @timed("polygon.get")
+    def _get(self, url, params):
+        try:
+            r = self.transport.get(url, params=params, timeout=5, priority=self.priority)
+            with timer("json.decode", provider="polygon"):
+                return r.json()
+        except Exception:
             return None
 
-        # Compute synthetic fields
-        expected_price = None
-        if merged["bid"] and merged["ask"]:
-            expected_price = (merged["bid"] + merged["ask"]) / 2
-        else:
-            expected_price = merged["close"]
+    # -----------------------------
+    # Endpoint dispatch: URL + parser
+    # -----------------------------
+    def _endpoint_url(self, name, symbol):
+        return self.base + ENDPOINT_PATHS[name].format(symbol=symbol)
 
-        merged["expected_price"] = expected_price
-        merged["execution_price"] = merged["ask"] or merged["close"]
-        merged["execution_time_ms"] = 20
-        merged["depth3"] = merged["depth1"] + merged["depth2"]
-        merged["timestamp"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    def _call_endpoint(self, name, symbol):
+        with timer("polygon.endpoint", endpoint=name):
+            data = self._get(self._endpoint_url(name, symbol), {"apiKey": self.api_key})
+            return ENDPOINT_PARSERS[name](data)
 
-        return merged
+    # -----------------------------
+    # Main Snapshot with Fallbacks
+    # -----------------------------
+    def fetch_snapshot(self, symbol):
+        return finish_row(self._fetch_fields(symbol), symbol)
+
+    def _fetch_fields(self, symbol):
+        """Raw merged endpoint fields plus timestamp (None if nothing came back)."""
+        if self.cache is None:
+            return self._fetch_fields_live(symbol)
+        return self.cache.get_or_fetch(
+            "polygon", "snapshot", symbol, lambda: self._fetch_fields_live(symbol),
+            client=client_key(self.api_key),
+        )
+
+    def _fetch_fields_live(self, symbol):
+        # Ask the planner for endpoints until every field is filled or
+        # no remaining endpoint can supply what is still missing. In the
+        # common case the v3 snapshot fills everything in one request.
+        merge = EndpointMerge(self.planner)
+        for name in merge:
+            merge.absorb(name, self._call_endpoint(name, symbol))
+        return merge.fields()
 
     # -----------------------------
     # Multi-symbol fetch with retry
     # -----------------------------
+    @timed("polygon.fetch_multiple")
     def fetch_multiple(self, companies: dict):
+        success, failed = self._collect(companies, self.fetch_snapshot)
+
+        rows = []
+        for name, symbol, row in success:
+            row["company"] = name
+            row["symbol"] = symbol
+            row["quality"] = self._quality(row)
+            rows.append(row)
+
+        return {"success": rows, "failed": failed}
+
+    @timed("polygon.fetch_batch")
+    def fetch_batch(self, companies: dict) -> SnapshotBatch:
+        """
+        Like fetch_multiple, but returns a columnar SnapshotBatch.
+
+        Only the raw endpoint fields are gathered per symbol; the derived
+        fields and quality tags are computed in one vectorized pass.
+        """
+        success, failed = self._collect(companies, self._fetch_fields)
+        return SnapshotBatch.from_rows(
+            [row for _, _, row in success],
+            provider="polygon",
+            names=[name for name, _, _ in success],
+            symbols=[symbol for _, symbol, _ in success],
+            execution_time_ms=20,
+            failed=failed,
+        )
+
+    def _collect(self, companies, fetch_one):
+        """
+        Run ``fetch_one(symbol)`` over the universe with RETRY_PASSES retries.
+
+        Returns ([(name, symbol, row), ...], [(name, symbol), ...]).
+        """
         success = []
         failed = []
 
-        for name, symbol in companies.items():
-            row = self.fetch_snapshot(symbol)
-
+        for name, symbol, row in self._fetch_concurrent(list(companies.items()), fetch_one):
             if row:
-                row["company"] = name
-                row["symbol"] = symbol
-                row["quality"] = self._quality(row)
-                success.append(row)
+                success.append((name, symbol, row))
             else:
                 failed.append((name, symbol))
 
-        # Retry failed once
-        if failed:
-            time.sleep(2)
-            retry_success = []
+        # Retry failed symbols; the transport's rate limiter decides when
+        # (backoff after 429s) instead of a fixed sleep
+        for _ in range(RETRY_PASSES):
+            if not failed:
+                break
             still_failed = []
 
-            for name, symbol in failed:
-                row = self.fetch_snapshot(symbol)
+            for name, symbol, row in self._fetch_concurrent(failed, fetch_one):
                 if row:
-                    row["company"] = name
-                    row["symbol"] = symbol
-                    row["quality"] = self._quality(row)
-                    retry_success.append(row)
+                    success.append((name, symbol, row))
                 else:
                     still_failed.append((name, symbol))
 
-            success.extend(retry_success)
             failed = still_failed
 
-        return {"success": success, "failed": failed}
+        return success, failed
+
+    def _fetch_concurrent(self, items, fetch_one):
+        """
+        Fetch (name, symbol) pairs in parallel, yielding (name, symbol, row)
+        in input order.
+
+        Each symbol walks its endpoint chain sequentially, so at most
+        ``max_workers`` HTTP requests are in flight at any time.
+        """
+        if not items:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as pool:
+            futures = [pool.submit(fetch_one, symbol) for _, symbol in items]
+            for (name, symbol), future in zip(items, futures):
+                try:
+                    row = future.result()
+                except Exception:
+                    row = None
+                yield name, symbol, row
+
+    def endpoint_stats(self):
+        """Per-endpoint hit/miss statistics collected by the fallback planner."""
+        return self.planner.stats()
 
     # -----------------------------
     # Data Quality Tagging
     # -----------------------------
     def _quality(self, row):
-        if row["bid"] and row["ask"] and row["volume"]:
-            return "Full"
-        if row["close"] or row["volume"]:
-            return "Partial"
-        return "Missing"
+        return quality_tag(row)
@@ -0,0 +1,355 @@
+# modules/rate_limiter.py
+
+"""
+Token-bucket request scheduler shared by every HTTP call to a provider.
+
+Each provider has one bucket (requests/second for Polygon, request weight
+per second for Binance) and optional per-endpoint buckets. A request
+takes tokens from every bucket it falls under before it is sent:
+
+    limiter = get_rate_limiter()
+    limiter.acquire(url, params, priority=BULK)     # blocks until allowed
+    response = session.get(url, params=params)
+    limiter.observe(url, response.status_code, response.headers)
+
+- Binance /api/v3/depth costs 5 / 25 / 50 / 250 weight by ``limit``
+- Interactive requests always go first; bulk refreshes leave a reserve of
+  tokens untouched and yield while an interactive request is waiting
+- 429 / 418 responses block the provider for Retry-After (or an
+  exponential backoff) and halve its rate, which then recovers gradually
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+THROTTLE_STATUSES = (418, 429)
+
+# Polygon plan limit; unset means the free tier (5/min) for background
+# refreshes only, so interactive fetches keep their full throughput.
+POLYGON_REQUESTS_PER_MINUTE = os.environ.get("POLYGON_REQUESTS_PER_MINUTE")
+
+# Sustained rate (units per second), burst capacity and the provider's own
+# accounting window (units per minute) where it reports usage back.
+# ``bulk_only`` paces BULK requests alone; INTERACTIVE ones still honour
+# 429 backoff but never wait for tokens.
+DEFAULT_LIMITS = {
+    "polygon": {
+        "rate": float(POLYGON_REQUESTS_PER_MINUTE or 5) / 60,
+        "burst": float(POLYGON_REQUESTS_PER_MINUTE or 5),
+        "bulk_only": POLYGON_REQUESTS_PER_MINUTE is None,
+    },
+    # REQUEST_WEIGHT: 6000 per minute per IP
+    "binance": {"rate": 6000 / 60, "burst": 1200, "window": 6000},
+}
+
+# Endpoint buckets inside a provider budget, keyed by URL path.
+DEFAULT_ENDPOINT_LIMITS = {
+    # Keep deep-book pulls from starving every other Binance call
+    "binance": {"/api/v3/depth": {"rate": 3000 / 60, "burst": 600}},
+}
+
+# Hosts are matched by suffix, so api1/api2.binance.com share a budget.
+HOST_PROVIDERS = {
+    "polygon.io": "polygon",
+    "binance.com": "binance",
+}
+
+# (max limit, weight) for GET /api/v3/depth
+BINANCE_DEPTH_WEIGHTS = ((100, 5), (500, 25), (1000, 50), (5000, 250))
+
+
+class RateLimitExceeded(RuntimeError):
+    """The request would have to wait longer than its priority allows."""
+
+
+def request_weight(provider: str, path: str, params: Optional[dict] = None) -> float:
+    """Budget units one request costs."""
+    if provider == "binance" and path.endswith("/api/v3/depth"):
+        limit = int((params or {}).get("limit", 100))
+        for upper, weight in BINANCE_DEPTH_WEIGHTS:
+            if limit <= upper:
+                return weight
+        return BINANCE_DEPTH_WEIGHTS[-1][1]
+    return 1.0
+
+
+def _retry_after(headers) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)."""
+    value = headers.get("Retry-After") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Classic token bucket; callers hold the limiter lock."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float, scale: float = 1.0):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate * scale)
+        self.updated = now
+
+    def delay(self, cost: float, reserve: float, scale: float) -> float:
+        """Seconds until ``cost`` tokens can be taken leaving ``reserve``."""
+        # Requests costing more than the burst run into debt instead of
+        # starving, and a reserve never asks for more than a full bucket
+        need = min(min(cost, self.burst) + reserve, self.burst) - self.tokens
+        return 0.0 if need <= 0 else need / (self.rate * scale)
+
+
+class _ProviderState:
+    def __init__(self, limits: dict, endpoint_limits: Dict[str, dict]):
+        self.bucket = TokenBucket(limits["rate"], limits["burst"])
+        self.window = limits.get("window")
+        self.bulk_only = limits.get("bulk_only", False)
+        self.endpoints = {
+            path: TokenBucket(cfg["rate"], cfg["burst"]) for path, cfg in endpoint_limits.items()
+        }
+        self.scale = 1.0
+        self.blocked_until = 0.0
+        self.strikes = 0
+        self.interactive_waiting = 0
+        self.counts = {"requests": 0, "weight": 0.0, "waited_s": 0.0, "throttled": 0, "rejected": 0}
+
+
+class RateLimiter:
+    """
+    Per-provider / per-endpoint token buckets with priorities and
+    adaptive backoff.
+
+    - acquire() blocks (acquire_async() awaits) until every bucket the
+      request falls under has enough tokens
+    - observe() feeds responses back: 429/418 trigger backoff, successes
+      restore the rate, Binance's used-weight header resyncs the bucket
+    - Hosts without a configured provider are never throttled
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, dict]] = None,
+        endpoint_limits: Optional[Dict[str, Dict[str, dict]]] = None,
+        bulk_reserve: float = 0.2,
+        interactive_max_wait: Optional[float] = 30.0,
+        bulk_max_wait: Optional[float] = None,
+        base_backoff: float = 1.0,
+        max_backoff: float = 300.0,
+    ):
+        limits = {**DEFAULT_LIMITS, **(limits or {})}
+        endpoint_limits = {**DEFAULT_ENDPOINT_LIMITS, **(endpoint_limits or {})}
+        self.bulk_reserve = bulk_reserve
+        self.max_wait = {INTERACTIVE: interactive_max_wait, BULK: bulk_max_wait}
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self._providers = {
+            name: _ProviderState(cfg, endpoint_limits.get(name, {})) for name, cfg in limits.items()
+        }
+        self._lock = threading.Lock()
+
+    # -----------------------------
+    # Request classification
+    # -----------------------------
+    def provider_for(self, url: str) -> Tuple[Optional[str], str]:
+        parts = urlsplit(url)
+        host = parts.hostname or ""
+        for suffix, name in HOST_PROVIDERS.items():
+            if (host == suffix or host.endswith("." + suffix)) and name in self._providers:
+                return name, parts.path
+        return None, parts.path
+
+    def _try_take(self, name: str, path: str, cost: float, priority: str) -> float:
+        """Take tokens and return 0, or return how long to wait before retrying."""
+        state = self._providers[name]
+        now = time.monotonic()
+
+        with self._lock:
+            if now < state.blocked_until:
+                return state.blocked_until - now
+            if priority == BULK and state.interactive_waiting:
+                return 0.05
+            if state.bulk_only and priority != BULK:
+                state.counts["requests"] += 1
+                state.counts["weight"] += cost
+                return 0.0
+
+            buckets = [state.bucket]
+            if path in state.endpoints:
+                buckets.append(state.endpoints[path])
+
+            delay = 0.0
+            for bucket in buckets:
+                bucket.refill(now, state.scale)
+                reserve = self.bulk_reserve * bucket.burst if priority == BULK else 0.0
+                delay = max(delay, bucket.delay(cost, reserve, state.scale))
+            if delay > 0:
+                return delay
+
+            for bucket in buckets:
+                bucket.tokens -= cost
+            state.counts["requests"] += 1
+            state.counts["weight"] += cost
+            return 0.0
+
+    def _begin(self, url, params, priority):
+        name, path = self.provider_for(url)
+        if name is None:
+            return None
+        if priority == INTERACTIVE:
+            with self._lock:
+                self._providers[name].interactive_waiting += 1
+        return name, path, request_weight(name, path, params)
+
+    def _end(self, name, priority, waited, rejected=False):
+        with self._lock:
+            state = self._providers[name]
+            if priority == INTERACTIVE:
+                state.interactive_waiting -= 1
+            state.counts["waited_s"] += waited
+            if rejected:
+                state.counts["rejected"] += 1
+
+    def _check_wait(self, name, path, priority, waited, delay):
+        max_wait = self.max_wait.get(priority)
+        if max_wait is not None and waited + delay > max_wait:
+            self._end(name, priority, waited, rejected=True)
+            raise RateLimitExceeded(
+                f"{name} rate limit: {path} would wait {waited + delay:.1f}s (> {max_wait:.0f}s)."
+            )
+
+    # -----------------------------
+    # Acquire
+    # -----------------------------
+    def acquire(self, url: str, params: Optional[dict] = None, priority: str = INTERACTIVE) -> float:
+        """
+        Block until the request may be sent; returns seconds waited.
+
+        Raises:
+            RateLimitExceeded: if the wait would exceed the priority's max.
+        """
+        plan = self._begin(url, params, priority)
+        if plan is None:
+            return 0.0
+        name, path, cost = plan
+
+        waited = 0.0
+        while True:
+            delay = self._try_take(name, path, cost, priority)
+            if delay <= 0:
+                self._end(name, priority, waited)
+                return waited
+            self._check_wait(name, path, priority, waited, delay)
+            # Re-check at least every 0.5s so priorities can reorder
+            step = min(delay, 0.5)
+            time.sleep(step)
+            waited += step
+
+    async def acquire_async(self, url: str, params: Optional[dict] = None, priority: str = INTERACTIVE) -> float:
+        """Coroutine version of acquire() that never blocks the event loop."""
+        plan = self._begin(url, params, priority)
+        if plan is None:
+            return 0.0
+        name, path, cost = plan
+
+        waited = 0.0
+        while True:
+            delay = self._try_take(name, path, cost, priority)
+            if delay <= 0:
+                self._end(name, priority, waited)
+                return waited
+            self._check_wait(name, path, priority, waited, delay)
+            step = min(delay, 0.5)
+            await asyncio.sleep(step)
+            waited += step
+
+    # -----------------------------
+    # Feedback
+    # -----------------------------
+    def observe(self, url: str, status: int, headers=None):
+        """Adapt to a response: back off on 429/418, recover on success."""
+        name, _ = self.provider_for(url)
+        if name is None:
+            return
+        state = self._providers[name]
+        now = time.monotonic()
+
+        with self._lock:
+            used = headers.get("X-MBX-USED-WEIGHT-1M") if headers is not None else None
+            if used is not None and state.window:
+                # Trust the server's count over ours
+                try:
+                    state.bucket.tokens = min(state.bucket.tokens, state.window - float(used))
+                except ValueError:
+                    pass
+
+            if status in THROTTLE_STATUSES:
+                state.strikes += 1
+                state.counts["throttled"] += 1
+
+                backoff = _retry_after(headers)
+                if backoff is None:
+                    backoff = min(self.max_backoff, self.base_backoff * 2 ** (state.strikes - 1))
+                    backoff *= 1 + random.uniform(0, 0.25)
+                if status == 418:
+                    # IP ban: stop hard and come back slowly
+                    backoff = max(backoff, 60.0)
+                    state.scale = max(0.1, state.scale * 0.25)
+                else:
+                    state.scale = max(0.1, state.scale * 0.5)
+
+                state.blocked_until = max(state.blocked_until, now + backoff)
+                state.bucket.tokens = min(state.bucket.tokens, 0.0)
+            elif status < 400:
+                state.strikes = 0
+                state.scale = min(1.0, state.scale + 0.05)
+
+    def stats(self) -> Dict[str, dict]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: {
+                    **state.counts,
+                    "tokens": round(state.bucket.tokens, 2),
+                    "rate_scale": round(state.scale, 2),
+                    "blocked_s": round(max(0.0, state.blocked_until - now), 1),
+                }
+                for name, state in self._providers.items()
+            }
+
+
+# -----------------------------
+# Process-wide default limiter
+# -----------------------------
+_default_limiter: Optional[RateLimiter] = None
+_default_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the limiter shared by every transport in this process."""
+    global _default_limiter
+    if _default_limiter is None:
+        with _default_lock:
+            if _default_limiter is None:
+                _default_limiter = RateLimiter()
+    return _default_limiter
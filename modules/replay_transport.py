@@ -0,0 +1,344 @@
+# modules/replay_transport.py
+
+"""
+Record real responses to a local cassette and replay them offline.
+
+Both transports implement HttpTransport.get(), so any client takes them
+through its ``transport=`` argument:
+
+    # Record (live network, responses appended to a gzip JSON-lines file)
+    with RecordingTransport("cassettes/us.jsonl.gz") as recorder:
+        PolygonClient(key, transport=recorder).fetch_multiple(US_COMPANIES)
+
+    # Replay as fast as possible, at recorded timing (speed=1), or 10x faster
+    replay = ReplayTransport("cassettes/us.jsonl.gz", speed=None)
+
+    # Stress: 100x the symbols, lognormal latency, 1% 429s and 0.5% timeouts
+    replay = ReplayTransport(
+        "cassettes/us.jsonl.gz",
+        latency=lognormal(median=0.08, sigma=0.6),
+        errors={429: 0.01, "timeout": 0.005},
+    )
+
+Requests are matched on URL + params; if that exact request was never
+recorded, any recorded response of the same endpoint (symbol stripped)
+is served round-robin, so a small cassette drives large universes.
+
+Setting LIQUIDITY_RECORD=<path> or LIQUIDITY_REPLAY=<path> makes
+get_transport() return one of these for every client in the process.
+"""
+
+import atexit
+import datetime
+import gzip
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+
+import requests
+
+
+CASSETTE_VERSION = 1
+
+# Query parameters never written to a cassette.
+REDACTED_PARAMS = ("apiKey", "apikey", "api_key", "access_token", "signature")
+
+# Response headers never written to a cassette (compared case-insensitively).
+REDACTED_HEADERS = ("set-cookie", "cookie", "authorization", "proxy-authorization", "x-api-key", "x-mbx-apikey")
+
+# Parameters and path segments that identify the instrument, not the endpoint.
+SYMBOL_PARAMS = ("symbol", "ticker", "symbols")
+_SYMBOL_SEGMENT = re.compile(r"^(?:[A-Z]:)?[A-Z0-9.\-^]{1,16}$")
+
+
+# -----------------------------
+# Request keys
+# -----------------------------
+def _split(url: str, params: Optional[dict]) -> Tuple[str, List[Tuple[str, str]]]:
+    """URL without query, plus query and params merged (redacted, sorted)."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True) + [(k, str(v)) for k, v in (params or {}).items()]
+    query = sorted((k, v) for k, v in query if k not in REDACTED_PARAMS)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, "", "")), query
+
+
+def request_key(url: str, params: Optional[dict] = None) -> str:
+    base, query = _split(url, params)
+    return base + ("?" + "&".join(f"{k}={v}" for k, v in query) if query else "")
+
+
+def endpoint_key(url: str, params: Optional[dict] = None) -> str:
+    """request_key with the instrument removed (path tickers and symbol params)."""
+    base, query = _split(url, params)
+    parts = urlsplit(base)
+    path = "/".join("{symbol}" if _SYMBOL_SEGMENT.match(seg) and seg != seg.lower() else seg
+                    for seg in parts.path.split("/"))
+    query = [(k, v) for k, v in query if k not in SYMBOL_PARAMS]
+    base = urlunsplit((parts.scheme, parts.netloc, path, "", ""))
+    return base + ("?" + "&".join(f"{k}={v}" for k, v in query) if query else "")
+
+
+# -----------------------------
+# Responses
+# -----------------------------
+class CannedResponse:
+    """The subset of requests.Response the market clients use."""
+
+    def __init__(self, status_code: int, text: str, headers: Optional[Dict[str, str]] = None, elapsed: float = 0.0, url: str = ""):
+        self.status_code = status_code
+        self.text = text
+        self.headers = requests.structures.CaseInsensitiveDict(headers or {})
+        self.elapsed = datetime.timedelta(seconds=elapsed)
+        self.url = url
+
+    @property
+    def content(self) -> bytes:
+        return self.text.encode("utf-8")
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def json(self):
+        return json.loads(self.text)
+
+    def close(self):
+        pass
+
+
+# -----------------------------
+# Latency models (callables taking a random.Random)
+# -----------------------------
+def fixed(seconds: float) -> Callable[[random.Random], float]:
+    return lambda rng: seconds
+
+
+def uniform(low: float, high: float) -> Callable[[random.Random], float]:
+    return lambda rng: rng.uniform(low, high)
+
+
+def exponential(mean: float) -> Callable[[random.Random], float]:
+    return lambda rng: rng.expovariate(1.0 / mean)
+
+
+def lognormal(median: float, sigma: float = 0.5) -> Callable[[random.Random], float]:
+    """Heavy right tail like real API latency; ``median`` in seconds."""
+    mu = math.log(median)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+# -----------------------------
+# Recording
+# -----------------------------
+class RecordingTransport:
+    """
+    Pass-through transport that appends every response to a cassette.
+
+    Cassettes are gzip JSON lines: one header line, then one entry per
+    response (request key, status, headers, body, elapsed seconds).
+    Every line is its own gzip member, written and flushed as it arrives,
+    so a killed process loses at most the response in flight. Secrets in
+    REDACTED_PARAMS and REDACTED_HEADERS are never written.
+    """
+
+    def __init__(self, path: str, inner=None):
+        if inner is None:
+            from modules.http_transport import HttpTransport
+            inner = HttpTransport()
+        self.inner = inner
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._fh = open(path, "ab")
+        self._started = time.monotonic()
+        self._write({
+            "cassette": CASSETTE_VERSION,
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        })
+        self.recorded = 0
+
+    def _write(self, record: dict):
+        """Append one record as a complete gzip member and flush it."""
+        self._fh.write(gzip.compress((json.dumps(record) + "\n").encode("utf-8")))
+        self._fh.flush()
+
+    def get(self, url: str, params: Optional[dict] = None, timeout: Optional[float] = None, **kwargs):
+        started = time.monotonic()
+        response = self.inner.get(url, params=params, timeout=timeout, **kwargs)
+        elapsed = time.monotonic() - started
+
+        entry = {
+            "offset": round(started - self._started, 6),
+            "key": request_key(url, params),
+            "endpoint": endpoint_key(url, params),
+            "status": response.status_code,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in REDACTED_HEADERS},
+            "body": response.text,
+            "elapsed": round(elapsed, 6),
+        }
+        with self._lock:
+            if not self._fh.closed:
+                self._write(entry)
+                self.recorded += 1
+        return response
+
+    def close(self):
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.close()
+        if hasattr(self.inner, "close"):
+            self.inner.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# -----------------------------
+# Replay
+# -----------------------------
+def load_cassette(path: str) -> List[dict]:
+    """Entries of one or more appended recording sessions."""
+    entries = []
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if "cassette" in record:
+                if record["cassette"] != CASSETTE_VERSION:
+                    raise ValueError(f"Unsupported cassette version: {record['cassette']}")
+                continue
+            entries.append(record)
+    return entries
+
+
+class ReplayTransport:
+    """
+    Serve recorded responses with optional timing, latency and faults.
+
+    - speed: None replays instantly; 1.0 sleeps each response's recorded
+      latency; 10.0 replays ten times faster
+    - latency: extra per-request delay model (see fixed / uniform /
+      exponential / lognormal)
+    - errors: {status or "timeout" / "connection": probability}; injected
+      statuses come back as responses (429 with Retry-After), the others
+      raise the matching requests exception
+    - Requests with no recording at all get a 404 response
+    """
+
+    def __init__(
+        self,
+        path: str,
+        speed: Optional[float] = None,
+        latency: Optional[Callable[[random.Random], float]] = None,
+        errors: Optional[Dict[object, float]] = None,
+        seed: Optional[int] = None,
+    ):
+        self.path = path
+        self.speed = speed
+        self.latency = latency
+        self.errors = dict(errors or {})
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self._exact: Dict[str, List[dict]] = defaultdict(list)
+        self._by_endpoint: Dict[str, List[dict]] = defaultdict(list)
+        for entry in load_cassette(path):
+            self._exact[entry["key"]].append(entry)
+            self._by_endpoint[entry["endpoint"]].append(entry)
+        self._cursor: Dict[str, int] = defaultdict(int)
+
+        self.counts = {"requests": 0, "exact": 0, "endpoint": 0, "missing": 0, "injected": 0}
+
+    def _next(self, table: Dict[str, List[dict]], key: str) -> Optional[dict]:
+        entries = table.get(key)
+        if not entries:
+            return None
+        i = self._cursor[key]
+        self._cursor[key] = i + 1
+        return entries[i % len(entries)]
+
+    def _fault(self) -> Optional[object]:
+        for fault, probability in self.errors.items():
+            if self._rng.random() < probability:
+                return fault
+        return None
+
+    def get(self, url: str, params: Optional[dict] = None, timeout: Optional[float] = None, **kwargs):
+        with self._lock:
+            self.counts["requests"] += 1
+            entry = self._next(self._exact, request_key(url, params))
+            kind = "exact"
+            if entry is None:
+                entry = self._next(self._by_endpoint, endpoint_key(url, params))
+                kind = "endpoint"
+            self.counts[kind if entry is not None else "missing"] += 1
+
+            delay = 0.0
+            if entry is not None and self.speed:
+                delay += entry.get("elapsed", 0.0) / self.speed
+            if self.latency is not None:
+                delay += max(0.0, self.latency(self._rng))
+            fault = self._fault()
+            if fault is not None:
+                self.counts["injected"] += 1
+
+        if delay:
+            if timeout is not None and delay > timeout:
+                time.sleep(timeout)
+                raise requests.exceptions.Timeout(f"Replay latency {delay:.2f}s exceeded timeout {timeout}s for {url}")
+            time.sleep(delay)
+
+        if fault == "timeout":
+            raise requests.exceptions.Timeout(f"Injected timeout for {url}")
+        if fault == "connection":
+            raise requests.exceptions.ConnectionError(f"Injected connection error for {url}")
+        if fault is not None:
+            status = int(fault)
+            headers = {"Retry-After": "1"} if status in (418, 429) else {}
+            body = json.dumps({"status": "ERROR", "code": status, "msg": "Injected fault"})
+            return CannedResponse(status, body, {"Content-Type": "application/json", **headers}, delay, url)
+
+        if entry is None:
+            body = json.dumps({"status": "NOT_FOUND", "message": f"No recording for {request_key(url, params)}"})
+            return CannedResponse(404, body, {"Content-Type": "application/json"}, delay, url)
+
+        return CannedResponse(entry["status"], entry["body"], entry.get("headers"), delay, url)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+    def close(self):
+        pass
+
+
+# -----------------------------
+# Environment switch
+# -----------------------------
+def transport_from_env():
+    """
+    RecordingTransport for LIQUIDITY_RECORD=<path>, ReplayTransport for
+    LIQUIDITY_REPLAY=<path> (speed from LIQUIDITY_REPLAY_SPEED), else None.
+    """
+    record = os.environ.get("LIQUIDITY_RECORD")
+    replay = os.environ.get("LIQUIDITY_REPLAY")
+    if replay:
+        speed = os.environ.get("LIQUIDITY_REPLAY_SPEED")
+        return ReplayTransport(replay, speed=float(speed) if speed else None)
+    if record:
+        recorder = RecordingTransport(record)
+        atexit.register(recorder.close)
+        return recorder
+    return None
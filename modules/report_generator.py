@@ -1,6 +1,6 @@
-from fpdf import FPDF
-
 def generate_report(metrics, filename="liquidity_report.pdf"):
+    from fpdf import FPDF  # only needed when a report is requested
+
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font("Arial", size=12)
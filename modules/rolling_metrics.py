@@ -0,0 +1,193 @@
+# modules/rolling_metrics.py
+
+"""
+Rolling and time-bucketed liquidity metrics.
+
+Every function is a pandas/NumPy kernel (no Python loop per window) and
+returns a DataFrame indexed like the input timeline, ready for plotting:
+
+    rolling_liquidity(df, window=500)      # last 500 rows
+    rolling_liquidity(df, window="5m")     # last 5 minutes of ticks
+    bucketed_liquidity(df, freq="1h")      # one row per hour
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from modules.instrumentation import timed
+
+
+METRIC_COLUMNS = ["spread", "amihud", "kyles_lambda", "imbalance"]
+
+
+def _normalize_window(window):
+    """Accept 1m / 5m style minute windows alongside pandas offsets."""
+    if isinstance(window, str):
+        match = re.fullmatch(r"\s*(\d+)\s*m\s*", window)
+        if match:
+            return f"{match.group(1)}min"
+        return window.strip()
+    return int(window)
+
+
+def _prepare(df, time_col="timestamp", returns=None, parse_time=True):
+    """
+    Per-row inputs for every metric, indexed by parsed timestamp if present.
+
+    NaN marks rows where a metric's inputs are unavailable. ``returns`` may
+    be passed in precomputed (e.g. per symbol) instead of derived here.
+    With ``parse_time=False`` the time column only labels the rows and is
+    never parsed (row-count windows do not need it).
+    """
+    n = len(df)
+    nan = pd.Series(np.nan, index=df.index)
+    cols = df.columns
+
+    if returns is not None:
+        returns = returns.astype(float)
+    elif 'returns' in cols:
+        returns = df['returns'].astype(float)
+    elif 'close' in cols:
+        returns = df['close'].astype(float).pct_change(fill_method=None)
+    else:
+        returns = nan
+
+    volume = df['volume'].astype(float) if 'volume' in cols else nan
+    signed = df['signed_volume'].astype(float) if 'signed_volume' in cols else nan
+
+    inputs = pd.DataFrame({
+        "spread": (df['ask'] - df['bid']).astype(float) if {'bid', 'ask'} <= set(cols) else nan,
+        "amihud": (returns.abs() / volume).where(volume > 0),
+        "r": returns.where(signed.notna()),
+        "v": signed.where(returns.notna()),
+        "bid_qty": df['depth1'].astype(float) if 'depth1' in cols else nan,
+        "ask_qty": df['depth2'].astype(float) if 'depth2' in cols else nan,
+    })
+
+    if time_col is not None and time_col in cols and parse_time:
+        inputs.index = pd.DatetimeIndex(pd.to_datetime(df[time_col].to_numpy()), name=time_col)
+    elif time_col is not None and time_col in cols:
+        inputs.index = pd.Index(df[time_col].to_numpy(), name=time_col)
+    else:
+        inputs.index = pd.RangeIndex(n, name="row")
+
+    return inputs
+
+
+def _moment_columns(inputs, groups=None):
+    """
+    Columns whose window sums feed _kyle_from_sums.
+
+    r and v are centered first (on their overall mean, or per ``groups``
+    key): cov and var are shift-invariant, and without the shift
+    s_vv - s_v**2 / n cancels catastrophically for volumes around 1e7.
+    """
+    r, v = inputs["r"], inputs["v"]
+    if groups is None:
+        r = r - r.mean()
+        v = v - v.mean()
+    else:
+        r = r - r.groupby(groups).transform("mean")
+        v = v - v.groupby(groups).transform("mean")
+    return pd.DataFrame({
+        "n": r.notna().astype(float),
+        "r": r,
+        "v": v,
+        "rv": r * v,
+        "vv": v ** 2,
+    })
+
+
+def _kyle_from_sums(n, s_r, s_v, s_rv, s_vv):
+    """Sample cov(r, v) / population var(v) from sums of centered r and v."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = (s_rv - s_r * s_v / n) / (n - 1)
+        var = (s_vv - s_v * s_v / n) / n
+        out = cov / var
+    return out.where((n >= 2) & (var > 0))
+
+
+def _finish(spread, amihud, kyle, bid_qty, ask_qty):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        imbalance = (bid_qty - ask_qty) / (bid_qty + ask_qty)
+    return pd.DataFrame({
+        "spread": spread,
+        "amihud": amihud,
+        "kyles_lambda": kyle,
+        "imbalance": imbalance,
+    })
+
+
+# -----------------------------
+# Rolling windows
+# -----------------------------
+@timed("metrics.rolling_liquidity")
+def rolling_liquidity(df, window=100, min_periods=1, time_col="timestamp"):
+    """
+    Rolling spread, Amihud, Kyle's lambda and top-of-book imbalance.
+
+    Args:
+        window: number of rows (int) or a time window such as "1m", "5m",
+            "1h" applied to the ``time_col`` column.
+        min_periods: minimum non-NaN observations per window.
+
+    Imbalance uses depth1 (bid size) and depth2 (ask size).
+    """
+    window = _normalize_window(window)
+    # Timestamps are only parsed when the window is measured in time
+    inputs = _prepare(df, time_col, parse_time=isinstance(window, str))
+
+    if isinstance(window, str):
+        if not isinstance(inputs.index, pd.DatetimeIndex):
+            raise ValueError(f"Time window {window!r} needs a '{time_col}' column.")
+        inputs = inputs.sort_index()
+
+    sums = pd.concat(
+        [_moment_columns(inputs), inputs[["bid_qty", "ask_qty"]]], axis=1
+    ).rolling(window, min_periods=min_periods).sum()
+
+    means = inputs[["spread", "amihud"]].rolling(window, min_periods=min_periods).mean()
+
+    return _finish(
+        means["spread"],
+        means["amihud"],
+        _kyle_from_sums(sums["n"], sums["r"], sums["v"], sums["rv"], sums["vv"]),
+        sums["bid_qty"],
+        sums["ask_qty"],
+    )
+
+
+# -----------------------------
+# Time buckets
+# -----------------------------
+@timed("metrics.bucketed_liquidity")
+def bucketed_liquidity(df, freq="1m", time_col="timestamp"):
+    """
+    Liquidity metrics per non-overlapping time bucket (e.g. "1m", "5m", "1h").
+    """
+    freq = _normalize_window(freq)
+    inputs = _prepare(df, time_col)
+    if not isinstance(inputs.index, pd.DatetimeIndex):
+        raise ValueError(f"Time buckets need a '{time_col}' column.")
+
+    inputs = inputs.sort_index()
+    # Center within each bucket, so every bucket's sums are exact deviations
+    frame = pd.concat([
+        inputs[["spread", "amihud"]],
+        _moment_columns(inputs, groups=pd.Grouper(freq=freq)),
+        inputs[["bid_qty", "ask_qty"]],
+    ], axis=1)
+
+    resampled = frame.resample(freq)
+    means = resampled[["spread", "amihud"]].mean()
+    sums = resampled[["n", "r", "v", "rv", "vv", "bid_qty", "ask_qty"]].sum(min_count=1)
+
+    return _finish(
+        means["spread"],
+        means["amihud"],
+        _kyle_from_sums(sums["n"], sums["r"], sums["v"], sums["rv"], sums["vv"]),
+        sums["bid_qty"],
+        sums["ask_qty"],
+    )
@@ -0,0 +1,217 @@
+# modules/snapshot_batch.py
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from modules.instrumentation import timed
+
+
+# Raw numeric fields every provider fills (or leaves NaN).
+BATCH_FIELDS = ("bid", "ask", "close", "volume", "depth1", "depth2")
+
+# Raw fields only some providers supply (depth-sweep execution costs from
+# the full order book); NaN elsewhere and left out of to_frame() then.
+OPTIONAL_FIELDS = ("fill_price", "buy_slippage_bps", "sell_slippage_bps", "depth_10bps")
+
+# The optional fields stored and emitted as-is (fill_price is not: it is
+# read from "execution_price" and surfaces through the derived columns).
+NUMERIC_OPTIONAL_FIELDS = ("buy_slippage_bps", "sell_slippage_bps", "depth_10bps")
+
+# Fields computed from the raw ones in one vectorized pass.
+DERIVED_FIELDS = ("spread", "expected_price", "execution_price", "depth3")
+
+# Raw fields each provider can actually return; the others are left out
+# of to_frame() and ignored by the quality tag.
+PROVIDER_FIELDS = {
+    "polygon": BATCH_FIELDS,
+    "india": BATCH_FIELDS,
+    # Order book only: no last close or traded volume
+    "binance": ("bid", "ask", "depth1", "depth2"),
+}
+
+# (fields that make a row Full, fields any of which make it Partial)
+QUALITY_RULES = {
+    "polygon": (("bid", "ask", "volume"), ("close", "volume")),
+    "india": (("bid", "ask", "volume"), ("close", "volume")),
+    "binance": (("bid", "ask"), ("bid", "ask")),
+}
+
+# Column used for the display name in each provider's rows.
+NAME_COLUMNS = {
+    "polygon": "company",
+    "india": "company",
+    "binance": "pair",
+}
+
+# Column order of to_frame(); matches the dashboard's exported CSVs.
+FRAME_COLUMNS = (
+    "bid", "ask", "close", "volume", "depth1", "depth2",
+    "expected_price", "execution_price", "execution_time_ms", "depth3",
+    "spread", "timestamp",
+)
+
+
+class SnapshotBatch:
+    """
+    Columnar batch of snapshots with a fixed schema shared by all providers.
+
+    - One float64 NumPy array per field (missing values are NaN)
+    - Derived fields and the quality tag computed in one vectorized pass,
+      judged on the fields the provider can return (PROVIDER_FIELDS)
+    - Optional per-row ``status`` text (e.g. India's "KYC Pending")
+    - Cheap conversion to a DataFrame or the legacy {"success", "failed"} shape
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        symbols: Sequence[str],
+        names: Sequence[str],
+        fields: Dict[str, np.ndarray],
+        timestamps: Sequence[str],
+        execution_time_ms: Optional[float] = None,
+        failed: Optional[List] = None,
+        status: Optional[Sequence[Optional[str]]] = None,
+    ):
+        n = len(symbols)
+        self.provider = provider
+        self.symbols = np.asarray(symbols, dtype=object)
+        self.names = np.asarray(names, dtype=object)
+        self.timestamps = np.asarray(timestamps, dtype=object)
+        self.fields = {
+            f: np.asarray(fields[f], dtype=np.float64) if f in fields else np.full(n, np.nan)
+            for f in BATCH_FIELDS + OPTIONAL_FIELDS
+        }
+        self.execution_time_ms = np.full(
+            n, np.nan if execution_time_ms is None else float(execution_time_ms)
+        )
+        self.failed = list(failed or [])
+        self.status = np.asarray(status if status is not None else [None] * n, dtype=object)
+
+        self.derived: Dict[str, np.ndarray] = {}
+        self.quality = np.empty(0, dtype=object)
+        self.compute_derived()
+
+    @classmethod
+    @timed("snapshot_batch.from_rows")
+    def from_rows(
+        cls,
+        rows: List[Dict],
+        provider: str,
+        names: Optional[Sequence[str]] = None,
+        symbols: Optional[Sequence[str]] = None,
+        execution_time_ms: Optional[float] = None,
+        failed: Optional[List] = None,
+    ) -> "SnapshotBatch":
+        """Build a batch from per-symbol dicts; only the raw fields are read."""
+        name_col = NAME_COLUMNS.get(provider, "company")
+        if symbols is None:
+            symbols = [r.get("symbol") for r in rows]
+        if names is None:
+            names = [r.get(name_col, "") for r in rows]
+
+        # dtype=float turns None into NaN
+        fields = {
+            f: np.array([r.get(f) for r in rows], dtype=np.float64)
+            for f in BATCH_FIELDS + NUMERIC_OPTIONAL_FIELDS
+        }
+        if provider == "binance":
+            # Forex rows price execution from a sweep of the full book
+            fields["fill_price"] = np.array([r.get("execution_price") for r in rows], dtype=np.float64)
+        timestamps = [r.get("timestamp") for r in rows]
+        status = [r.get("status") for r in rows]
+
+        return cls(provider, symbols, names, fields, timestamps, execution_time_ms, failed, status)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    # -----------------------------
+    # Vectorized derived fields
+    # -----------------------------
+    def compute_derived(self):
+        """Same rules as the per-row client code, applied to whole columns."""
+        bid = self.fields["bid"]
+        ask = self.fields["ask"]
+        close = self.fields["close"]
+        volume = self.fields["volume"]
+
+        # "truthy" in the row code means present and non-zero
+        has_bid = np.nan_to_num(bid) != 0
+        has_ask = np.nan_to_num(ask) != 0
+        has_close = np.nan_to_num(close) != 0
+        has_volume = np.nan_to_num(volume) != 0
+        has_quote = has_bid & has_ask
+
+        depth1 = np.nan_to_num(self.fields["depth1"])
+        depth2 = np.nan_to_num(self.fields["depth2"])
+        self.fields["depth1"] = depth1
+        self.fields["depth2"] = depth2
+
+        self.derived = {
+            "spread": ask - bid,
+            "expected_price": np.where(has_quote, (bid + ask) / 2, close),
+            "execution_price": np.where(
+                ~np.isnan(self.fields["fill_price"]),
+                self.fields["fill_price"],
+                np.where(has_ask, ask, close),
+            ),
+            "depth3": depth1 + depth2,
+        }
+
+        present = {"bid": has_bid, "ask": has_ask, "close": has_close, "volume": has_volume}
+        full, partial = QUALITY_RULES.get(self.provider, QUALITY_RULES["polygon"])
+        self.quality = np.select(
+            [
+                np.logical_and.reduce([present[f] for f in full]),
+                np.logical_or.reduce([present[f] for f in partial]),
+            ],
+            ["Full", "Partial"],
+            default="Missing",
+        ).astype(object)
+
+    # -----------------------------
+    # Conversions
+    # -----------------------------
+    def column(self, name: str) -> np.ndarray:
+        if name in self.fields:
+            return self.fields[name]
+        if name in self.derived:
+            return self.derived[name]
+        if name == "execution_time_ms":
+            return self.execution_time_ms
+        if name == "timestamp":
+            return self.timestamps
+        if name == "quality":
+            return self.quality
+        if name == "symbol":
+            return self.symbols
+        if name == "status":
+            return self.status
+        raise KeyError(name)
+
+    @timed("snapshot_batch.to_frame")
+    def to_frame(self) -> pd.DataFrame:
+        supplied = PROVIDER_FIELDS.get(self.provider, BATCH_FIELDS)
+        data = {
+            c: self.column(c) for c in FRAME_COLUMNS
+            if (c not in BATCH_FIELDS or c in supplied)
+            and not (c == "execution_time_ms" and np.isnan(self.execution_time_ms).all())
+        }
+        for f in NUMERIC_OPTIONAL_FIELDS:
+            if not np.isnan(self.fields[f]).all():
+                data[f] = self.fields[f]
+        data[NAME_COLUMNS.get(self.provider, "company")] = self.names
+        data["symbol"] = self.symbols
+        data["quality"] = self.quality
+        if any(s is not None for s in self.status):
+            data["status"] = self.status
+        return pd.DataFrame(data)
+
+    def to_result(self) -> Dict[str, List]:
+        """Legacy {"success": [row, ...], "failed": [...]} shape."""
+        frame = self.to_frame().astype(object)
+        frame = frame.where(frame.notna(), None)
+        return {"success": frame.to_dict("records"), "failed": list(self.failed)}
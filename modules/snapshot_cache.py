@@ -0,0 +1,230 @@
+# modules/snapshot_cache.py
+
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+
+from modules.singleflight import SingleFlight
+
+
+# Seconds a cached value counts as fresh, per provider.
+DEFAULT_TTLS = {
+    "polygon": 15.0,
+    "binance": 2.0,
+    "india": 60.0,
+}
+
+
+def client_key(*credentials) -> str:
+    """
+    Short, non-reversible identity for the credentials a client fetches
+    with, so clients with different keys never share cache entries.
+    """
+    digest = hashlib.sha256("\x00".join(str(c) for c in credentials).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _sizeof(value) -> int:
+    """Rough in-memory size of a cached value in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def _copy(value):
+    """Shallow copy so callers can mutate results without touching the cache."""
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_copy(v) for v in value)
+    return value
+
+
+class _Entry:
+    __slots__ = ("value", "size", "fetched_at")
+
+    def __init__(self, value, size: int, fetched_at: float):
+        self.value = value
+        self.size = size
+        self.fetched_at = fetched_at
+
+
+class SnapshotCache:
+    """
+    In-process TTL cache for market snapshots and order books.
+
+    - Keyed by (provider, client, endpoint, symbol, params); ``client``
+      (see client_key) keeps clients with different credentials apart
+    - Per-provider freshness TTLs
+    - Stale-while-revalidate: for ``stale_ttl`` seconds after expiry the old
+      value is served immediately while one background refresh runs
+    - LRU eviction bounded by entry count and approximate memory use
+    - Concurrent misses for the same key share one upstream fetch
+    - Hit / stale / miss / eviction counters
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = 5.0,
+        stale_ttl: float = 30.0,
+        max_entries: int = 2048,
+        max_bytes: int = 64 * 1024 * 1024,
+        refresh_workers: int = 4,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+
+        self._entries: "OrderedDict[Tuple, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="cache-refresh")
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0, "refresh_errors": 0}
+
+    @staticmethod
+    def make_key(provider: str, endpoint: str, symbol: str, params: Optional[dict] = None, client: Optional[str] = None) -> Tuple:
+        frozen = tuple(sorted((params or {}).items()))
+        return (provider, client, endpoint, symbol, frozen)
+
+    def ttl_for(self, provider: str) -> float:
+        return self.ttls.get(provider, self.default_ttl)
+
+    # -----------------------------
+    # Main entry point
+    # -----------------------------
+    def get_or_fetch(
+        self,
+        provider: str,
+        endpoint: str,
+        symbol: str,
+        fetch: Callable[[], Any],
+        params: Optional[dict] = None,
+        client: Optional[str] = None,
+    ):
+        """
+        Return the cached value for the key, calling ``fetch()`` on a miss.
+
+        ``None`` results are not cached so failed fetches are retried.
+        Exceptions from ``fetch`` on a miss propagate to the caller.
+        """
+        key = self.make_key(provider, endpoint, symbol, params, client)
+        ttl = self.ttl_for(provider)
+        now = self._clock()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry.fetched_at
+                if age < ttl:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return _copy(entry.value)
+                if age < ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self._stats["stale_hits"] += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        self._refresher.submit(self._refresh, key, fetch)
+                    return _copy(entry.value)
+            self._stats["misses"] += 1
+
+        value = self._flight.do(key, lambda: self._fetch_and_store(key, fetch))
+        return _copy(value)
+
+    def _fetch_and_store(self, key: Hashable, fetch: Callable[[], Any]):
+        value = fetch()
+        self._store(key, value)
+        return value
+
+    def _refresh(self, key: Hashable, fetch: Callable[[], Any]):
+        try:
+            self._store(key, fetch())
+        except Exception:
+            # Keep serving the stale value; the next expiry retries.
+            with self._lock:
+                self._stats["refresh_errors"] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _store(self, key: Hashable, value):
+        if value is None:
+            return
+        size = _sizeof(value)
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = _Entry(value, size, self._clock())
+            self._bytes += size
+
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._stats["evictions"] += 1
+
+    # -----------------------------
+    # Introspection / maintenance
+    # -----------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["stale_hits"] + self._stats["misses"]
+            served = self._stats["hits"] + self._stats["stale_hits"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hit_rate": served / lookups if lookups else None,
+                "coalesced": self._flight.stats()["shared"],
+            }
+
+    def invalidate(self, provider: str, endpoint: str, symbol: str, params: Optional[dict] = None, client: Optional[str] = None):
+        key = self.make_key(provider, endpoint, symbol, params, client)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+# -----------------------------
+# Process-wide default cache
+# -----------------------------
+_default_cache: Optional[SnapshotCache] = None
+_default_lock = threading.Lock()
+
+
+def get_cache() -> SnapshotCache:
+    """Return the cache shared by every dashboard session in this process."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = SnapshotCache()
+    return _default_cache
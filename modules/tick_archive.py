@@ -0,0 +1,232 @@
+# modules/tick_archive.py
+
+"""
+Binary tick archive with memory-mapped, zero-copy column access.
+
+An archive is a directory of raw little-endian column files plus a JSON
+header:
+
+    ticks.archive/
+        meta.json          rows, column dtypes, symbol dictionary, per-symbol row ranges
+        timestamp.bin      int64 nanoseconds since epoch (UTC)
+        symbol_code.bin    int32 index into the symbol dictionary
+        bid.bin, ask.bin, close.bin, volume.bin, depth1.bin, ...   float64
+
+Rows are sorted by symbol, then time, so one symbol is a contiguous slice.
+Opening an archive only reads meta.json; columns are np.memmap views that
+the OS pages in on demand and shares between processes:
+
+    write_archive("ticks.archive", load_csv("ticks.csv"))
+    archive = TickArchive("ticks.archive")
+    bid_ask_spread(archive.for_symbol("AAPL"))       # no copy of bid/ask
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from modules.data_loader import NUMERIC_DTYPES
+
+
+ARCHIVE_VERSION = 1
+
+_NAT = np.iinfo(np.int64).min
+
+
+def _column_file(name: str) -> str:
+    return f"{name}.bin"
+
+
+def write_archive(path, df: pd.DataFrame, time_col: str = "timestamp", symbol_col: str = "symbol") -> "TickArchive":
+    """
+    Write ``df`` as an archive at ``path`` (a directory) and open it.
+
+    Every numeric tick column known to data_loader (bid, ask, close, volume,
+    depth1-3, returns, signed_volume, ...) present in ``df`` is stored as
+    float64. When 'close' is present, 'returns' is always recomputed per
+    symbol after the (symbol, time) sort; an incoming 'returns' column (such
+    as load_csv's whole-file pct_change) would span symbol boundaries.
+    meta.json is written last, so a half-written archive never opens.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    n = len(df)
+
+    if symbol_col in df.columns:
+        codes, symbols = pd.factorize(df[symbol_col].astype(str), sort=True)
+        symbols = list(symbols)
+    else:
+        codes, symbols = np.zeros(n, dtype=np.int64), [""]
+
+    if time_col in df.columns:
+        times = pd.to_datetime(df[time_col], errors="coerce", utc=True)
+        nanos = times.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    else:
+        nanos = np.full(n, _NAT, dtype=np.int64)
+
+    # Symbol-major, time-minor; NaT sorts first within its symbol
+    order = np.lexsort((nanos, codes))
+    codes = codes[order]
+    nanos = nanos[order]
+
+    columns = {
+        "timestamp": nanos,
+        "symbol_code": codes.astype(np.int32),
+    }
+    for name in NUMERIC_DTYPES:
+        if name == "returns" and "close" in df.columns:
+            continue
+        if name in df.columns:
+            columns[name] = pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=np.float64)[order]
+
+    if "returns" not in columns and "close" in columns:
+        close = columns["close"]
+        previous = np.concatenate(([np.nan], close[:-1]))
+        # No returns across symbol boundaries
+        previous[1:][codes[1:] != codes[:-1]] = np.nan
+        with np.errstate(divide="ignore", invalid="ignore"):
+            columns["returns"] = close / previous - 1
+
+    bounds = np.searchsorted(codes, np.arange(len(symbols) + 1))
+    meta = {
+        "version": ARCHIVE_VERSION,
+        "rows": n,
+        "time_unit": "ns",
+        "columns": {},
+        "symbols": symbols,
+        "symbol_ranges": {s: [int(bounds[i]), int(bounds[i + 1])] for i, s in enumerate(symbols)},
+    }
+
+    for name, values in columns.items():
+        dtype = values.dtype.newbyteorder("<")
+        values.astype(dtype, copy=False).tofile(path / _column_file(name))
+        meta["columns"][name] = {"dtype": dtype.str, "file": _column_file(name)}
+
+    tmp = path / "meta.json.tmp"
+    tmp.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    os.replace(tmp, path / "meta.json")
+
+    return TickArchive(path)
+
+
+class ArchiveView:
+    """
+    Contiguous row range of an archive with a DataFrame-like read API.
+
+    view["bid"] returns a read-only float64 view of the mapped file (no
+    copy); "timestamp" is a datetime64[ns] view and "symbol" a Categorical
+    built over the shared int32 codes. Liquidity metric functions accept a
+    view in place of a DataFrame.
+    """
+
+    def __init__(self, archive: "TickArchive", start: int, stop: int):
+        self.archive = archive
+        self.start = start
+        self.stop = stop
+
+    @property
+    def columns(self) -> List[str]:
+        return self.archive.columns
+
+    def __contains__(self, name) -> bool:
+        return name in self.archive.columns
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name == "symbol":
+            codes = self.archive._map("symbol_code")[self.start:self.stop]
+            return pd.Categorical.from_codes(codes, categories=self.archive.symbols)
+        values = self.archive._map(name)[self.start:self.stop]
+        if name == "timestamp":
+            return values.view("datetime64[ns]")
+        return values
+
+    def slice(self, start: int, stop: int) -> "ArchiveView":
+        """Rows [start, stop) relative to this view."""
+        start = self.start + max(0, min(start, len(self)))
+        stop = self.start + max(0, min(stop, len(self)))
+        return ArchiveView(self.archive, start, max(start, stop))
+
+    def between(self, start=None, end=None) -> "ArchiveView":
+        """
+        Rows with ``start <= timestamp <= end`` (UTC).
+
+        Uses binary search, so the view must be time-sorted, i.e. a single
+        symbol (see TickArchive.for_symbol).
+        """
+        nanos = self.archive._map("timestamp")[self.start:self.stop]
+        lo = 0 if start is None else int(np.searchsorted(nanos, _to_nanos(start), side="left"))
+        hi = len(self) if end is None else int(np.searchsorted(nanos, _to_nanos(end), side="right"))
+        return self.slice(lo, hi)
+
+    def iter_chunks(self, chunksize: int = 1_000_000) -> Iterator["ArchiveView"]:
+        """Successive views of ``chunksize`` rows (for the online estimators)."""
+        for offset in range(0, len(self), chunksize):
+            yield self.slice(offset, offset + chunksize)
+
+    def to_frame(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Materialize as a DataFrame (this copies)."""
+        names = list(columns) if columns is not None else ["timestamp", "symbol"] + [
+            c for c in self.columns if c not in ("timestamp", "symbol_code")
+        ]
+        return pd.DataFrame({name: self[name] for name in names})
+
+
+def _to_nanos(value) -> int:
+    ts = pd.Timestamp(value)
+    ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+    return ts.value
+
+
+class TickArchive(ArchiveView):
+    """
+    Read-only, memory-mapped tick archive.
+
+    - Opening reads only meta.json; column files are mapped lazily
+    - Numeric columns are float64 views of the page cache (shared by
+      every process that opens the same archive)
+    - Symbols are dictionary-encoded; for_symbol() is an O(1) slice
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / "meta.json", encoding="utf-8") as fh:
+            self.meta = json.load(fh)
+        if self.meta.get("version") != ARCHIVE_VERSION:
+            raise ValueError(f"Unsupported tick archive version: {self.meta.get('version')}")
+
+        self.rows = int(self.meta["rows"])
+        self.symbols: List[str] = self.meta["symbols"]
+        self._maps: Dict[str, np.ndarray] = {}
+        super().__init__(self, 0, self.rows)
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.meta["columns"]) + ["symbol"]
+
+    def _map(self, name: str) -> np.ndarray:
+        if name not in self._maps:
+            spec = self.meta["columns"].get(name)
+            if spec is None:
+                raise KeyError(name)
+            dtype = np.dtype(spec["dtype"])
+            if self.rows == 0:
+                values = np.empty(0, dtype=dtype)
+            else:
+                values = np.memmap(self.path / spec["file"], dtype=dtype, mode="r", shape=(self.rows,))
+            # Plain ndarray view: arithmetic results are ordinary arrays
+            self._maps[name] = values.view(np.ndarray)
+        return self._maps[name]
+
+    def for_symbol(self, symbol: str) -> ArchiveView:
+        start, stop = self.meta["symbol_ranges"].get(symbol, (0, 0))
+        return ArchiveView(self, start, stop)
+
+    def __repr__(self) -> str:
+        return f"TickArchive({str(self.path)!r}, rows={self.rows}, symbols={len(self.symbols)})"
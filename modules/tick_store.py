@@ -0,0 +1,339 @@
+# modules/tick_store.py
+
+"""
+Append-only local Parquet store for fetched snapshots and order books.
+
+Layout (hive-style directories of immutable part files):
+
+    <root>/snapshots/provider=polygon/symbol=AAPL/date=2026-01-03/part-....parquet
+    <root>/books/provider=binance/symbol=BTCUSDT/date=2026-01-03/part-....parquet
+
+Appends are buffered in memory and written as one part per (symbol,
+date) every ``flush_seconds`` / ``flush_rows``, on read and at exit, so
+frequent small appends do not produce a file each. Every row carries
+``fetched_at`` (UTC), so range reads prune whole date directories first
+and then filter rows inside the remaining files:
+
+    store = get_store()
+    store.append_snapshots("polygon", batch.to_frame())
+    store.append_book("binance", "BTCUSDT", bids, asks)
+    history = store.read_snapshots("polygon", ["AAPL"], start="2026-01-01")
+"""
+
+import atexit
+import os
+import threading
+import time
+import uuid
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from modules.snapshot_batch import BATCH_FIELDS, DERIVED_FIELDS, NUMERIC_OPTIONAL_FIELDS
+
+
+DEFAULT_ROOT = os.environ.get("LIQUIDITY_STORE_DIR", "data/store")
+
+_TS = pa.timestamp("ns", tz="UTC")
+
+SNAPSHOT_NUMERIC = BATCH_FIELDS + DERIVED_FIELDS + ("execution_time_ms",) + NUMERIC_OPTIONAL_FIELDS
+
+# Fixed schemas so every part file of a kind can be read as one dataset.
+SNAPSHOT_SCHEMA = pa.schema(
+    [("fetched_at", _TS), ("symbol", pa.string()), ("name", pa.string())]
+    + [(f, pa.float64()) for f in SNAPSHOT_NUMERIC]
+    + [("timestamp", pa.string()), ("quality", pa.string())]
+)
+
+BOOK_SCHEMA = pa.schema([
+    ("fetched_at", _TS),
+    ("symbol", pa.string()),
+    ("side", pa.string()),
+    ("level", pa.int32()),
+    ("price", pa.float64()),
+    ("qty", pa.float64()),
+])
+
+SCHEMAS = {"snapshots": SNAPSHOT_SCHEMA, "books": BOOK_SCHEMA}
+
+
+def _utc(value) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def _now() -> pd.Timestamp:
+    return pd.Timestamp.now(tz="UTC")
+
+
+class TickStore:
+    """
+    Embedded columnar history of everything the dashboard fetches.
+
+    - Partitioned by kind / provider / symbol / UTC date
+    - Appends are buffered and written in batches (flush_rows rows or
+      flush_seconds after the oldest pending append, whichever is first);
+      flush_rows=1 writes every append immediately
+    - Appends never rewrite existing files (safe with concurrent readers)
+    - Range reads flush first, then return plain DataFrames
+    - compact() merges the parts of finished days into one file each
+    """
+
+    def __init__(
+        self,
+        root: str = DEFAULT_ROOT,
+        compression: str = "zstd",
+        flush_rows: int = 50_000,
+        flush_seconds: float = 60.0,
+    ):
+        self.root = Path(root)
+        self.compression = compression
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self._compact_lock = threading.Lock()
+
+        self._pending: Dict[tuple, List[pd.DataFrame]] = {}
+        self._pending_rows = 0
+        self._pending_since: Optional[float] = None
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    # -----------------------------
+    # Paths
+    # -----------------------------
+    def _symbol_dir(self, kind: str, provider: str, symbol: str) -> Path:
+        return self.root / kind / f"provider={provider}" / f"symbol={quote(str(symbol), safe='')}"
+
+    def _write(self, kind: str, provider: str, frame: pd.DataFrame) -> int:
+        """Buffer ``frame`` for the next flush (now, if the buffer is full)."""
+        if frame.empty:
+            return 0
+
+        with self._buffer_lock:
+            self._pending.setdefault((kind, provider), []).append(frame)
+            self._pending_rows += len(frame)
+            if self._pending_since is None:
+                self._pending_since = time.monotonic()
+            due = (
+                self._pending_rows >= self.flush_rows
+                or time.monotonic() - self._pending_since >= self.flush_seconds
+            )
+        if due:
+            self.flush()
+        return len(frame)
+
+    def flush(self) -> int:
+        """Write every buffered append; returns the number of rows written."""
+        # One flush at a time, so parts of one partition land in append order
+        with self._flush_lock:
+            with self._buffer_lock:
+                pending, self._pending = self._pending, {}
+                self._pending_rows = 0
+                self._pending_since = None
+
+            rows = 0
+            for (kind, provider), frames in pending.items():
+                rows += self._write_parts(kind, provider, pd.concat(frames, ignore_index=True))
+            return rows
+
+    def _write_parts(self, kind: str, provider: str, frame: pd.DataFrame) -> int:
+        """Write one part file per (symbol, date) group of ``frame``."""
+        days = frame["fetched_at"].dt.strftime("%Y-%m-%d")
+        for (symbol, day), part in frame.groupby([frame["symbol"], days], sort=False):
+            directory = self._symbol_dir(kind, provider, symbol) / f"date={day}"
+            directory.mkdir(parents=True, exist_ok=True)
+
+            name = f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+            tmp = directory / f".{name}.tmp"
+            table = pa.Table.from_pandas(part, schema=SCHEMAS[kind], preserve_index=False)
+            pq.write_table(table, tmp, compression=self.compression)
+            # Readers only ever see complete files
+            os.replace(tmp, directory / name)
+
+        return len(frame)
+
+    def _files(self, kind: str, provider: str, symbols: Optional[Iterable[str]], start, end) -> List[str]:
+        base = self.root / kind / f"provider={provider}"
+        if symbols is None:
+            symbol_dirs = sorted(base.glob("symbol=*"))
+        else:
+            symbol_dirs = [self._symbol_dir(kind, provider, s) for s in symbols]
+
+        first = start.date() if start is not None else date.min
+        last = end.date() if end is not None else date.max
+
+        files = []
+        for symbol_dir in symbol_dirs:
+            for day_dir in sorted(symbol_dir.glob("date=*")):
+                day = date.fromisoformat(day_dir.name[len("date="):])
+                if first <= day <= last:
+                    files.extend(str(p) for p in sorted(day_dir.glob("part-*.parquet")))
+        return files
+
+    def _read(self, kind, provider, symbols, start, end, columns) -> pd.DataFrame:
+        self.flush()
+        start = _utc(start) if start is not None else None
+        end = _utc(end) if end is not None else None
+        schema = SCHEMAS[kind]
+
+        files = self._files(kind, provider, symbols, start, end)
+        if not files:
+            return schema.empty_table().to_pandas()
+
+        condition = None
+        if start is not None:
+            condition = ds.field("fetched_at") >= pa.scalar(start, type=_TS)
+        if end is not None:
+            upper = ds.field("fetched_at") <= pa.scalar(end, type=_TS)
+            condition = upper if condition is None else condition & upper
+
+        if columns is not None:
+            columns = ["fetched_at", "symbol"] + [c for c in columns if c not in ("fetched_at", "symbol")]
+
+        table = ds.dataset(files, schema=schema, format="parquet").to_table(columns=columns, filter=condition)
+        frame = table.to_pandas()
+        sort_cols = ["fetched_at", "symbol"] + (["side", "level"] if kind == "books" and columns is None else [])
+        return frame.sort_values(sort_cols, kind="stable").reset_index(drop=True)
+
+    # -----------------------------
+    # Appends
+    # -----------------------------
+    def append_snapshots(self, provider: str, rows, fetched_at=None) -> int:
+        """
+        Append snapshot rows (list of dicts or a DataFrame such as
+        SnapshotBatch.to_frame()). Returns the number of rows written.
+
+        Raises:
+            ValueError: rows without a 'symbol' column (they could never be
+                read back by symbol)
+        """
+        frame = pd.DataFrame(rows) if not isinstance(rows, pd.DataFrame) else rows
+        if frame.empty:
+            return 0
+        if "symbol" not in frame:
+            raise ValueError(f"Snapshot rows need a 'symbol' column; got {list(frame.columns)}")
+
+        out = pd.DataFrame(index=frame.index)
+        out["fetched_at"] = _utc(fetched_at) if fetched_at is not None else _now()
+        out["symbol"] = frame["symbol"].astype(str)
+
+        name_col = next((c for c in ("company", "pair", "name") if c in frame), None)
+        out["name"] = frame[name_col].astype(object) if name_col else None
+
+        for f in SNAPSHOT_NUMERIC:
+            out[f] = pd.to_numeric(frame[f], errors="coerce") if f in frame else np.nan
+        for f in ("timestamp", "quality"):
+            out[f] = frame[f].map(lambda v: None if pd.isna(v) else str(v)) if f in frame else None
+
+        return self._write("snapshots", provider, out)
+
+    def append_book(self, provider: str, symbol: str, bids: pd.DataFrame, asks: pd.DataFrame, fetched_at=None) -> int:
+        """Append one order book in long format (side, level, price, qty)."""
+        stamp = _utc(fetched_at) if fetched_at is not None else _now()
+        sides = []
+        for side, levels in (("bid", bids), ("ask", asks)):
+            if levels is None or levels.empty:
+                continue
+            sides.append(pd.DataFrame({
+                "side": side,
+                "level": np.arange(len(levels), dtype=np.int32),
+                "price": levels["price"].to_numpy(dtype=np.float64),
+                "qty": levels["qty"].to_numpy(dtype=np.float64),
+            }))
+        if not sides:
+            return 0
+
+        frame = pd.concat(sides, ignore_index=True)
+        frame.insert(0, "fetched_at", stamp)
+        frame.insert(1, "symbol", str(symbol))
+        return self._write("books", provider, frame)
+
+    # -----------------------------
+    # Range reads
+    # -----------------------------
+    def read_snapshots(
+        self,
+        provider: str,
+        symbols: Optional[Sequence[str]] = None,
+        start=None,
+        end=None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> pd.DataFrame:
+        """Stored snapshots with ``start <= fetched_at <= end`` (UTC), oldest first."""
+        return self._read("snapshots", provider, symbols, start, end, columns)
+
+    def read_books(self, provider: str, symbol: str, start=None, end=None) -> pd.DataFrame:
+        """Stored book levels for one symbol, ordered by fetch, side, level."""
+        return self._read("books", provider, [symbol], start, end, None)
+
+    def iter_books(self, provider: str, symbol: str, start=None, end=None):
+        """Yield (fetched_at, bids_df, asks_df) per stored book, oldest first."""
+        levels = self.read_books(provider, symbol, start, end)
+        for stamp, book in levels.groupby("fetched_at", sort=True):
+            frames = [
+                book.loc[book["side"] == side, ["price", "qty"]].reset_index(drop=True)
+                for side in ("bid", "ask")
+            ]
+            yield stamp, frames[0], frames[1]
+
+    def symbols(self, provider: str, kind: str = "snapshots") -> List[str]:
+        base = self.root / kind / f"provider={provider}"
+        return sorted(unquote(p.name[len("symbol="):]) for p in base.glob("symbol=*"))
+
+    # -----------------------------
+    # Maintenance
+    # -----------------------------
+    def compact(self, kind: str = "snapshots", provider: Optional[str] = None) -> Dict[str, int]:
+        """
+        Merge each (symbol, date) partition's parts into a single file.
+
+        Today's partitions are left alone so live appends keep working.
+        """
+        today = _now().strftime("%Y-%m-%d")
+        merged = files = 0
+        pattern = f"provider={provider}" if provider else "provider=*"
+
+        with self._compact_lock:
+            for day_dir in sorted((self.root / kind).glob(f"{pattern}/symbol=*/date=*")):
+                parts = sorted(day_dir.glob("part-*.parquet"))
+                if len(parts) < 2 or day_dir.name == f"date={today}":
+                    continue
+
+                table = ds.dataset([str(p) for p in parts], schema=SCHEMAS[kind], format="parquet").to_table()
+                table = table.sort_by([("fetched_at", "ascending")])
+                name = f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+                tmp = day_dir / f".{name}.tmp"
+                pq.write_table(table, tmp, compression=self.compression)
+                os.replace(tmp, day_dir / name)
+                for p in parts:
+                    p.unlink()
+
+                merged += 1
+                files += len(parts)
+
+        return {"partitions": merged, "files_merged": files}
+
+
+# -----------------------------
+# Process-wide default store
+# -----------------------------
+_default_store: Optional[TickStore] = None
+_default_lock = threading.Lock()
+
+
+def get_store() -> TickStore:
+    """Return the store shared by every dashboard session in this process."""
+    global _default_store
+    if _default_store is None:
+        with _default_lock:
+            if _default_store is None:
+                _default_store = TickStore()
+                atexit.register(_default_store.flush)
+    return _default_store
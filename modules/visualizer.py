@@ -1,24 +1,146 @@
-import plotly.express as px
-import plotly.graph_objects as go #noqa
-import pandas as pd #noqa
+import numpy as np
+import pandas as pd
 
-def plot_spread(df):
-    df['spread'] = df['ask'] - df['bid']
-    return px.line(df, x='timestamp', y='spread', title='Bid-Ask Spread Over Time')
+from modules.decimation import decimate_frame
+from modules.instrumentation import timed
+
+# plotly is imported inside the plotting functions: it is the slowest
+# import in the app and most reruns draw no chart
+
+# Default cap on plotted points: roughly the pixel width of a wide chart
+MAX_POINTS = 2000
+
+
+@timed("visualizer.plot_spread")
+def plot_spread(df, max_points=MAX_POINTS, x_range=None):
+    """Spread over time, min/max-decimated to at most ``max_points`` points."""
+    import plotly.express as px
+    spread = pd.DataFrame({'timestamp': df['timestamp'], 'spread': df['ask'] - df['bid']})
+    spread = decimate_frame(spread, 'timestamp', 'spread', max_points=max_points, x_range=x_range)
+    return px.line(spread, x='timestamp', y='spread', title='Bid-Ask Spread Over Time')
 # def plot_spread(df):
 #     df['spread'] = df['ask'] - df['bid']
 #     return px.line(df, x='timestamp', y='spread', title='Bid-Ask Spread Over Time')
 
-def plot_volume(df):
-    return px.line(df, x='timestamp', y='volume', title='Trading Volume Over Time')
+@timed("visualizer.plot_volume")
+def plot_volume(df, max_points=MAX_POINTS, x_range=None):
+    """Volume over time, min/max-decimated to at most ``max_points`` points."""
+    import plotly.express as px
+    volume = decimate_frame(df[['timestamp', 'volume']], 'timestamp', 'volume', max_points=max_points, x_range=x_range)
+    return px.line(volume, x='timestamp', y='volume', title='Trading Volume Over Time')
+
+def _side_arrays(side):
+    if hasattr(side, 'columns'):
+        return side['price'].to_numpy(dtype=float), side['qty'].to_numpy(dtype=float)
+    prices, qtys = side
+    return np.asarray(prices, dtype=float), np.asarray(qtys, dtype=float)
+
+
+def bin_depth(bids, asks, bins=100, price_range=None):
+    """
+    Bin both sides of a book into shared price buckets (qty-weighted).
+
+    Returns (bin_centers, bid_qty, ask_qty); the inputs are not modified.
+    """
+    bid_p, bid_q = _side_arrays(bids)
+    ask_p, ask_q = _side_arrays(asks)
+    if price_range is None:
+        all_p = np.concatenate([bid_p, ask_p])
+        price_range = (all_p.min(), all_p.max()) if all_p.size else (0.0, 1.0)
+
+    edges = np.histogram_bin_edges([], bins=bins, range=price_range)
+    bid_hist, _ = np.histogram(bid_p, bins=edges, weights=bid_q)
+    ask_hist, _ = np.histogram(ask_p, bins=edges, weights=ask_q)
+    return (edges[:-1] + edges[1:]) / 2, bid_hist, ask_hist
+
+
+@timed("visualizer.depth_heatmap")
+def depth_heatmap(bids, asks, bins=100):
+    """
+    Depth heatmap of one book, binned server-side.
+
+    Only a 2 x ``bins`` matrix is sent to the browser, however many
+    levels the book has.
+    """
+    import plotly.graph_objects as go
+    centers, bid_hist, ask_hist = bin_depth(bids, asks, bins=bins)
+    fig = go.Figure(go.Heatmap(
+        x=centers, y=['bid', 'ask'], z=[bid_hist, ask_hist],
+        colorscale='Viridis', colorbar=dict(title='qty'),
+    ))
+    fig.update_layout(title='Order Book Depth Heatmap', xaxis_title='price', yaxis_title='side')
+    return fig
+
+
+@timed("visualizer.depth_history_heatmap")
+def depth_history_heatmap(snapshots, bins=100, price_range=None):
+    """
+    Time x price heatmap over a history of books.
+
+    Args:
+        snapshots: iterable of (timestamp, bids, asks).
+        price_range: (low, high) for the price axis; defaults to the span
+            of all levels seen.
+
+    Every level of every snapshot goes through one qty-weighted
+    np.histogram2d, so the figure only carries a bins x snapshots matrix.
+    """
+    import plotly.graph_objects as go
+    times, prices, qtys, index = [], [], [], []
+    for i, (ts, bids, asks) in enumerate(snapshots):
+        for side in (bids, asks):
+            p, q = _side_arrays(side)
+            prices.append(p)
+            qtys.append(q)
+            index.append(np.full(p.size, i))
+        times.append(ts)
+
+    if not times:
+        return go.Figure().update_layout(title='Order Book Depth Over Time')
+
+    prices = np.concatenate(prices)
+    qtys = np.concatenate(qtys)
+    index = np.concatenate(index)
+    if price_range is None:
+        price_range = (prices.min(), prices.max()) if prices.size else (0.0, 1.0)
+
+    matrix, _, price_edges = np.histogram2d(
+        index, prices,
+        bins=[np.arange(len(times) + 1) - 0.5, np.histogram_bin_edges([], bins=bins, range=price_range)],
+        weights=qtys,
+    )
+
+    fig = go.Figure(go.Heatmap(
+        x=times, y=(price_edges[:-1] + price_edges[1:]) / 2, z=matrix.T,
+        colorscale='Viridis', colorbar=dict(title='qty'),
+    ))
+    fig.update_layout(title='Order Book Depth Over Time', xaxis_title='time', yaxis_title='price')
+    return fig
+
 
-def depth_heatmap(bids, asks):
-    bids['side'] = 'bid'
-    asks['side'] = 'ask'
-    df = pd.concat([bids, asks])
+@timed("visualizer.plot_rolling_metrics")
+def plot_rolling_metrics(metrics, title='Rolling Liquidity Metrics', max_points=MAX_POINTS, x_range=None):
+    """
+    One stacked panel per metric from rolling_liquidity / bucketed_liquidity
+    output, each min/max-decimated to at most ``max_points`` points.
+    """
+    import plotly.express as px
+    if metrics.empty or metrics.shape[1] == 0:
+        import plotly.graph_objects as go
+        return go.Figure().update_layout(title=title)
 
-    fig = px.density_heatmap(
-        df, x="price", y="qty", z="qty",
-        title="Order Book Depth Heatmap"
+    x = metrics.index.name or 'index'
+    frame = metrics.reset_index()
+    long = pd.concat([
+        decimate_frame(frame[[x, col]], x, col, max_points=max_points, x_range=x_range)
+        .rename(columns={col: 'value'})
+        .assign(metric=col)
+        for col in metrics.columns
+    ], ignore_index=True)
+    fig = px.line(
+        long, x=x, y='value',
+        facet_row='metric', title=title, height=200 * metrics.shape[1],
     )
+    fig.update_yaxes(matches=None)
+    fig.for_each_annotation(lambda a: a.update(text=a.text.split('=')[-1]))
     return fig
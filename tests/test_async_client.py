@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+import modules.async_client as async_client
+from modules.async_client import AsyncForexClient, AsyncPolygonClient
+from modules.polygon_client import PolygonClient
+
+
+# Polygon responses keyed by endpoint path fragment; v3 snapshot is empty
+# so the merge has to fall back to the v2 endpoints.
+POLYGON = {
+    "/v3/snapshot": {"results": None},
+    "/prev": {"results": [{"c": 101.0, "v": 5_000}]},
+    "/last/quote/": {"results": {"bid": 100.5, "ask": 101.5}},
+    "/last/trade/": {"results": {"price": 101.2}},
+}
+
+DEPTH = {
+    "lastUpdateId": 1,
+    "bids": [["1.0990", "1000"], ["1.0980", "5000"]],
+    "asks": [["1.1010", "1000"], ["1.1020", "5000"]],
+}
+
+
+def _polygon_payload(url):
+    for fragment, payload in POLYGON.items():
+        if fragment in url:
+            return payload
+    return None
+
+
+class _FakeHttp:
+    """AsyncHttp stand-in: canned (status, data) per URL, every call recorded."""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.calls = []
+
+    async def get_json(self, url, params=None, timeout=None):
+        self.calls.append((url, params))
+        return self.respond(url, params)
+
+    async def aclose(self):
+        pass
+
+
+class _FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+class _FakeTransport:
+    def get(self, url, params=None, timeout=None, priority=None):
+        return _FakeResponse(_polygon_payload(url))
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_async_polygon_snapshot_matches_sync_client():
+    http = _FakeHttp(lambda url, params: (200, _polygon_payload(url)))
+    row = _run(AsyncPolygonClient("key", http=http).fetch_snapshot("AAPL"))
+    sync_row = PolygonClient("key", transport=_FakeTransport()).fetch_snapshot("AAPL")
+
+    assert row["symbol"] == "AAPL"
+    assert (row["bid"], row["ask"], row["close"], row["volume"]) == (100.5, 101.5, 101.0, 5_000)
+    row.pop("timestamp"), sync_row.pop("timestamp")
+    assert row == sync_row
+    # The trade endpoint has nothing left to fill once prev + quote answered
+    assert not any("/last/trade/" in url for url, _ in http.calls)
+
+
+@pytest.mark.parametrize("passes", [0, 1, 3])
+def test_async_polygon_retries_failed_symbols_retry_passes_times(monkeypatch, passes):
+    monkeypatch.setattr(async_client, "RETRY_PASSES", passes)
+    http = _FakeHttp(lambda url, params: (200, None if "DEAD" in url else _polygon_payload(url)))
+    client = AsyncPolygonClient("key", http=http)
+
+    result = _run(client.fetch_multiple({"Apple": "AAPL", "Gone": "DEAD"}))
+
+    assert [row["symbol"] for row in result["success"]] == ["AAPL"]
+    assert result["success"][0]["company"] == "Apple"
+    assert result["failed"] == [("Gone", "DEAD")]
+    dead_snapshots = [url for url, _ in http.calls if "DEAD" in url and "/v3/snapshot" in url]
+    assert len(dead_snapshots) == 1 + passes
+
+
+def test_async_forex_fetch_multiple_splits_success_and_failure():
+    def respond(url, params):
+        if params["symbol"] == "EURUSDT":
+            return 200, DEPTH
+        return 400, {"code": -1121, "msg": "Invalid symbol."}
+
+    client = AsyncForexClient(http=_FakeHttp(respond))
+    result = _run(client.fetch_multiple({"EUR/USD": "EURUSDT", "Bad": "NOPE"}))
+
+    (row,) = result["success"]
+    assert row["pair"] == "EUR/USD" and row["symbol"] == "EURUSDT"
+    assert row["bid"] == pytest.approx(1.099) and row["ask"] == pytest.approx(1.101)
+    assert row["spread"] == pytest.approx(0.002)
+    assert result["failed"] == [("Bad", "NOPE")]
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from modules.batch_runner import main
+from modules.liquidity_metrics import amihud_illiquidity, kyles_lambda
+
+
+def _ticks():
+    rows = []
+    for symbol, closes in (("AAA", [10.0, 11.0, 12.1, 11.5]), ("BBB", [200.0, 190.0, 209.0, 210.0])):
+        for i, close in enumerate(closes):
+            rows.append({
+                "timestamp": f"2024-01-01 00:00:0{i}",
+                "symbol": symbol,
+                "bid": close - 0.1,
+                "ask": close + 0.1,
+                "close": close,
+                "volume": 100.0 + 10 * i,
+                "signed_volume": (-1) ** i * (20.0 + i),
+            })
+    return pd.DataFrame(rows)
+
+
+def test_batch_cli_recomputes_returns_per_symbol_in_time_order(tmp_path):
+    ordered = _ticks()
+    # Interleaved and reversed: file order is neither per symbol nor in time
+    shuffled = ordered.iloc[[7, 2, 5, 0, 3, 6, 1, 4]]
+    path = tmp_path / "ticks.csv"
+    shuffled.to_csv(path, index=False)
+    out = tmp_path / "metrics.csv"
+
+    assert main([str(path), "-o", str(out), "-w", "1"]) == 0
+    table = pd.read_csv(out).set_index("symbol")
+
+    assert list(table.index) == ["AAA", "BBB"]
+    for symbol, group in ordered.groupby("symbol"):
+        expected = group.assign(returns=group["close"].pct_change())
+        assert table.loc[symbol, "rows"] == 4
+        assert table.loc[symbol, "amihud_illiquidity"] == pytest.approx(amihud_illiquidity(expected))
+        assert table.loc[symbol, "kyles_lambda"] == pytest.approx(kyles_lambda(expected.iloc[1:]))
@@ -0,0 +1,57 @@
+from modules.collector import CALLS_PER_SYMBOL, Collector, snapshot_job
+from modules.polygon_client import ENDPOINT_PATHS, RETRY_PASSES
+
+
+class _Client:
+    def fetch_batch(self, universe):
+        return None
+
+
+def test_polygon_budget_assumes_full_fallback_chain():
+    universe = {f"Company {i}": f"SYM{i}" for i in range(10)}
+    job = snapshot_job("polygon", _Client(), universe, provider="polygon", interval=60)
+
+    assert CALLS_PER_SYMBOL["polygon"] == len(ENDPOINT_PATHS) * (1 + RETRY_PASSES)
+    assert job.calls == 10 * CALLS_PER_SYMBOL["polygon"]
+
+    collector = Collector(budgets={"polygon": 40})
+    collector.add_job(job)
+    collector._fit_budgets()
+    assert job.calls * 60.0 / job.interval <= 40 + 1e-9
+
+
+class _Store:
+    def __init__(self):
+        self.compactions = []
+        self.flushes = 0
+        self.rows = []
+
+    def append_snapshots(self, provider, frame):
+        self.rows.append(frame)
+
+    def compact(self, kind):
+        self.compactions.append(kind)
+        return {"partitions": 0, "files_merged": 0}
+
+    def flush(self):
+        self.flushes += 1
+
+
+class _BatchClient:
+    def fetch_batch(self, universe):
+        from modules.snapshot_batch import SnapshotBatch
+        return SnapshotBatch.from_rows([{"symbol": "AAPL", "close": 1.0}], provider="polygon")
+
+
+def test_collector_compacts_store_once_per_day_and_flushes_on_stop():
+    store = _Store()
+    collector = Collector(store=store)
+    collector.add_job(snapshot_job("us", _BatchClient(), {"Apple": "AAPL"}, provider="polygon"))
+
+    collector.run_once("us")
+    collector.run_once("us")
+    assert store.compactions == ["snapshots", "books"]
+    assert len(store.rows) == 2
+
+    collector.stop()
+    assert store.flushes == 1
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.decimation import decimate_frame, lttb_indices, minmax_indices
+
+
+def _frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=n, freq="s"),
+        "spread": rng.normal(size=n).cumsum(),
+    })
+
+
+@pytest.mark.parametrize("max_points", [2, 3, 4, 5, 101, 2000])
+@pytest.mark.parametrize("method", ["minmax", "lttb"])
+def test_decimate_frame_respects_max_points(max_points, method):
+    df = _frame(10_007)
+    out = decimate_frame(df, "timestamp", "spread", max_points=max_points, method=method)
+
+    assert len(out) <= max_points
+    assert out.index.is_monotonic_increasing
+
+
+def test_minmax_keeps_endpoints_and_spikes():
+    y = np.zeros(1_000)
+    y[337], y[612] = 50.0, -50.0
+    idx = minmax_indices(y, 10)
+
+    assert len(idx) <= 2 * 10 + 2
+    assert {0, 337, 612, 999} <= set(idx.tolist())
+
+
+def test_lttb_keeps_endpoints():
+    x = np.arange(500)
+    idx = lttb_indices(x, np.sin(x / 10), 50)
+    assert len(idx) == 50
+    assert idx[0] == 0 and idx[-1] == 499
+
+
+def test_short_frames_are_returned_whole():
+    df = _frame(100)
+    assert decimate_frame(df, "timestamp", "spread", max_points=2000) is df
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.depth_analytics import depth_within_bps, market_impact, vwap_to_fill
+
+# Mid 100. Asks notional per level: 101, 204, 104 (total 409);
+# bids: 198, 98 (total 296).
+ASKS = pd.DataFrame({"price": [101.0, 102.0, 104.0], "qty": [1.0, 2.0, 1.0]})
+BIDS = pd.DataFrame({"price": [99.0, 98.0], "qty": [2.0, 1.0]})
+
+
+def test_vwap_to_fill_hand_computed_sweeps():
+    out = vwap_to_fill(ASKS, [0.0, 101.0, 203.0, 305.0, 1_000.0])
+
+    assert out["qty"] == pytest.approx([0.0, 1.0, 2.0, 3.0, 4.0])
+    assert out["vwap"] == pytest.approx([101.0, 101.0, 101.5, 305 / 3, 102.25])
+    assert out["worst_price"] == pytest.approx([101.0, 101.0, 102.0, 102.0, 104.0])
+    assert out["filled"] == pytest.approx([1.0, 1.0, 1.0, 1.0, 0.409])
+
+
+def test_vwap_to_fill_accepts_arrays_and_scalars():
+    prices, qtys = ASKS["price"].to_numpy(), ASKS["qty"].to_numpy()
+    assert vwap_to_fill((prices, qtys), 203.0)["vwap"] == pytest.approx([101.5])
+
+
+def test_vwap_to_fill_empty_side():
+    out = vwap_to_fill((np.array([]), np.array([])), [100.0, 200.0])
+    assert np.isnan(out["vwap"]).all() and np.isnan(out["qty"]).all()
+    assert out["filled"].tolist() == [0.0, 0.0]
+
+
+def test_market_impact_hand_computed():
+    out = market_impact(BIDS, ASKS, [99.0, 203.0, 1_000.0])
+
+    assert out["mid"] == pytest.approx(100.0)
+    assert out["buy_vwap"] == pytest.approx([101.0, 101.5, 102.25])
+    assert out["buy_slippage_bps"] == pytest.approx([100.0, 150.0, 225.0])
+    assert out["buy_impact_bps"] == pytest.approx([100.0, 200.0, 400.0])
+    # Sells: 99 fills at 99; 203 takes 2 @ 99 then 5/98 @ 98
+    sell_qty = 2 + 5 / 98
+    assert out["sell_vwap"] == pytest.approx([99.0, 203 / sell_qty, 296 / 3])
+    assert out["sell_slippage_bps"] == pytest.approx([100.0, (100 - 203 / sell_qty) * 100, (100 - 296 / 3) * 100])
+    assert out["sell_impact_bps"] == pytest.approx([100.0, 200.0, 200.0])
+    # Larger than the whole book: partial fill reported, VWAP of all levels
+    assert out["buy_filled"] == pytest.approx([1.0, 1.0, 0.409])
+    assert out["sell_filled"] == pytest.approx([1.0, 1.0, 0.296])
+
+
+def test_depth_within_bps():
+    assert depth_within_bps(ASKS, 100.0, [50, 100, 200, 400]) == pytest.approx([0.0, 1.0, 3.0, 4.0])
+    assert depth_within_bps(BIDS, 100.0, [100, 200]) == pytest.approx([2.0, 3.0])
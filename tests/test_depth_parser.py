@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from modules import depth_parser
+from modules.depth_parser import levels_to_array, parse_depth
+
+
+def test_levels_parse_to_float64_pairs():
+    out = levels_to_array([["100.5", "2"], ["100.4", "0.25"]])
+
+    assert out.dtype == np.float64
+    assert out.tolist() == [[100.5, 2.0], [100.4, 0.25]]
+    assert levels_to_array([]).shape == (0, 2)
+
+
+def test_bad_values_and_short_rows_are_dropped():
+    out = levels_to_array([["1", "2"], ["x", "3"], ["4"], ["5", "nan"], ["6", "7"]])
+    assert out.tolist() == [[1.0, 2.0], [6.0, 7.0]]
+
+
+def test_rows_with_extra_fields_raise():
+    with pytest.raises(ValueError):
+        levels_to_array([["1", "2", "3"], ["4", "5"]])
+
+
+def test_parse_depth_payloads(monkeypatch):
+    body = b'{"lastUpdateId": 7, "bids": [["10", "1"]], "asks": [["11", "2"]]}'
+    book = parse_depth("X", body)
+    assert (book.best_bid(), book.best_ask(), book.last_update_id) == (10.0, 11.0, 7)
+
+    bids, asks = book
+    assert list(bids.columns) == ["price", "qty"]
+
+    # Standard-library fallback when orjson is not installed
+    monkeypatch.setattr(depth_parser, "orjson", None)
+    assert parse_depth("X", body.decode()).bids.tolist() == [[10.0, 1.0]]
+
+    with pytest.raises(RuntimeError):
+        parse_depth("X", {"code": -1121, "msg": "Invalid symbol."})
+    with pytest.raises(KeyError):
+        parse_depth("X", {"bids": []})
@@ -0,0 +1,137 @@
+import threading
+import time
+
+from modules.http_transport import HttpTransport
+
+
+class _CountingTransport(HttpTransport):
+    """HttpTransport whose upstream GET is a slow counter, not the network."""
+
+    def __init__(self):
+        super().__init__(rate_limiter=False)
+        self.sent = []
+
+    def _send(self, session, url, **kwargs):
+        self.sent.append(kwargs.get("headers"))
+        # Stay in flight until every caller has reached the coalescer
+        deadline = time.monotonic() + 1.0
+        while self._flight.stats()["calls"] < self.expected and time.monotonic() < deadline:
+            time.sleep(0.001)
+        return object()
+
+
+def _concurrent(transport, calls):
+    transport.expected = sum(1 for kw in calls if "auth" not in kw)
+    results = [None] * len(calls)
+
+    def run(i, kwargs):
+        results[i] = transport.get("https://example.test/v2/aggs", params={"ticker": "AAPL"}, **kwargs)
+
+    threads = [threading.Thread(target=run, args=(i, kw)) for i, kw in enumerate(calls)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_identical_requests_share_one_upstream_call():
+    transport = _CountingTransport()
+    same = {"headers": {"Authorization": "Bearer a"}}
+    results = _concurrent(transport, [same, {"headers": {"authorization": "Bearer a"}}, same])
+
+    assert len(transport.sent) == 1
+    assert results[0] is results[1] is results[2]
+
+
+def test_different_credentials_are_not_coalesced():
+    transport = _CountingTransport()
+    results = _concurrent(transport, [
+        {"headers": {"Authorization": "Bearer a"}},
+        {"headers": {"Authorization": "Bearer b"}},
+        {"auth": ("user", "secret")},
+        {"auth": ("user", "secret")},
+    ])
+
+    assert len(transport.sent) == 4
+    assert results[0] is not results[1]
+
+
+class _Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class _Limiter:
+    def __init__(self):
+        self.acquired = 0
+        self.observed = []
+
+    def acquire(self, url, params, priority):
+        self.acquired += 1
+        return 0.0
+
+    def observe(self, url, status, headers):
+        self.observed.append(status)
+
+
+class _ScriptedTransport(HttpTransport):
+    """HttpTransport whose upstream GET returns scripted statuses."""
+
+    def __init__(self, statuses, **kwargs):
+        super().__init__(coalesce=False, **kwargs)
+        self.statuses = list(statuses)
+        self.sent = []
+
+    def _send(self, session, url, **kwargs):
+        self.sent.append((session, kwargs))
+        return _Response(self.statuses.pop(0))
+
+
+def test_sessions_are_reused_per_host():
+    transport = HttpTransport(rate_limiter=False)
+    first = transport.session_for("https://api.polygon.io/v2/aggs")
+    assert transport.session_for("https://api.polygon.io/v3/snapshot") is first
+    assert transport.session_for("https://api.binance.com/api/v3/depth") is not first
+
+    transport.close()
+    assert transport.session_for("https://api.polygon.io/v2/aggs") is not first
+
+
+def test_default_timeout_is_applied_unless_overridden():
+    transport = _ScriptedTransport([200, 200], timeout=7, rate_limiter=False)
+    transport.get("https://example.test/a")
+    transport.get("https://example.test/a", timeout=2)
+
+    assert [kwargs["timeout"] for _, kwargs in transport.sent] == [7, 2]
+    assert transport.sent[0][0] is transport.sent[1][0]
+
+
+def test_429_retries_stop_at_retries_and_return_final_response():
+    limiter = _Limiter()
+    transport = _ScriptedTransport([429] * 5, retries=2, rate_limiter=limiter)
+    response = transport.get("https://example.test/a")
+
+    assert response.status_code == 429 and not response.closed
+    assert len(transport.sent) == 3
+    assert limiter.acquired == 3
+    assert limiter.observed == [429, 429, 429]
+
+
+def test_429_retry_returns_first_success():
+    limiter = _Limiter()
+    transport = _ScriptedTransport([429, 200, 200], retries=3, rate_limiter=limiter)
+
+    assert transport.get("https://example.test/a").status_code == 200
+    assert len(transport.sent) == 2
+
+
+def test_418_is_never_retried():
+    transport = _ScriptedTransport([418, 200], retries=3, rate_limiter=_Limiter())
+    assert transport.get("https://example.test/a").status_code == 418
+    assert len(transport.sent) == 1
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from modules import instrumentation as inst
+
+
+@pytest.fixture
+def recording():
+    was_enabled = inst.is_enabled()
+    inst.reset()
+    inst.enable()
+    yield inst
+    inst.reset()
+    if not was_enabled:
+        inst.disable()
+
+
+def test_nothing_is_recorded_while_disabled(recording):
+    inst.disable()
+
+    @inst.timed("test.fn")
+    def fn():
+        return 42
+
+    assert fn() == 42
+    with inst.timer("test.block"):
+        pass
+    inst.observe("test.observed", 0.5)
+    inst.count("test.event")
+
+    assert inst.snapshot() == {"timers": [], "counters": []}
+    assert inst.timer("test.block") is inst.timer("other")
+
+
+def test_timed_counts_calls_and_errors(recording):
+    @inst.timed("test.fn", provider="x")
+    def fn(fail=False):
+        if fail:
+            raise ValueError("boom")
+        return 1
+
+    fn()
+    with pytest.raises(ValueError):
+        fn(fail=True)
+    with pytest.raises(KeyError):
+        with inst.timer("test.block"):
+            raise KeyError("k")
+
+    timers = {row["stage"]: row for row in inst.snapshot()["timers"]}
+    assert timers["test.fn"]["count"] == 2 and timers["test.fn"]["errors"] == 1
+    assert timers["test.fn"]["provider"] == "x"
+    assert timers["test.block"]["errors"] == 1
+
+
+def test_summary_percentiles_and_json(recording):
+    for seconds in (0.001, 0.002, 0.003, 0.004, 0.100):
+        inst.observe("test.latency", seconds, host="a")
+    inst.count("test.event", 2, host="a")
+    inst.count("test.event", host="a")
+
+    (row,) = inst.snapshot()["timers"]
+    assert row["count"] == 5 and row["host"] == "a"
+    assert row["p50_ms"] == pytest.approx(3.0)
+    assert row["max_ms"] == pytest.approx(100.0)
+    assert row["mean_ms"] == pytest.approx(22.0)
+
+    data = json.loads(inst.to_json())
+    assert data["counters"] == [{"event": "test.event", "host": "a", "value": 3.0}]
+    assert data["timers"][0]["stage"] == "test.latency"
+
+
+def test_prometheus_histogram_is_cumulative(recording):
+    for seconds in (0.0004, 0.003, 0.003, 20.0):
+        inst.observe("test.latency", seconds)
+
+    lines = inst.to_prometheus().splitlines()
+    assert "# TYPE liquidity_stage_seconds histogram" in lines
+    assert 'liquidity_stage_seconds_bucket{stage="test.latency",le="0.0005"} 1' in lines
+    assert 'liquidity_stage_seconds_bucket{stage="test.latency",le="0.0025"} 1' in lines
+    assert 'liquidity_stage_seconds_bucket{stage="test.latency",le="0.005"} 3' in lines
+    assert 'liquidity_stage_seconds_bucket{stage="test.latency",le="10.0"} 3' in lines
+    assert 'liquidity_stage_seconds_bucket{stage="test.latency",le="+Inf"} 4' in lines
+    assert 'liquidity_stage_seconds_count{stage="test.latency"} 4' in lines
+    assert 'liquidity_stage_errors_total{stage="test.latency"} 0' in lines
+
+    (total,) = [line for line in lines if line.startswith("liquidity_stage_seconds_sum")]
+    assert float(total.split()[-1]) == pytest.approx(20.0064)
+
+
+def test_prometheus_escapes_label_values(recording):
+    inst.count("http.responses", host='a"b\\c\nd')
+    lines = inst.to_prometheus(prefix="app").splitlines()
+    assert 'app_events_total{event="http.responses",host="a\\"b\\\\c\\nd"} 1.0' in lines
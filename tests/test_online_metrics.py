@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.liquidity_metrics import (
+    OnlineKylesLambda,
+    OnlineLiquidityMetrics,
+    amihud_illiquidity,
+    bid_ask_spread,
+    kyles_lambda,
+)
+
+
+def _ticks(n=1_000, seed=1, volume_level=1e3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(rng.normal(0, 1e-3, n).cumsum())
+    signed = volume_level + rng.normal(0, volume_level / 10, n)
+    bid = close - rng.uniform(0.01, 0.05, n)
+    return pd.DataFrame({
+        "bid": bid,
+        "ask": close + (close - bid),
+        "close": close,
+        "volume": np.abs(signed),
+        "signed_volume": signed,
+    })
+
+
+def _batches(df, sizes):
+    start = 0
+    for size in sizes:
+        yield df.iloc[start:start + size]
+        start += size
+    if start < len(df):
+        yield df.iloc[start:]
+
+
+def test_batched_updates_match_whole_frame():
+    df = _ticks()
+    online = OnlineLiquidityMetrics()
+    for batch in _batches(df, [1, 7, 0, 250, 13, 400]):
+        online.update(batch)
+
+    values = online.value()
+    assert online.rows == len(df)
+    assert values["Bid-Ask Spread"] == pytest.approx(bid_ask_spread(df))
+    # Returns across batch boundaries use the previous batch's last close
+    assert values["Amihud Illiquidity"] == pytest.approx(amihud_illiquidity(df))
+    assert values["Kyle's Lambda"] == pytest.approx(
+        kyles_lambda(df.assign(returns=df["close"].pct_change()).iloc[1:])
+    )
+
+
+def test_kyle_is_stable_for_large_volumes():
+    df = _ticks(volume_level=1e8)
+    df["signed_volume"] = 1e8 + np.random.default_rng(2).normal(0, 1.0, len(df))
+    df = df.assign(returns=1e-9 * (df["signed_volume"] - 1e8))
+
+    online = OnlineKylesLambda()
+    for batch in _batches(df, [100] * 10):
+        online.update(batch)
+
+    assert online.value() == pytest.approx(kyles_lambda(df), rel=1e-6)
+
+
+def test_missing_inputs_skip_estimators():
+    online = OnlineLiquidityMetrics().update(pd.DataFrame({"bid": [1.0], "ask": [1.5]}))
+    values = online.value()
+
+    assert values["Bid-Ask Spread"] == pytest.approx(0.5)
+    assert np.isnan(values["Amihud Illiquidity"])
+    assert "Kyle's Lambda" not in values
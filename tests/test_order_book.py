@@ -0,0 +1,63 @@
+import pytest
+
+from benchmarks.synthetic import depth_payload, make_diffs
+from modules.order_book import OrderBook, SequenceGapError
+
+
+def _reference(snapshot, diffs, side):
+    book = {float(p): float(q) for p, q in snapshot[side] if float(q) > 0}
+    for event in diffs:
+        for p, q in event[side[0]]:
+            if float(q) > 0:
+                book[float(p)] = float(q)
+            else:
+                book.pop(float(p), None)
+    return book
+
+
+def test_replay_matches_level_by_level_reference():
+    snapshot = depth_payload(200)
+    diffs = make_diffs(300, 200, per_event=40)
+
+    book = OrderBook("TEST")
+    book.load_snapshot(snapshot)
+    assert book.replay(diffs) == len(diffs)
+
+    for side, levels in (("bids", book.bids), ("asks", book.asks)):
+        expected = _reference(snapshot, diffs, side)
+        assert levels.prices.tolist() == sorted(expected)
+        assert levels.qtys.tolist() == [expected[p] for p in sorted(expected)]
+        assert levels.total == pytest.approx(sum(expected.values()))
+
+    assert book.best_bid == max(_reference(snapshot, diffs, "bids"))
+    assert book.best_ask == min(_reference(snapshot, diffs, "asks"))
+
+
+def test_diff_inserts_removes_and_keeps_last_duplicate():
+    book = OrderBook("TEST")
+    book.load_snapshot({"lastUpdateId": 1, "bids": [["99", "1"], ["98", "2"]], "asks": [["101", "1"]]})
+
+    book.apply_diff({
+        "U": 2, "u": 2,
+        "b": [["98", "0"], ["97.5", "3"], ["99.5", "1"], ["99.5", "4"], ["90", "0"]],
+        "a": [["101", "0"]],
+    })
+
+    bids, asks = book.to_frames()
+    assert bids["price"].tolist() == [99.5, 99.0, 97.5]
+    assert bids["qty"].tolist() == [4.0, 1.0, 3.0]
+    assert asks.empty
+    assert book.bids.total == pytest.approx(8.0)
+    assert book.spread is None
+
+    book.apply_diff({"U": 3, "u": 3, "b": [], "a": [["102", "5"], ["101.5", "1"]]})
+    assert book.best_ask == 101.5
+    assert book.spread == pytest.approx(2.0)
+
+
+def test_gap_without_loader_raises():
+    book = OrderBook("TEST")
+    book.load_snapshot({"lastUpdateId": 1, "bids": [], "asks": []})
+    assert not book.apply_diff({"U": 1, "u": 1, "b": [["1", "1"]], "a": []})
+    with pytest.raises(SequenceGapError):
+        book.apply_diff({"U": 5, "u": 6, "b": [], "a": []})
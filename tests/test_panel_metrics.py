@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+from modules.data_loader import compute_group_returns, compute_returns, iter_csv_chunks
+from modules.liquidity_metrics import amihud_illiquidity, kyles_lambda
+from modules.panel_metrics import panel_metrics
+
+
+def _two_symbols():
+    # Interleaved and out of time order, like a concatenated export
+    return pd.DataFrame({
+        "timestamp": pd.to_datetime([
+            "2024-01-01 00:00:02", "2024-01-01 00:00:00", "2024-01-01 00:00:01",
+            "2024-01-01 00:00:00", "2024-01-01 00:00:01", "2024-01-01 00:00:02",
+        ]),
+        "symbol": ["AAA", "AAA", "AAA", "BBB", "BBB", "BBB"],
+        "close": [12.0, 10.0, 11.0, 200.0, 210.0, 189.0],
+        "volume": [100.0, 120.0, 80.0, 50.0, 60.0, 70.0],
+        "signed_volume": [30.0, -10.0, 20.0, 5.0, -8.0, 12.0],
+    })
+
+
+def test_group_returns_start_each_symbol_at_nan():
+    df = _two_symbols()
+    returns = compute_group_returns(df)
+
+    first = df.sort_values("timestamp", kind="stable").groupby("symbol").head(1).index
+    assert returns.loc[first].isna().all()
+    assert returns.notna().sum() == len(df) - 2
+    assert returns.index.equals(df.index)
+    assert returns[0] == pytest.approx(12.0 / 11.0 - 1)
+    assert returns[4] == pytest.approx(210.0 / 200.0 - 1)
+
+
+def test_panel_ignores_whole_file_returns_column():
+    # load_csv adds pct_change over the whole file, crossing symbols
+    df = compute_returns(_two_symbols())
+    table = panel_metrics(df).set_index("symbol")
+
+    for symbol, group in _two_symbols().groupby("symbol"):
+        group = group.sort_values("timestamp")
+        group = group.assign(returns=group["close"].pct_change())
+        assert table.loc[symbol, "amihud_illiquidity"] == pytest.approx(amihud_illiquidity(group))
+        valid = group["returns"].notna()
+        expected = kyles_lambda(group[valid])
+        assert table.loc[symbol, "kyles_lambda"] == pytest.approx(expected)
+    assert table["rows"].tolist() == [3, 3]
+
+
+def test_panel_requires_symbol_column():
+    with pytest.raises(ValueError):
+        panel_metrics(pd.DataFrame({"close": [1.0, 2.0]}))
+
+
+def _csv(df, tmp_path):
+    path = tmp_path / "ticks.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize("chunksize", [1, 2, 4, 100])
+def test_chunked_returns_match_group_returns_across_boundaries(tmp_path, chunksize):
+    df = _two_symbols().sort_values("timestamp", kind="stable").reset_index(drop=True)
+    path = _csv(df, tmp_path)
+
+    chunked = pd.concat(iter_csv_chunks(path, chunksize=chunksize), ignore_index=True)
+    expected = compute_group_returns(df)
+    assert chunked["returns"].tolist() == pytest.approx(expected.tolist(), nan_ok=True)
+
+
+@pytest.mark.parametrize("chunksize", [1, 3])
+def test_chunked_returns_without_symbol_match_pct_change(tmp_path, chunksize):
+    df = _two_symbols().query("symbol == 'AAA'").drop(columns="symbol")
+    path = _csv(df, tmp_path)
+
+    chunked = pd.concat(iter_csv_chunks(path, chunksize=chunksize), ignore_index=True)
+    expected = df["close"].pct_change(fill_method=None)
+    assert chunked["returns"].tolist() == pytest.approx(expected.tolist(), nan_ok=True)
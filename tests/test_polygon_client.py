@@ -0,0 +1,58 @@
+import pytest
+
+from modules.polygon_client import ENDPOINT_FIELDS, SNAPSHOT_FIELDS, FallbackPlanner
+
+
+def test_untried_endpoints_start_at_laplace_prior():
+    planner = FallbackPlanner()
+    assert planner._hit_rate("snapshot_v3") == pytest.approx(0.5)
+
+    planner.record("snapshot_v3", hit=True)
+    planner.record("snapshot_v3", hit=False)
+    planner.record("snapshot_v3", hit=True)
+    assert planner._hit_rate("snapshot_v3") == pytest.approx((2 + 1) / (3 + 2))
+
+    stats = planner.stats()
+    assert stats["snapshot_v3"] == {"calls": 3, "hits": 2, "misses": 1, "hit_rate": pytest.approx(2 / 3)}
+    assert stats["aggs_prev"]["hit_rate"] is None
+
+
+def test_first_choice_covers_most_missing_fields():
+    planner = FallbackPlanner()
+    assert planner.next_endpoint(set(SNAPSHOT_FIELDS), set()) == "snapshot_v3"
+    # Both cover bid and ask at the same prior: ties go to the earlier endpoint
+    assert planner.next_endpoint({"bid", "ask"}, set()) == "snapshot_v3"
+    assert planner.next_endpoint({"bid", "ask"}, {"snapshot_v3"}) == "last_quote"
+
+
+def test_endpoints_without_missing_fields_are_skipped():
+    planner = FallbackPlanner()
+    tried = {"snapshot_v3"}
+    # Only aggs_prev and last_trade supply close; last_quote must never be chosen
+    assert planner.next_endpoint({"close"}, tried) in {"aggs_prev", "last_trade"}
+    assert planner.next_endpoint({"close"}, tried | {"aggs_prev", "last_trade"}) is None
+    assert planner.next_endpoint(set(), set()) is None
+
+
+def test_ordering_shifts_after_misses():
+    planner = FallbackPlanner()
+    missing = {"close", "volume"}
+    tried = {"snapshot_v3"}
+    assert planner.next_endpoint(missing, tried) == "aggs_prev"
+
+    # aggs_prev keeps missing: 2 fields * (0 + 1) / (n + 2) falls below
+    # last_trade's 1 field * 0.5 once n >= 3
+    for _ in range(3):
+        planner.record("aggs_prev", hit=False)
+    assert planner.next_endpoint(missing, tried) == "last_trade"
+
+    planner.record("last_trade", hit=False)
+    planner.record("aggs_prev", hit=True)
+    assert planner.next_endpoint(missing, tried) == "aggs_prev"
+
+
+def test_custom_endpoint_table():
+    planner = FallbackPlanner({"a": ("bid",), "b": ("bid", "ask")})
+    assert planner.next_endpoint({"bid", "ask"}, set()) == "b"
+    assert set(planner.stats()) == {"a", "b"}
+    assert set(ENDPOINT_FIELDS) == set(FallbackPlanner().stats())
@@ -0,0 +1,53 @@
+import pytest
+
+from modules.rate_limiter import BULK, INTERACTIVE, RateLimiter, RateLimitExceeded, TokenBucket, request_weight
+
+
+POLYGON_URL = "https://api.polygon.io/v2/last/quote/AAPL"
+BINANCE_DEPTH = "https://api.binance.com/api/v3/depth"
+
+
+def test_depth_weight_by_limit():
+    assert request_weight("binance", "/api/v3/depth", {"limit": 100}) == 5
+    assert request_weight("binance", "/api/v3/depth", {"limit": 101}) == 25
+    assert request_weight("binance", "/api/v3/depth", {"limit": 5000}) == 250
+    assert request_weight("polygon", "/v3/snapshot") == 1.0
+
+
+def test_bucket_delay_caps_need_at_burst():
+    bucket = TokenBucket(rate=10, burst=20)
+    bucket.tokens = 0
+    assert bucket.delay(cost=5, reserve=0, scale=1) == pytest.approx(0.5)
+    # A request heavier than the whole bucket waits for a full bucket, not forever
+    assert bucket.delay(cost=100, reserve=0, scale=1) == pytest.approx(2.0)
+    assert bucket.delay(cost=5, reserve=100, scale=1) == pytest.approx(2.0)
+
+
+def test_unknown_hosts_are_not_throttled():
+    limiter = RateLimiter(limits={"polygon": {"rate": 1e-6, "burst": 1}})
+    for _ in range(10):
+        assert limiter.acquire("http://localhost:8000/x") == 0.0
+
+
+def test_interactive_rejected_past_max_wait():
+    limiter = RateLimiter(limits={"polygon": {"rate": 1e-3, "burst": 1}}, interactive_max_wait=0.1)
+    limiter.acquire(POLYGON_URL)
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire(POLYGON_URL)
+    assert limiter.stats()["polygon"]["rejected"] == 1
+
+
+def test_bulk_only_provider_leaves_interactive_unthrottled():
+    limiter = RateLimiter(limits={"polygon": {"rate": 1e-3, "burst": 1, "bulk_only": True}}, bulk_max_wait=0.1)
+    for _ in range(20):
+        assert limiter.acquire(POLYGON_URL, priority=INTERACTIVE) == 0.0
+    assert limiter.acquire(POLYGON_URL, priority=BULK) == 0.0
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire(POLYGON_URL, priority=BULK)
+
+
+def test_throttle_response_blocks_provider():
+    limiter = RateLimiter(interactive_max_wait=0.5)
+    limiter.observe(BINANCE_DEPTH, 429, {"Retry-After": "60"})
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire(BINANCE_DEPTH, {"limit": 100})
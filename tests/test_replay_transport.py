@@ -0,0 +1,61 @@
+import pytest
+import requests
+
+from modules.api_client import MarketAPI
+from modules.replay_transport import CannedResponse, RecordingTransport, ReplayTransport, load_cassette
+
+
+BASE = "https://api.binance.com"
+DEPTH = '{"lastUpdateId": 1, "bids": [["100.0", "2.0"]], "asks": [["100.5", "1.5"]]}'
+
+
+class _Upstream:
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        self.calls += 1
+        headers = {"Content-Type": "application/json", "Set-Cookie": "session=secret"}
+        return CannedResponse(200, DEPTH, headers, url=url)
+
+
+def test_entries_are_readable_before_close(tmp_path):
+    path = tmp_path / "nested" / "cassette.jsonl.gz"
+    recorder = RecordingTransport(str(path), inner=_Upstream())
+    MarketAPI(BASE, transport=recorder).get_orderbook("BTCUSDT", limit=5)
+
+    # No close(): a killed process must still leave a usable cassette
+    entries = load_cassette(str(path))
+    assert len(entries) == 1
+    assert "apiKey" not in entries[0]["key"]
+    assert {k.lower() for k in entries[0]["headers"]} == {"content-type"}
+    recorder.close()
+
+
+def test_replay_matches_exact_then_endpoint(tmp_path):
+    path = str(tmp_path / "cassette.jsonl.gz")
+    with RecordingTransport(path, inner=_Upstream()) as recorder:
+        MarketAPI(BASE, transport=recorder).get_orderbook("BTCUSDT", limit=5)
+
+    replay = ReplayTransport(path)
+    api = MarketAPI(BASE, transport=replay)
+    bids, asks = api.get_orderbook("BTCUSDT", limit=5)
+    api.get_orderbook("ETHUSDT", limit=5)
+
+    assert bids["price"].tolist() == [100.0]
+    assert replay.stats() == {"requests": 2, "exact": 1, "endpoint": 1, "missing": 0, "injected": 0}
+    assert replay.get(BASE + "/api/v3/ticker", params={"symbol": "X"}).status_code == 404
+
+
+def test_injected_faults(tmp_path):
+    path = str(tmp_path / "cassette.jsonl.gz")
+    with RecordingTransport(path, inner=_Upstream()) as recorder:
+        recorder.get(BASE + "/api/v3/depth", params={"symbol": "BTCUSDT"})
+
+    throttled = ReplayTransport(path, errors={429: 1.0})
+    response = throttled.get(BASE + "/api/v3/depth", params={"symbol": "BTCUSDT"})
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+
+    with pytest.raises(requests.exceptions.Timeout):
+        ReplayTransport(path, errors={"timeout": 1.0}).get(BASE + "/api/v3/depth")
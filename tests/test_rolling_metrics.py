@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.liquidity_metrics import kyles_lambda
+from modules.rolling_metrics import bucketed_liquidity, rolling_liquidity
+
+
+def _large_volume_frame(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    signed = 1e8 + rng.normal(0.0, 1.0, n)
+    returns = 1e-9 * (signed - 1e8) + rng.normal(0.0, 1e-10, n)
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=n, freq="s"),
+        "returns": returns,
+        "volume": np.abs(signed),
+        "signed_volume": signed,
+    })
+
+
+def test_rolling_kyle_is_stable_for_large_volumes():
+    df = _large_volume_frame()
+    rolled = rolling_liquidity(df, window=50)
+
+    for end in (49, 120, 199):
+        expected = kyles_lambda(df.iloc[end - 49:end + 1])
+        assert rolled["kyles_lambda"].iloc[end] == pytest.approx(expected, rel=1e-3)
+
+
+def test_bucketed_kyle_is_stable_for_large_volumes():
+    df = _large_volume_frame()
+    buckets = bucketed_liquidity(df, freq="1min")
+
+    first = df.iloc[:60]
+    assert buckets["kyles_lambda"].iloc[0] == pytest.approx(kyles_lambda(first), rel=1e-3)
+
+
+@pytest.mark.filterwarnings("ignore:Could not infer format")
+def test_row_window_ignores_unparseable_timestamps():
+    df = _large_volume_frame(n=10)
+    df["timestamp"] = ["not a time"] * 10
+
+    rolled = rolling_liquidity(df, window=5)
+    assert len(rolled) == 10
+    assert rolled["kyles_lambda"].notna().iloc[-1]
+
+    with pytest.raises(ValueError):
+        rolling_liquidity(df, window="1m")
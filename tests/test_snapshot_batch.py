@@ -0,0 +1,36 @@
+import numpy as np
+
+from modules.india_client import IndiaClient
+from modules.snapshot_batch import SnapshotBatch
+
+
+def test_forex_quality_uses_order_book_fields():
+    rows = [
+        {"symbol": "EURUSDT", "pair": "EUR/USD", "bid": 1.08, "ask": 1.0801, "depth1": 5, "depth2": 4, "execution_price": 1.0802},
+        {"symbol": "GBPUSDT", "pair": "GBP/USD", "bid": 1.27, "ask": None, "depth1": 3, "depth2": 0},
+        {"symbol": "AUDUSDT", "pair": "AUD/USD", "bid": None, "ask": None},
+    ]
+    frame = SnapshotBatch.from_rows(rows, provider="binance").to_frame()
+
+    assert frame["quality"].tolist() == ["Full", "Partial", "Missing"]
+    assert "close" not in frame and "volume" not in frame
+    assert frame["execution_price"][0] == 1.0802
+
+
+def test_polygon_quality_rules():
+    rows = [
+        {"symbol": "A", "bid": 1.0, "ask": 1.1, "close": 1.05, "volume": 100},
+        {"symbol": "B", "close": 1.05},
+        {"symbol": "C"},
+    ]
+    batch = SnapshotBatch.from_rows(rows, provider="polygon")
+
+    assert batch.quality.tolist() == ["Full", "Partial", "Missing"]
+    assert np.allclose(batch.derived["expected_price"][:2], [1.05, 1.05])
+
+
+def test_india_placeholder_keeps_status():
+    frame = IndiaClient("id", "token").fetch_batch({"Infosys (INFY)": "INFY"}).to_frame()
+
+    assert frame["status"].tolist() == ["KYC Pending"]
+    assert frame["quality"].tolist() == ["Missing"]
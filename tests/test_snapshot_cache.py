@@ -0,0 +1,159 @@
+import threading
+import time
+
+from modules.polygon_client import PolygonClient
+from modules.snapshot_cache import SnapshotCache, client_key
+
+
+class _Client(PolygonClient):
+    """PolygonClient whose live fetch reports which key it used."""
+
+    def _fetch_fields_live(self, symbol):
+        self.fetched += 1
+        return {"close": 1.0, "key": self.api_key}
+
+
+def _client(api_key, cache):
+    client = _Client(api_key, transport=object(), cache=cache)
+    client.fetched = 0
+    return client
+
+
+def test_clients_with_different_keys_do_not_share_entries():
+    cache = SnapshotCache()
+    first, second = _client("key-a", cache), _client("key-b", cache)
+
+    assert first._fetch_fields("AAPL")["key"] == "key-a"
+    assert second._fetch_fields("AAPL")["key"] == "key-b"
+    assert first._fetch_fields("AAPL")["key"] == "key-a"
+    assert (first.fetched, second.fetched) == (1, 1)
+    assert cache.stats()["entries"] == 2
+
+
+def test_same_key_shares_entries():
+    cache = SnapshotCache()
+    first, second = _client("key-a", cache), _client("key-a", cache)
+
+    first._fetch_fields("AAPL")
+    second._fetch_fields("AAPL")
+    assert (first.fetched, second.fetched) == (1, 0)
+
+
+def test_client_key_hides_the_secret():
+    key = client_key("super-secret-api-key")
+    assert "secret" not in key
+    assert key == client_key("super-secret-api-key") != client_key("another-key")
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Fetch:
+    """Returns value-1, value-2, ... and counts calls."""
+
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+        self.done = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        try:
+            if self.fail:
+                raise RuntimeError("upstream down")
+            return {"value": self.calls}
+        finally:
+            self.done.set()
+
+
+def _cache(clock, **kwargs):
+    return SnapshotCache(ttls={"polygon": 10.0}, stale_ttl=20.0, clock=clock, **kwargs)
+
+
+def _wait_for_refresh(cache):
+    deadline = time.monotonic() + 2.0
+    while cache._refreshing and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_fresh_hit_then_miss_after_stale_window():
+    clock, fetch = _Clock(), _Fetch()
+    cache = _cache(clock)
+
+    assert cache.get_or_fetch("polygon", "snapshot", "AAPL", fetch) == {"value": 1}
+    clock.now = 9.9
+    assert cache.get_or_fetch("polygon", "snapshot", "AAPL", fetch) == {"value": 1}
+    clock.now = 30.1
+    assert cache.get_or_fetch("polygon", "snapshot", "AAPL", fetch) == {"value": 2}
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["stale_hits"], stats["misses"]) == (1, 0, 2)
+    assert fetch.calls == 2
+
+
+def test_stale_value_is_served_while_one_refresh_runs():
+    clock, fetch = _Clock(), _Fetch()
+    cache = _cache(clock)
+    cache.get_or_fetch("polygon", "snapshot", "AAPL", fetch)
+
+    clock.now = 15.0
+    fetch.done.clear()
+    assert cache.get_or_fetch("polygon", "snapshot", "AAPL", fetch) == {"value": 1}
+    assert fetch.done.wait(2.0)
+    _wait_for_refresh(cache)
+
+    assert cache.get_or_fetch("polygon", "snapshot", "AAPL", fetch) == {"value": 2}
+    assert fetch.calls == 2
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_failed_refresh_keeps_stale_value_and_counts_error():
+    clock = _Clock()
+    cache = _cache(clock)
+    cache.get_or_fetch("polygon", "snapshot", "AAPL", _Fetch())
+
+    clock.now = 15.0
+    failing = _Fetch(fail=True)
+    assert cache.get_or_fetch("polygon", "snapshot", "AAPL", failing) == {"value": 1}
+    assert failing.done.wait(2.0)
+    _wait_for_refresh(cache)
+
+    assert cache.stats()["refresh_errors"] == 1
+    assert cache.get_or_fetch("polygon", "snapshot", "AAPL", failing) == {"value": 1}
+
+
+def test_none_results_are_not_cached():
+    cache = _cache(_Clock())
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return None
+
+    assert cache.get_or_fetch("polygon", "snapshot", "AAPL", fetch) is None
+    assert cache.get_or_fetch("polygon", "snapshot", "AAPL", fetch) is None
+    assert len(calls) == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = _cache(_Clock(), max_entries=2)
+    for symbol in ("A", "B"):
+        cache.get_or_fetch("polygon", "snapshot", symbol, lambda: {"v": 1})
+    cache.get_or_fetch("polygon", "snapshot", "A", lambda: {"v": 2})   # A is now most recent
+    cache.get_or_fetch("polygon", "snapshot", "C", lambda: {"v": 3})
+
+    stats = cache.stats()
+    assert (stats["entries"], stats["evictions"]) == (2, 1)
+    assert cache.get_or_fetch("polygon", "snapshot", "A", lambda: {"v": 9}) == {"v": 1}
+    assert cache.get_or_fetch("polygon", "snapshot", "B", lambda: {"v": 9}) == {"v": 9}
+
+    small = _cache(_Clock(), max_bytes=1)
+    small.get_or_fetch("polygon", "snapshot", "A", lambda: {"v": 1})
+    assert small.stats()["entries"] == 0
+    assert small.stats()["bytes"] == 0
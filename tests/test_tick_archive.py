@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.data_loader import compute_returns
+from modules.tick_archive import TickArchive, write_archive
+
+
+def test_returns_recomputed_per_symbol(tmp_path):
+    df = compute_returns(pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=4, freq="s").tolist() * 2,
+        "symbol": ["AAA"] * 4 + ["BBB"] * 4,
+        "close": [10.0, 11.0, 12.0, 13.0, 200.0, 210.0, 220.0, 230.0],
+    }))
+    write_archive(tmp_path / "ticks.archive", df)
+    archive = TickArchive(tmp_path / "ticks.archive")
+
+    for symbol in ("AAA", "BBB"):
+        returns = np.asarray(archive.for_symbol(symbol)["returns"])
+        assert np.isnan(returns[0])
+    assert np.asarray(archive.for_symbol("BBB")["returns"])[1] == pytest.approx(0.05)
@@ -0,0 +1,56 @@
+import pytest
+
+from modules.tick_store import TickStore
+
+
+def test_append_snapshots_round_trip(tmp_path):
+    store = TickStore(tmp_path)
+    written = store.append_snapshots("polygon", [{"symbol": "AAPL", "bid": 1.0, "ask": 1.1}])
+    frame = store.read_snapshots("polygon", ["AAPL"])
+
+    assert written == 1
+    assert frame["symbol"].tolist() == ["AAPL"]
+    assert frame["ask"].tolist() == [1.1]
+
+
+def test_append_snapshots_rejects_rows_without_symbol(tmp_path):
+    store = TickStore(tmp_path)
+    with pytest.raises(ValueError):
+        store.append_snapshots("polygon", [{"bid": 1.0, "ask": 1.1}])
+    assert store.append_snapshots("polygon", []) == 0
+
+
+def _parts(root):
+    return sorted(root.rglob("part-*.parquet"))
+
+
+def test_appends_are_buffered_into_one_part_per_partition(tmp_path):
+    store = TickStore(tmp_path, flush_rows=1_000, flush_seconds=3_600)
+    for i in range(20):
+        store.append_snapshots("polygon", [{"symbol": "AAPL", "close": float(i)}, {"symbol": "MSFT", "close": -float(i)}])
+    assert _parts(tmp_path) == []
+
+    frame = store.read_snapshots("polygon", ["AAPL"])
+    assert frame["close"].tolist() == [float(i) for i in range(20)]
+    assert len(_parts(tmp_path)) == 2
+
+
+def test_full_buffer_flushes_on_append(tmp_path):
+    store = TickStore(tmp_path, flush_rows=5, flush_seconds=3_600)
+    for i in range(4):
+        store.append_snapshots("polygon", [{"symbol": "AAPL", "close": float(i)}])
+    assert _parts(tmp_path) == []
+
+    store.append_snapshots("polygon", [{"symbol": "AAPL", "close": 4.0}])
+    assert len(_parts(tmp_path)) == 1
+
+
+def test_compact_merges_finished_days(tmp_path):
+    store = TickStore(tmp_path, flush_rows=1)
+    for hour in range(3):
+        store.append_snapshots("polygon", [{"symbol": "AAPL", "close": float(hour)}], fetched_at=f"2024-01-02 0{hour}:00")
+    assert len(_parts(tmp_path)) == 3
+
+    assert store.compact() == {"partitions": 1, "files_merged": 3}
+    assert len(_parts(tmp_path)) == 1
+    assert store.read_snapshots("polygon")["close"].tolist() == [0.0, 1.0, 2.0]
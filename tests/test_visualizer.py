@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.rolling_metrics import rolling_liquidity
+from modules.visualizer import bin_depth, depth_history_heatmap, plot_rolling_metrics
+
+
+def _rolled(n=20_000):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=n, freq="s"),
+        "bid": 100 + rng.normal(0, 0.01, n),
+        "close": 100 + rng.normal(0, 0.01, n),
+        "volume": rng.uniform(1, 10, n),
+        "signed_volume": rng.normal(0, 5, n),
+    })
+    df["ask"] = df["bid"] + rng.uniform(0.01, 0.02, n)
+    return rolling_liquidity(df, window=50).dropna(axis=1, how="all")
+
+
+def test_rolling_chart_is_decimated_per_metric():
+    rolled = _rolled()
+    fig = plot_rolling_metrics(rolled, max_points=500)
+
+    assert len(fig.data) == rolled.shape[1]
+    assert all(len(trace.x) <= 500 for trace in fig.data)
+    assert fig.layout.height == 200 * rolled.shape[1]
+
+
+def test_rolling_chart_zooms_into_x_range():
+    rolled = _rolled()
+    start, end = rolled.index[1_000], rolled.index[1_200]
+    fig = plot_rolling_metrics(rolled, max_points=500, x_range=(start, end))
+
+    for trace in fig.data:
+        times = pd.to_datetime(trace.x)
+        assert len(times) == 201
+        assert times.min() == start and times.max() == end
+
+
+def test_rolling_chart_without_metrics_is_empty():
+    empty = pd.DataFrame(index=pd.RangeIndex(10, name="row"))
+    fig = plot_rolling_metrics(empty)
+    assert len(fig.data) == 0
+    assert fig.layout.title.text == 'Rolling Liquidity Metrics'
+
+
+BIDS = pd.DataFrame({"price": [99.5, 99.0, 97.2], "qty": [1.0, 2.0, 4.0]})
+ASKS = pd.DataFrame({"price": [100.5, 101.0, 102.9], "qty": [3.0, 1.0, 5.0]})
+
+
+def test_bin_depth_sums_qty_into_shared_buckets():
+    centers, bid_qty, ask_qty = bin_depth(BIDS, ASKS, bins=6, price_range=(97.0, 103.0))
+
+    assert centers.tolist() == pytest.approx([97.5, 98.5, 99.5, 100.5, 101.5, 102.5])
+    assert bid_qty.tolist() == [4.0, 0.0, 3.0, 0.0, 0.0, 0.0]
+    assert ask_qty.tolist() == [0.0, 0.0, 0.0, 3.0, 1.0, 5.0]
+    # Inputs are left untouched and array pairs work too
+    assert BIDS["qty"].tolist() == [1.0, 2.0, 4.0]
+    _, bid_arr, _ = bin_depth((BIDS["price"], BIDS["qty"]), ASKS, bins=6, price_range=(97.0, 103.0))
+    assert bid_arr.tolist() == bid_qty.tolist()
+
+
+def test_bin_depth_default_range_spans_both_sides():
+    centers, bid_qty, ask_qty = bin_depth(BIDS, ASKS, bins=10)
+    assert centers[0] > 97.2 and centers[-1] < 102.9
+    assert bid_qty.sum() == pytest.approx(7.0) and ask_qty.sum() == pytest.approx(9.0)
+
+
+def test_depth_history_heatmap_is_time_by_price_matrix():
+    times = pd.date_range("2024-01-01", periods=3, freq="min")
+    snapshots = [(t, BIDS.assign(qty=BIDS["qty"] * (i + 1)), ASKS) for i, t in enumerate(times)]
+    fig = depth_history_heatmap(snapshots, bins=6, price_range=(97.0, 103.0))
+
+    (heatmap,) = fig.data
+    z = np.asarray(heatmap.z)
+    assert z.shape == (6, 3)
+    assert z.sum(axis=0).tolist() == pytest.approx([7.0 + 9.0, 14.0 + 9.0, 21.0 + 9.0])
+    assert list(pd.to_datetime(heatmap.x)) == list(times)
+
+
+def test_depth_history_heatmap_without_books():
+    fig = depth_history_heatmap([])
+    assert len(fig.data) == 0